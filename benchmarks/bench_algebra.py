@@ -0,0 +1,53 @@
+"""Benchmark building training plans from workout parts.
+
+Compares gluing workout texts together and converting them with
+:class:`zwog.utils.ZWOG` against composing parsed parts with
+:class:`zwog.algebra.ComposedWorkout`.
+
+Run with ``python -m benchmarks.bench_algebra``.
+"""
+
+import argparse
+import sys
+from timeit import repeat
+
+from benchmarks.suite import generate_workout
+from zwog.algebra import ComposedWorkout
+from zwog.utils import ZWOG
+
+WARMUP = "10min from 40 to 75% FTP"
+COOLDOWN = "5min from 60 to 40% FTP"
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20)
+    options = parser.parse_args()
+
+    warmup = ComposedWorkout([ZWOG(WARMUP)])
+    cooldown = ComposedWorkout([ZWOG(COOLDOWN)])
+    for blocks in [10, 100, 1000]:
+        main_set = generate_workout(blocks)
+        composed_main = ComposedWorkout([ZWOG(main_set)])
+
+        def text() -> None:
+            zwog = ZWOG(f"{WARMUP}\n{main_set}\n{main_set}\n{COOLDOWN}")  # noqa: B023
+            _ = zwog.zwo_workout, zwog.tss, str(zwog)
+
+        def composed() -> None:
+            zwog = warmup.concat(composed_main.repeat(2), cooldown)  # noqa: B023
+            _ = zwog.zwo_workout, zwog.tss, str(zwog)
+
+        timings = [
+            min(repeat(func, number=options.number, repeat=5)) / options.number
+            for func in [text, composed]
+        ]
+        sys.stdout.write(
+            f"{blocks:5d} blocks  ZWOG {timings[0] * 1000:8.3f} ms"
+            f"  ComposedWorkout {timings[1] * 1000:8.3f} ms\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
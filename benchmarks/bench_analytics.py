@@ -0,0 +1,71 @@
+"""Benchmark TSS and time in zones over many workouts.
+
+Compares :attr:`zwog.utils.ZWOG.tss` and
+:meth:`zwog.timeline.Timeline.time_in_zones` on every workout against
+:func:`zwog.analytics.tss_many` and :func:`zwog.analytics.zones_many`
+(requires the ``analytics`` extra).
+
+Run with ``python -m benchmarks.bench_analytics``.
+"""
+
+import argparse
+import sys
+from timeit import repeat
+
+from zwog.analytics import pack, tss_many, zones_many
+from zwog.utils import ZWOG
+
+BLOCKS = [
+    "10min from 40 to 85% FTP",
+    "3x 5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "4x 30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--workouts", type=int, default=10000)
+    parser.add_argument("-b", "--blocks", type=int, default=20)
+    options = parser.parse_args()
+
+    workouts = [
+        ZWOG("\n".join(BLOCKS[(i + j) % len(BLOCKS)] for j in range(options.blocks)))
+        for i in range(options.workouts)
+    ]
+    segments = pack(workouts)
+
+    def loop() -> None:
+        for workout in workouts:
+            workout._to_tss(workout.workout)  # noqa: SLF001
+
+    def zones_loop() -> None:
+        for workout in workouts:
+            workout.timeline.time_in_zones()
+
+    benchmarks = [
+        ("ZWOG._to_tss loop", loop),
+        ("pack + tss_many", lambda: tss_many(workouts)),
+        ("tss_many (packed)", lambda: tss_many(segments)),
+        ("time_in_zones loop", zones_loop),
+        ("zones_many (packed)", lambda: zones_many(segments)),
+    ]
+    timings = {}
+    for label, func in benchmarks:
+        timings[label] = min(repeat(func, number=1, repeat=5))
+        sys.stdout.write(
+            f"{label:<20}{timings[label] * 1000:10.3f} ms"
+            f"{options.workouts / timings[label]:12.0f} workouts/s\n"
+        )
+    sys.stdout.write(
+        "speed-up: "
+        f"{timings['ZWOG._to_tss loop'] / timings['tss_many (packed)']:.1f}x"
+        " (TSS), "
+        f"{timings['time_in_zones loop'] / timings['zones_many (packed)']:.1f}x"
+        " (zones)\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
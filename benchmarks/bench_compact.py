@@ -0,0 +1,79 @@
+"""Benchmark the memory used by parsed workouts.
+
+Compares :class:`zwog.utils.Block` with :class:`zwog.compact.CompactBlock`,
+with and without interning.
+
+Run with ``python -m benchmarks.bench_compact``.
+"""
+
+import argparse
+import sys
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from zwog.compact import to_compact
+from zwog.utils import parse_workout
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+BLOCKS = [
+    "10min from 40 to 85% FTP",
+    "3x 5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "4x 30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+]
+
+
+def allocated(func: "Callable[[], object]") -> int:
+    """Return the number of bytes held by the result of a function."""
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--workouts", type=int, default=1000)
+    options = parser.parse_args()
+
+    workouts = [
+        "\n".join(BLOCKS[(i + j) % len(BLOCKS)] for j in range(i % 7 + 1)).replace(
+            "5min", f"{i % 13 + 1}min"
+        )
+        for i in range(options.workouts)
+    ]
+    intervals = sum(
+        len(block.intervals) for x in workouts for block in parse_workout(x)
+    )
+
+    # every workout is parsed again while tracing and the parsed blocks are
+    # released, so that the values shared with them are counted
+    def pooled() -> object:
+        pool: dict[Any, Any] = {}
+        return [to_compact(parse_workout(x), pool) for x in workouts]
+
+    benchmarks: list[tuple[str, Callable[[], object]]] = [
+        ("Block", lambda: [parse_workout(x) for x in workouts]),
+        ("CompactBlock", lambda: [to_compact(parse_workout(x)) for x in workouts]),
+        ("CompactBlock (pool)", pooled),
+    ]
+    sizes = {}
+    for label, func in benchmarks:
+        sizes[label] = allocated(func)
+        sys.stdout.write(
+            f"{label:<20}{sizes[label] / 1024:10.1f} KiB"
+            f"{sizes[label] / intervals:8.1f} bytes/interval\n"
+        )
+    sys.stdout.write(
+        f"reduction: {sizes['Block'] / sizes['CompactBlock']:.1f}x,"
+        f" {sizes['Block'] / sizes['CompactBlock (pool)']:.1f}x with a pool\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark exporting several formats in one pass.
+
+Compares converting a workout into ZWO alone, into every built-in format by
+parsing it once per format, and into every built-in format in a single pass
+with :meth:`zwog.utils.ZWOG.emit`.
+
+Run with ``python -m benchmarks.bench_emitters``.
+"""
+
+import argparse
+import sys
+from timeit import Timer
+from typing import TYPE_CHECKING
+
+from benchmarks.suite import generate_workout
+from zwog.emitters import (
+    ErgEmitter,
+    JsonEmitter,
+    MrcEmitter,
+    PrettyEmitter,
+    ZwoEmitter,
+)
+from zwog.utils import ZWOG
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from zwog.emitters import Emitter
+
+
+def best(func: "Callable[[], object]", rounds: int) -> float:
+    """Return the best time per call in seconds."""
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=rounds, number=number)) / number
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=5)
+    options = parser.parse_args()
+
+    def emitters() -> "list[Emitter]":
+        return [
+            ZwoEmitter(),
+            PrettyEmitter(),
+            MrcEmitter(),
+            ErgEmitter(250),
+            JsonEmitter(),
+        ]
+
+    sys.stdout.write(
+        f"{'blocks':>8}{'ZWO (ms)':>12}{'per format (ms)':>18}"
+        f"{'one pass (ms)':>16}{'vs per format':>15}{'vs ZWO':>9}\n"
+    )
+    for blocks in options.sizes:
+        workout = generate_workout(blocks, options.repeats)
+        zwo = best(lambda: ZWOG(workout).emit(ZwoEmitter()), options.rounds)  # noqa: B023
+        per_format = best(
+            lambda: [ZWOG(workout).emit(x) for x in emitters()],  # noqa: B023
+            options.rounds,
+        )
+        one_pass = best(
+            lambda: ZWOG(workout).emit(*emitters()),  # noqa: B023
+            options.rounds,
+        )
+        sys.stdout.write(
+            f"{blocks:>8}{zwo * 1000:12.3f}{per_format * 1000:18.3f}"
+            f"{one_pass * 1000:16.3f}{one_pass / per_format:14.2f}x"
+            f"{one_pass / zwo:8.2f}x\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark parsing throughput on long workouts.
+
+Compares the parser and :class:`zwog.utils.WorkoutTransformer` against the
+fast path of :func:`zwog.utils.parse_workout`.
+
+Run with ``python -m benchmarks.bench_fast_parser``.
+"""
+
+import argparse
+import sys
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from zwog.utils import WorkoutTransformer, get_parser, parse_workout
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+BLOCKS = [
+    "10min from 40 to 85% FTP",
+    "3x 5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "4x 30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+]
+
+
+def tree_and_transform(workout: str) -> None:
+    """Parse into a parse-tree and transform it."""
+    WorkoutTransformer().transform(get_parser().parse(workout))
+
+
+def best_of(func: "Callable[[str], object]", workout: str, number: int) -> float:
+    """Return the best per-call latency in seconds."""
+    return min(repeat(lambda: func(workout), number=number, repeat=5)) / number
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-b", "--blocks", type=int, default=500)
+    parser.add_argument("-n", "--number", type=int, default=10)
+    options = parser.parse_args()
+
+    workout = "\n".join(BLOCKS[i % len(BLOCKS)] for i in range(options.blocks))
+    get_parser()  # warm up the shared parser
+
+    benchmarks: list[tuple[str, Callable[[str], object]]] = [
+        ("parse-tree + transformer", tree_and_transform),
+        ("parse_workout", parse_workout),
+    ]
+    timings = {}
+    for label, func in benchmarks:
+        timings[label] = best_of(func, workout, options.number)
+        sys.stdout.write(
+            f"{label:<26}{timings[label] * 1000:10.3f} ms"
+            f"{options.blocks / timings[label]:12.0f} blocks/s\n"
+        )
+    sys.stdout.write(
+        "speed-up: "
+        f"{timings['parse-tree + transformer'] / timings['parse_workout']:.1f}x\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
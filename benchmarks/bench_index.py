@@ -0,0 +1,84 @@
+"""Benchmark querying a workout library.
+
+Compares answering a query by converting every workout file with
+:class:`zwog.utils.ZWOG` against querying a :class:`zwog.index.WorkoutIndex`,
+and times indexing the library from scratch and again without changes.
+
+Run with ``python -m benchmarks.bench_index``.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from random import Random
+
+from zwog.index import WorkoutIndex
+from zwog.utils import ZWOG
+
+BLOCKS = [
+    "10min from 40 to 75% FTP",
+    "3x 4min @ 110% FTP, 2min @ 50% FTP",
+    "20min @ 88% FTP",
+    "5x 30s from 100 to 130% FTP, 1m30s @ 50% FTP",
+    "8min @ 60% FTP",
+]
+
+
+def query_by_parsing(directory: Path) -> list[Path]:
+    """Return the workouts of 45-60 minutes with 10 minutes above 105% FTP."""
+    matches = []
+    for path in sorted(directory.glob("*.txt")):
+        workout = ZWOG(path.read_text(encoding="utf-8"))
+        zones = workout.timeline.time_in_zones([105.0])
+        if 45 * 60 <= workout.duration <= 60 * 60 and zones[1] >= 10 * 60:
+            matches.append(path)
+    return matches
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 1000, 5000])
+    options = parser.parse_args()
+
+    rng = Random(0)  # noqa: S311
+    for files in options.files:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            for idx in range(files):
+                (directory / f"{idx}.txt").write_text(
+                    "\n".join(rng.choices(BLOCKS, k=rng.randint(2, 6))),
+                    encoding="utf-8",
+                )
+            with WorkoutIndex(directory / ".index.sqlite") as index:
+                start = time.perf_counter()
+                index.update(directory)
+                indexing = time.perf_counter() - start
+                start = time.perf_counter()
+                index.update(directory)
+                reindexing = time.perf_counter() - start
+
+                start = time.perf_counter()
+                expected = query_by_parsing(directory)
+                parsing = time.perf_counter() - start
+                start = time.perf_counter()
+                matches = index.query(
+                    min_duration=45 * 60,
+                    max_duration=60 * 60,
+                    time_above=(105.0, 10 * 60),
+                )
+                querying = time.perf_counter() - start
+                assert [x.path for x in matches] == expected
+
+        sys.stdout.write(
+            f"{files:6d} files  index {indexing * 1000:9.1f} ms"
+            f"  re-index {reindexing * 1000:8.1f} ms"
+            f"  parse and filter {parsing * 1000:9.1f} ms"
+            f"  query {querying * 1000:6.2f} ms ({len(matches)} matches)\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
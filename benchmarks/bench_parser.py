@@ -0,0 +1,63 @@
+"""Benchmark per-workout parser latency.
+
+Compares building a fresh Earley parser for every workout against the shared
+LALR parser returned by :func:`zwog.utils.get_parser`.
+
+Run with ``python -m benchmarks.bench_parser``.
+"""
+
+import argparse
+import sys
+from collections.abc import Callable
+from timeit import repeat
+
+from lark import Lark
+
+from zwog.constants import ZWOG_GRAMMAR
+from zwog.utils import ZWOG, WorkoutTransformer, get_parser
+
+WORKOUT = (
+    "10min from 40 to 85% FTP\n"
+    "3x 5min @ 95% FTP, 5min @ 86% FTP\n"
+    "5min @ 50% FTP\n"
+    "3x 5min @ 95% FTP, 5min @ 86% FTP\n"
+    "10min from 75 to 55% FTP\n"
+)
+
+
+def fresh_earley(workout: str) -> None:
+    """Parse with a parser built for this workout only."""
+    parser = Lark(ZWOG_GRAMMAR, start="workout", maybe_placeholders=False)
+    WorkoutTransformer().transform(parser.parse(workout))
+
+
+def shared_lalr(workout: str) -> None:
+    """Parse with the shared parser."""
+    WorkoutTransformer().transform(get_parser().parse(workout))
+
+
+def best_of(func: Callable[[str], object], number: int) -> float:
+    """Return the best per-call latency in milliseconds."""
+    timings = repeat(lambda: func(WORKOUT), number=number, repeat=5)
+    return min(timings) / number * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=50)
+    options = parser.parse_args()
+
+    get_parser()  # warm up the shared parser
+
+    benchmarks: list[tuple[str, Callable[[str], object]]] = [
+        ("fresh Earley parser", fresh_earley),
+        ("shared LALR parser", shared_lalr),
+        ("ZWOG (end-to-end)", ZWOG),
+    ]
+    for label, func in benchmarks:
+        sys.stdout.write(f"{label:<24}{best_of(func, options.number):10.3f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark editing latency as workouts grow.
+
+Compares converting the whole workout with :class:`zwog.utils.ZWOG` on every
+edit against :class:`zwog.session.WorkoutSession`.
+
+Run with ``python -m benchmarks.bench_session``.
+"""
+
+import argparse
+import sys
+from functools import partial
+from itertools import cycle
+from timeit import repeat
+from typing import TYPE_CHECKING
+
+from zwog.session import WorkoutSession
+from zwog.utils import ZWOG
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+LINES = [
+    "10min from 40 to 85% FTP",
+    "3x 5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "4x 30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+]
+
+
+def convert(texts: "Iterator[str]") -> None:
+    """Convert the next text from scratch."""
+    zwog = ZWOG(next(texts))
+    _ = zwog.zwo_workout, zwog.tss
+
+
+def edit(session: WorkoutSession, texts: "Iterator[str]") -> None:
+    """Update the session to the next text."""
+    session.update(next(texts))
+    _ = session.zwo_workout, session.tss
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20)
+    options = parser.parse_args()
+
+    for length in [25, 100, 400, 1600]:
+        lines = [LINES[i % len(LINES)] for i in range(length)]
+        edited = [*lines[: length // 2], "2m @ 60% FTP", *lines[length // 2 + 1 :]]
+        texts = cycle(["\n".join(lines), "\n".join(edited)])
+        session = WorkoutSession(next(texts))
+
+        funcs: list[Callable[[], object]] = [
+            partial(convert, texts),
+            partial(edit, session, texts),
+        ]
+        timings = [
+            min(repeat(func, number=options.number, repeat=5)) / options.number
+            for func in funcs
+        ]
+        sys.stdout.write(
+            f"{length:5d} lines  ZWOG {timings[0] * 1000:8.3f} ms"
+            f"  WorkoutSession {timings[1] * 1000:8.3f} ms\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
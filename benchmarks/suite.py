@@ -0,0 +1,220 @@
+"""Benchmark every stage of the conversion pipeline.
+
+Times each stage separately on synthetic workouts of growing size, with and
+without large repeat counts, and writes the results as JSON. Results of two
+runs can be compared to flag regressions.
+
+Run with ``nox -s benchmarks`` or ``python -m benchmarks.suite run``, and
+compare with ``python -m benchmarks.suite compare BASELINE CURRENT``.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from importlib.metadata import version
+from pathlib import Path
+from timeit import Timer
+from typing import TYPE_CHECKING, Any
+
+from zwog._parser import Lark_StandAlone  # noqa: PLC2701
+from zwog.utils import ZWOG, WorkoutTransformer, get_parser, parse_workout
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+try:
+    from zwog.build_parser import build_lalr_parser
+except ImportError:  # grammar compilation requires the lark extra
+    compile_grammar: "Callable[[], object] | None" = None
+else:
+    compile_grammar = build_lalr_parser
+
+BLOCKS = [
+    "10min from 40 to 85% FTP",
+    "5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+    "2m @ 60% FTP",
+]
+
+SIZES = [10, 100, 1000, 10000]
+REPEATS = [1, 20]
+
+
+def generate_workout(blocks: int, repeats: int = 1) -> str:
+    """Generate a synthetic workout.
+
+    Args:
+        blocks: Number of blocks.
+        repeats: Repeat count of every block.
+
+    Returns:
+        Workout as a string.
+
+    """
+    prefix = f"{repeats}x " if repeats > 1 else ""
+    return "\n".join(prefix + BLOCKS[i % len(BLOCKS)] for i in range(blocks))
+
+
+def stages(workout: str, directory: Path) -> "dict[str, Callable[[], object]]":
+    """Return the pipeline stages of a workout.
+
+    Args:
+        workout: Workout as a string.
+        directory: Directory for saved files.
+
+    Returns:
+        Functions running each stage on its precomputed input.
+
+    """
+    zwog = ZWOG(workout)
+    tree = get_parser().parse(workout)
+    blocks = zwog.workout
+    pretty = str(zwog)
+    filename = str(directory / "workout.zwo")
+    # private stages are timed on purpose
+    return {
+        **(
+            {"grammar compilation": compile_grammar}
+            if compile_grammar is not None
+            else {}
+        ),
+        "parser construction": Lark_StandAlone,
+        "parse": lambda: get_parser().parse(workout),
+        "transform": lambda: WorkoutTransformer().transform(tree),
+        "parse_workout": lambda: parse_workout(workout),
+        "_to_pretty": lambda: zwog._to_pretty(blocks),  # noqa: SLF001
+        "_to_zwo": lambda: zwog._to_zwo(blocks, pretty),  # noqa: SLF001
+        "zwo_bytes": lambda: (zwog.__dict__.pop("zwo_bytes", None), zwog.zwo_bytes),
+        "save_zwo": lambda: zwog.save_zwo(filename),
+        "_to_tss": lambda: zwog._to_tss(blocks),  # noqa: SLF001
+    }
+
+
+def measure(func: "Callable[[], object]", rounds: int) -> dict[str, float]:
+    """Time a function.
+
+    Args:
+        func: Function.
+        rounds: Number of rounds.
+
+    Returns:
+        Best and mean time per call in seconds, and calls per round.
+
+    """
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    timings = [x / number for x in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "best": min(timings),
+        "mean": sum(timings) / len(timings),
+        "number": number,
+    }
+
+
+def run(options: argparse.Namespace) -> None:
+    """Run the benchmarks and write the results."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for repeats in options.repeats:
+            for blocks in options.sizes:
+                workout = generate_workout(blocks, repeats)
+                for stage, func in stages(workout, Path(directory)).items():
+                    if options.stage and stage not in options.stage:
+                        continue
+                    result = {
+                        "stage": stage,
+                        "blocks": blocks,
+                        "repeats": repeats,
+                        **measure(func, options.rounds),
+                    }
+                    results.append(result)
+                    sys.stderr.write(
+                        f"{stage:<20}{blocks:>7} blocks{repeats:>4}x"
+                        f"{result['best'] * 1000:14.4f} ms\n"
+                    )
+    document = {
+        "metadata": {
+            "zwog": version("zwog"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    output = json.dumps(document, indent=2) + "\n"
+    if options.output_file is None:
+        sys.stdout.write(output)
+    else:
+        options.output_file.write_text(output, encoding="utf-8")
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> int:
+    """Compare two benchmark runs.
+
+    Args:
+        baseline: Results of the baseline run.
+        current: Results of the current run.
+        threshold: Relative slowdown flagged as a regression.
+
+    Returns:
+        Number of regressions.
+
+    """
+    best = {
+        (x["stage"], x["blocks"], x["repeats"]): x["best"] for x in baseline["results"]
+    }
+    regressions = 0
+    for result in current["results"]:
+        key = (result["stage"], result["blocks"], result["repeats"])
+        if key not in best:
+            continue
+        ratio = result["best"] / best[key]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        sys.stdout.write(
+            f"{key[0]:<20}{key[1]:>7} blocks{key[2]:>4}x"
+            f"{best[key] * 1000:14.4f} ms{result['best'] * 1000:14.4f} ms"
+            f"{ratio:8.2f}x{flag}\n"
+        )
+    sys.stdout.write(f"{regressions} regression(s) beyond {threshold:.0%}\n")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-o", "--output_file", type=Path, default=None)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    run_parser.add_argument("--repeats", type=int, nargs="+", default=REPEATS)
+    run_parser.add_argument("--stage", action="append", help="run only this stage")
+    run_parser.add_argument("--rounds", type=int, default=5)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("-t", "--threshold", type=float, default=0.25)
+
+    options = parser.parse_args(argv)
+    if options.command == "run":
+        run(options)
+    else:
+        regressions = compare(
+            json.loads(options.baseline.read_text(encoding="utf-8")),
+            json.loads(options.current.read_text(encoding="utf-8")),
+            options.threshold,
+        )
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
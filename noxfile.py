@@ -10,7 +10,7 @@ nox.options.default_venv_backend = "uv"
 def tests(session: nox.Session, resolution: str) -> None:
     """Test session."""
     session.install("pytest~=8.3", "pytest-cov~=5.0")
-    session.install(".", "--resolution", resolution)
+    session.install(".[lark,analytics]", "--resolution", resolution)
     session.run("python", "-m", "pytest", *session.posargs)
 
 
@@ -28,3 +28,21 @@ def lint(session: nox.Session) -> None:
     """Lint session."""
     session.install("pre-commit~=3.8")
     session.run("pre-commit", "run", "--all-files", *session.posargs)
+
+
+@nox.session(default=False)
+def parser(session: nox.Session) -> None:
+    """Regenerate the standalone parser."""
+    session.install(".[lark]")
+    session.run("python", "-m", "zwog.build_parser", "-o", "src/zwog/_parser.py")
+
+
+@nox.session(venv_backend="none", default=False)
+def benchmarks(session: nox.Session) -> None:
+    """Benchmark session, run in the current environment to work offline."""
+    session.run(
+        "python",
+        "-m",
+        "benchmarks.suite",
+        *(session.posargs or ["run", "-o", "benchmark.json"]),
+    )
@@ -0,0 +1,457 @@
+"""Workout algebra on parsed workouts.
+
+:class:`ComposedWorkout` concatenates, scales, slices, and repeats workouts
+without going through their text. It keeps the string, TSS, and ZWO fragment
+of every top-level block, so that the results of an operation share the
+converted blocks of their operands, and only blocks that an operation
+changes are converted again. Strings and ZWO fragments are only converted
+when they are first needed.
+"""
+
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from zwog.utils import ZWOG, Block, Interval, _WorkoutRules
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+
+@dataclass(frozen=True)
+class Part:
+    """Top-level block with its converted views.
+
+    TSS and duration are computed when the part is created. The string and
+    the ZWO fragment are converted on first access and shared by every
+    workout that contains the part.
+    """
+
+    block: Block
+    tss: float
+    duration: int
+    converter: ZWOG = field(repr=False, compare=False)
+
+    @cached_property
+    def pretty(self) -> str:
+        """Get the block as a string."""
+        return self.converter._block_to_pretty(self.block)  # noqa: SLF001
+
+    @cached_property
+    def zwo(self) -> str:
+        """Get the block as a ZWO fragment, neither a warmup nor a cooldown."""
+        return self.converter._block_to_zwo(self.block)  # noqa: SLF001
+
+
+def _make_block(items: "Sequence[Interval | Block]", repeats: int = 1) -> Block:
+    """Return a block normalized like a parsed one.
+
+    Args:
+        items: Intervals and nested groups.
+        repeats: Repeat count.
+
+    Returns:
+        Block with the groups that are not repeated inlined, and a single
+        repeated group merged into it.
+
+    """
+    return _WorkoutRules.block([("repeats", repeats), _WorkoutRules.intervals(items)])
+
+
+def _cut_interval(interval: Interval, start: int, end: int) -> Interval:
+    """Return the part of an interval between two times.
+
+    Args:
+        interval: Interval.
+        start: Start time in seconds relative to the interval.
+        end: End time in seconds relative to the interval.
+
+    Returns:
+        Interval between the times, with the powers of a ramp interpolated.
+
+    """
+    if isinstance(interval.power, list):
+        low, high = interval.power
+        slope = (high - low) / interval.duration
+        return Interval(end - start, [low + slope * start, low + slope * end])
+    return Interval(end - start, interval.power)
+
+
+def _scale_power(item: "Interval | Block", factor: float) -> "Interval | Block":
+    """Return an interval or a block with the powers scaled.
+
+    Args:
+        item: Interval or block.
+        factor: Power factor.
+
+    Returns:
+        Scaled interval or block.
+
+    """
+    if isinstance(item, Block):
+        return Block([_scale_power(x, factor) for x in item.intervals], item.repeats)
+    if isinstance(item.power, list):
+        return Interval(item.duration, [x * factor for x in item.power])
+    return Interval(item.duration, item.power * factor)
+
+
+def _scale_duration(item: "Interval | Block", factor: float) -> "Interval | Block":
+    """Return an interval or a block with the durations scaled.
+
+    Args:
+        item: Interval or block.
+        factor: Duration factor.
+
+    Returns:
+        Scaled interval or block, with durations rounded to whole seconds.
+
+    Raises:
+        ValueError: A duration is rounded to zero.
+
+    """
+    if isinstance(item, Block):
+        return Block([_scale_duration(x, factor) for x in item.intervals], item.repeats)
+    duration = round(item.duration * factor)
+    if duration <= 0:
+        msg = "Interval duration values need to be strictly positive"
+        raise ValueError(msg)
+    return Interval(duration, item.power)
+
+
+class ComposedWorkout(ZWOG):
+    """Workout composed from parsed workouts.
+
+    The operations return new composed workouts and never parse text. Blocks
+    that an operation keeps as they are share their string, TSS, and ZWO
+    fragment with the operand, so the views of the result are assembled from
+    the views of the operands. Operands that are not composed workouts are
+    converted block by block once when they are composed.
+    """
+
+    def __init__(
+        self,
+        workouts: "Iterable[ZWOG]" = (),
+        author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+        name: str = "Structured workout",
+        category: str | None = None,
+        subcategory: str | None = None,
+    ) -> None:
+        """Initialize ComposedWorkout.
+
+        Args:
+            workouts: Workouts to concatenate.
+            author: Author.
+            name: Workout name.
+            category: Workout category.
+            subcategory: Workout subcategory.
+
+        """
+        super().__init__("", author, name, category, subcategory)
+        self._set_parts([part for x in workouts for part in self._parts_of(x)])
+
+    @classmethod
+    def from_blocks(
+        cls,
+        blocks: "Iterable[Block]",
+        author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+        name: str = "Structured workout",
+        category: str | None = None,
+        subcategory: str | None = None,
+    ) -> "ComposedWorkout":
+        """Create a composed workout from blocks.
+
+        Args:
+            blocks: Workout.
+            author: Author.
+            name: Workout name.
+            category: Workout category.
+            subcategory: Workout subcategory.
+
+        Returns:
+            Composed workout of the blocks.
+
+        """
+        workout = cls((), author, name, category, subcategory)
+        workout._set_parts(map(workout._part, blocks))  # noqa: SLF001
+        return workout
+
+    def _set_parts(self, parts: "Iterable[Part]") -> None:
+        """Replace the blocks of the workout.
+
+        Args:
+            parts: Converted blocks.
+
+        """
+        self._parts = list(parts)
+        self._workout = [part.block for part in self._parts]
+
+    def _parts_of(self, workout: ZWOG) -> list[Part]:
+        """Return the converted blocks of a workout.
+
+        Args:
+            workout: Workout.
+
+        Returns:
+            Converted blocks, shared with the workout if it is composed.
+
+        """
+        if isinstance(workout, ComposedWorkout):
+            return workout.parts
+        return [self._part(block) for block in workout.workout]
+
+    def _part(self, block: Block, tss: float | None = None) -> Part:
+        """Convert a block.
+
+        Args:
+            block: Block.
+            tss: TSS of the block if already known.
+
+        Returns:
+            Converted block.
+
+        """
+        return Part(
+            block=block,
+            tss=self._block_to_tss(block) if tss is None else tss,
+            duration=self._block_to_duration(block),
+            converter=self,
+        )
+
+    def _derive(self, parts: "Iterable[Part]") -> "ComposedWorkout":
+        """Return a composed workout with the metadata of this one.
+
+        Args:
+            parts: Converted blocks.
+
+        Returns:
+            Composed workout.
+
+        """
+        workout = ComposedWorkout(
+            (), self._author, self._name, self._category, self._subcategory
+        )
+        workout._set_parts(parts)  # noqa: SLF001
+        return workout
+
+    @property
+    def parts(self) -> list[Part]:
+        """Get the converted top-level blocks."""
+        return self._parts
+
+    @property
+    def duration(self) -> int:
+        """Get the duration in seconds."""
+        return sum(part.duration for part in self._parts)
+
+    def concat(self, *workouts: ZWOG) -> "ComposedWorkout":
+        """Append workouts to this one.
+
+        Args:
+            *workouts: Workouts to append.
+
+        Returns:
+            Concatenated workout with the metadata of this one.
+
+        """
+        return self._derive(
+            [*self._parts, *(part for x in workouts for part in self._parts_of(x))]
+        )
+
+    def repeat(self, times: int) -> "ComposedWorkout":
+        """Repeat the workout.
+
+        Args:
+            times: Number of repetitions.
+
+        Returns:
+            Workout repeated one after another.
+
+        Raises:
+            ValueError: The number of repetitions is negative.
+
+        """
+        if times < 0:
+            msg = "Repeat multipliers need to be positive"
+            raise ValueError(msg)
+        return self._derive(self._parts * times)
+
+    def scale_power(self, factor: float) -> "ComposedWorkout":
+        """Scale the powers of the workout.
+
+        The TSS of every block scales with the factor, so it is not computed
+        again.
+
+        Args:
+            factor: Power factor.
+
+        Returns:
+            Workout with the powers multiplied by the factor.
+
+        Raises:
+            ValueError: The factor is negative.
+
+        """
+        if factor < 0:
+            msg = "Power values need to be positive"
+            raise ValueError(msg)
+        return self._derive(
+            self._part(
+                _make_block(
+                    [_scale_power(x, factor) for x in part.block.intervals],
+                    part.block.repeats,
+                ),
+                part.tss * factor,
+            )
+            for part in self._parts
+        )
+
+    def scale_duration(self, factor: float) -> "ComposedWorkout":
+        """Scale the durations of the workout.
+
+        Interval durations are rounded to whole seconds. A
+        :class:`ValueError` is raised if a duration is rounded to zero, with
+        the same message as for a workout with a zero duration.
+
+        Args:
+            factor: Duration factor.
+
+        Returns:
+            Workout with the durations multiplied by the factor.
+
+        """
+        return self._derive(
+            self._part(
+                _make_block(
+                    [_scale_duration(x, factor) for x in part.block.intervals],
+                    part.block.repeats,
+                )
+            )
+            for part in self._parts
+        )
+
+    def slice(self, start: int, end: int) -> "ComposedWorkout":
+        """Return the part of the workout between two times.
+
+        Blocks within the times are kept. Blocks crossing the boundaries are
+        cut into whole repetitions and partial ones, and the powers of cut
+        ramps are interpolated.
+
+        Args:
+            start: Start time in seconds.
+            end: End time in seconds.
+
+        Returns:
+            Workout between the start and end times.
+
+        """
+        parts: list[Part] = []
+        offset = 0
+        for part in self._parts:
+            if offset >= end or start >= end:
+                break
+            if offset + part.duration > start:
+                if start <= offset and offset + part.duration <= end:
+                    parts.append(part)
+                else:
+                    parts.extend(
+                        map(
+                            self._part,
+                            self._cut_block(
+                                part.block,
+                                max(start - offset, 0),
+                                min(end - offset, part.duration),
+                            ),
+                        )
+                    )
+            offset += part.duration
+        return self._derive(parts)
+
+    def _cut_items(
+        self, items: "Sequence[Interval | Block]", start: int, end: int
+    ) -> list["Interval | Block"]:
+        """Return the parts of intervals and groups between two times.
+
+        Args:
+            items: Intervals and groups performed one after another.
+            start: Start time in seconds relative to the first item.
+            end: End time in seconds relative to the first item.
+
+        Returns:
+            Intervals and groups between the times.
+
+        """
+        cut: list[Interval | Block] = []
+        offset = 0
+        for item in items:
+            if isinstance(item, Block):
+                duration = self._block_to_duration(item)
+            else:
+                duration = item.duration
+            if offset < end and offset + duration > start:
+                item_start = max(start - offset, 0)
+                item_end = min(end - offset, duration)
+                if item_start == 0 and item_end == duration:
+                    cut.append(item)
+                elif isinstance(item, Block):
+                    cut.extend(self._cut_block(item, item_start, item_end))
+                else:
+                    cut.append(_cut_interval(item, item_start, item_end))
+            offset += duration
+        return cut
+
+    def _cut_block(self, block: Block, start: int, end: int) -> list[Block]:
+        """Return the part of a block between two times.
+
+        Args:
+            block: Block.
+            start: Start time in seconds relative to the block.
+            end: End time in seconds relative to the block.
+
+        Returns:
+            Partial repetition at the start, whole repetitions, and partial
+            repetition at the end, if any.
+
+        """
+        period = self._block_to_duration(block) // block.repeats
+        first, head = divmod(start, period)
+        last, tail = divmod(end, period)
+        if first == last:
+            return [_make_block(self._cut_items(block.intervals, head, tail))]
+        blocks: list[Block] = []
+        if head:
+            blocks.append(_make_block(self._cut_items(block.intervals, head, period)))
+            first += 1
+        if last > first:
+            blocks.append(_make_block(block.intervals, last - first))
+        if tail:
+            blocks.append(_make_block(self._cut_items(block.intervals, 0, tail)))
+        return blocks
+
+    @cached_property
+    def _pretty_workout(self) -> str:
+        """Return the workout as a string from the converted blocks."""
+        return "\n".join(part.pretty for part in self._parts)
+
+    @cached_property
+    def _tss(self) -> float:
+        """Return TSS from the converted blocks."""
+        return sum(part.tss for part in self._parts)
+
+    def _zwo_fragments(self) -> "Iterator[str]":
+        """Return the ZWO fragments of the blocks from the converted blocks.
+
+        The first and the last block are converted again, because they can be
+        a warmup and a cooldown.
+
+        Yields:
+            XML elements of the intervals of each block.
+
+        """
+        last = len(self._parts) - 1
+        for block_idx, part in enumerate(self._parts):
+            if block_idx in {0, last}:
+                yield self._block_to_zwo(
+                    part.block, first=block_idx == 0, last=block_idx == last
+                )
+            else:
+                yield part.zwo
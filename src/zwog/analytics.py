@@ -0,0 +1,182 @@
+"""Vectorized analytics over many workouts.
+
+Requires NumPy, which is installed with the ``analytics`` extra.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover
+    msg = "zwog.analytics requires NumPy, install zwog[analytics]"
+    raise ImportError(msg) from error
+
+from zwog.constants import POWER_ZONES, SECONDS_IN_HOUR
+from zwog.timeline import Timeline
+from zwog.utils import ZWOG, Block
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from numpy.typing import NDArray
+
+    from zwog.compact import CompactBlock
+
+
+@dataclass
+class Segments:
+    """Segments of many workouts packed into arrays.
+
+    Repeats are expanded as in :attr:`zwog.utils.ZWOG.timeline`, which matches
+    the ZWO output.
+    """
+
+    duration: "NDArray[np.float64]"
+    power_low: "NDArray[np.float64]"
+    power_high: "NDArray[np.float64]"
+    workout: "NDArray[np.intp]"
+    count: int
+
+
+@dataclass
+class Metrics:
+    """Metrics of many workouts, one element per workout."""
+
+    tss: "NDArray[np.float64]"
+    intensity_factor: "NDArray[np.float64]"
+    duration: "NDArray[np.float64]"
+
+
+def pack(
+    workouts: "Iterable[ZWOG | list[Block] | Iterable[CompactBlock]]",
+) -> Segments:
+    """Pack the segments of workouts into arrays.
+
+    Args:
+        workouts: Workouts as ZWOG objects, blocks, or compact blocks.
+
+    Returns:
+        Segments of the workouts. The ``workout`` array holds the index of the
+        workout each segment belongs to.
+
+    """
+    duration = array("d")
+    power_low = array("d")
+    power_high = array("d")
+    lengths = array("q")
+    for workout in workouts:
+        timeline = (
+            workout.timeline
+            if isinstance(workout, ZWOG)
+            else Timeline.from_blocks(workout)
+        )
+        duration.extend(timeline.duration)
+        power_low.extend(timeline.power_low)
+        power_high.extend(timeline.power_high)
+        lengths.append(len(timeline))
+    return Segments(
+        duration=np.frombuffer(duration, dtype=np.float64),
+        power_low=np.frombuffer(power_low, dtype=np.float64),
+        power_high=np.frombuffer(power_high, dtype=np.float64),
+        workout=np.repeat(
+            np.arange(len(lengths)), np.frombuffer(lengths, dtype=np.int64)
+        ),
+        count=len(lengths),
+    )
+
+
+def _sum_by_workout(
+    segments: Segments, weights: "NDArray[np.float64]"
+) -> "NDArray[np.float64]":
+    """Return the sums of segment weights per workout."""
+    return np.bincount(
+        segments.workout, weights=weights, minlength=segments.count
+    ).astype(np.float64, copy=False)
+
+
+def tss_many(
+    workouts: "Iterable[ZWOG | list[Block] | Iterable[CompactBlock]] | Segments",
+) -> Metrics:
+    """Calculate TSS, intensity factor, and duration for many workouts.
+
+    TSS is calculated as in :attr:`zwog.utils.ZWOG.tss`. The intensity factor
+    is the time-weighted average power in units of FTP, and it is zero for
+    empty workouts.
+
+    Args:
+        workouts: Workouts as ZWOG objects, blocks, or compact blocks, or their
+            packed segments.
+
+    Returns:
+        Metrics of the workouts.
+
+    """
+    segments = workouts if isinstance(workouts, Segments) else pack(workouts)
+    duration = _sum_by_workout(segments, segments.duration)
+    tss = _sum_by_workout(
+        segments,
+        segments.duration
+        * (segments.power_low + segments.power_high)
+        / (2 * SECONDS_IN_HOUR),
+    )
+    intensity_factor = np.divide(
+        tss * SECONDS_IN_HOUR,
+        duration * 100,
+        out=np.zeros_like(tss),
+        where=duration > 0,
+    )
+    return Metrics(tss=tss, intensity_factor=intensity_factor, duration=duration)
+
+
+def zones_many(
+    workouts: "Iterable[ZWOG | list[Block] | Iterable[CompactBlock]] | Segments",
+    boundaries: "Sequence[float]" = POWER_ZONES,
+) -> "NDArray[np.float64]":
+    """Calculate the time spent in each power zone for many workouts.
+
+    The times are calculated as in
+    :meth:`zwog.timeline.Timeline.time_in_zones`, that is, ramps are split
+    between the zones they cross in proportion to the power range in each
+    zone.
+
+    Args:
+        workouts: Workouts as ZWOG objects, blocks, or compact blocks, or their
+            packed segments.
+        boundaries: Strictly increasing zone boundaries in percent of FTP, by
+            default the lower bounds of the zones 2-7.
+
+    Returns:
+        Times in seconds with one row per workout and one column per zone.
+
+    Raises:
+        ValueError: The boundaries are not strictly increasing.
+
+    """
+    edges = np.asarray(boundaries, dtype=np.float64)
+    if np.any(np.diff(edges) <= 0):
+        msg = f"Zone boundaries {list(boundaries)} are not strictly increasing"
+        raise ValueError(msg)
+    segments = workouts if isinstance(workouts, Segments) else pack(workouts)
+    low = np.minimum(segments.power_low, segments.power_high)
+    high = np.maximum(segments.power_low, segments.power_high)
+    width = high - low
+    # fraction of each segment at or above each boundary, ramps are split
+    above = np.greater_equal(low[:, np.newaxis], edges).astype(np.float64)
+    ramp = width > 0
+    above[ramp] = np.clip(
+        (high[ramp, np.newaxis] - edges) / width[ramp, np.newaxis], 0, 1
+    )
+    above *= segments.duration[:, np.newaxis]
+
+    # the segments of a workout are contiguous, so they are summed with
+    # reduceat, which cannot handle empty workouts
+    counts = np.bincount(segments.workout, minlength=segments.count)
+    nonempty = counts > 0
+    sums = np.zeros((segments.count, len(edges) + 2))
+    sums[:, 0] = _sum_by_workout(segments, segments.duration)
+    sums[nonempty, 1:-1] = np.add.reduceat(
+        above, (np.cumsum(counts) - counts)[nonempty], axis=0
+    )
+    return sums[:, :-1] - sums[:, 1:]
@@ -0,0 +1,78 @@
+"""Generate the standalone workout parser.
+
+The parser in ``zwog/_parser.py`` is generated from
+:data:`zwog.constants.ZWOG_GRAMMAR` with the Lark standalone generator, so that
+importing zwog needs neither Lark nor a grammar compilation. Regenerate it after
+changing the grammar by running ``nox -s parser`` or
+``python -m zwog.build_parser`` (requires the ``lark`` extra).
+"""
+
+import argparse
+from hashlib import sha256
+from io import StringIO
+from pathlib import Path
+
+from lark import Lark
+from lark.tools.standalone import gen_standalone
+
+from zwog.constants import ZWOG_GRAMMAR
+
+PARSER_PATH = Path(__file__).with_name("_parser.py")
+
+HEADER = '''"""Standalone workout parser.
+
+Generated by ``python -m zwog.build_parser`` from ``zwog.constants.ZWOG_GRAMMAR``.
+Do not edit by hand.
+"""
+
+GRAMMAR_SHA256 = "{grammar_sha256}"
+
+'''
+
+
+def grammar_sha256() -> str:
+    """Return the SHA-256 digest of the workout grammar."""
+    return sha256(ZWOG_GRAMMAR.encode()).hexdigest()
+
+
+def build_lalr_parser() -> Lark:
+    """Return the workout parser compiled from the grammar."""
+    return Lark(ZWOG_GRAMMAR, start="workout", parser="lalr", maybe_placeholders=False)
+
+
+def generate_parser() -> str:
+    """Generate the source code of the standalone parser.
+
+    Returns:
+        Source code of the standalone parser module.
+
+    """
+    out = StringIO()
+    out.write(HEADER.format(grammar_sha256=grammar_sha256()))
+    gen_standalone(build_lalr_parser(), out=out)
+    return out.getvalue()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Write the standalone parser module.
+
+    Args:
+        argv: Command line arguments.
+
+    """
+    parser = argparse.ArgumentParser(description="Generate the workout parser")
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        action="store",
+        dest="output_file",
+        type=Path,
+        default=PARSER_PATH,
+        help="output filename",
+    )
+    options = parser.parse_args(argv)
+    options.output_file.write_text(generate_parser(), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
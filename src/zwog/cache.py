@@ -0,0 +1,273 @@
+"""Content-addressed cache of converted workouts."""
+
+import json
+import re
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import cache
+from hashlib import sha256
+from importlib.metadata import version
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Any, NamedTuple
+
+from zwog.compact import CompactBlock, from_compact, to_compact
+from zwog.utils import ZWOG, Block, Interval
+
+CACHE_FORMAT = 5
+
+# same characters as the WS terminal of the grammar, other whitespace such as
+# no-break spaces does not parse
+_WHITESPACE_CHARS = " \t\f\r\n"
+_WHITESPACE = re.compile(f"[{_WHITESPACE_CHARS}]+")
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Converted workout.
+
+    Entries are shared between callers, so the parsed workout is kept in the
+    immutable compact form.
+    """
+
+    blocks: tuple[CompactBlock, ...]
+    pretty: str
+    tss: float
+    zwo: bytes
+
+    @property
+    def workout(self) -> list[Block]:
+        """Get a copy of the parsed workout."""
+        return from_compact(self.blocks)
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics."""
+
+    hits: int
+    disk_hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def _block_from_dict(data: dict[str, Any]) -> Block:
+    """Return a block stored as a dictionary, with its nested groups."""
+    return Block(
+        intervals=[
+            _block_from_dict(x) if "intervals" in x else Interval(**x)
+            for x in data["intervals"]
+        ],
+        repeats=data["repeats"],
+    )
+
+
+@cache
+def _zwog_version() -> str:
+    """Return the installed zwog version, which is slow to look up."""
+    return version("zwog")
+
+
+def normalize_workout(workout: str) -> str:
+    """Return the workout with whitespace runs collapsed into single spaces.
+
+    Only the whitespace of the grammar is collapsed, so workouts that do not
+    parse never share a key with ones that do.
+    """
+    return _WHITESPACE.sub(" ", workout).strip(_WHITESPACE_CHARS)
+
+
+def cache_key(
+    workout: str,
+    author: str,
+    name: str,
+    category: str | None = None,
+    subcategory: str | None = None,
+) -> str:
+    """Return the cache key of a workout.
+
+    The key is the SHA-256 digest of the normalized workout, the metadata, the
+    cache format and the zwog version, so that entries are not shared between
+    versions that could convert workouts differently.
+
+    Args:
+        workout: Workout as a string.
+        author: Author.
+        name: Workout name.
+        category: Workout category.
+        subcategory: Workout subcategory.
+
+    Returns:
+        Hexadecimal cache key.
+
+    """
+    content = json.dumps(
+        [
+            CACHE_FORMAT,
+            _zwog_version(),
+            normalize_workout(workout),
+            author,
+            name,
+            category,
+            subcategory,
+        ]
+    )
+    return sha256(content.encode()).hexdigest()
+
+
+class WorkoutCache:
+    """Cache of converted workouts.
+
+    Entries are kept in a bounded in-memory LRU tier and, if a directory is
+    given, in an on-disk tier with one file per entry. Files are written
+    atomically, so several processes can share the directory.
+    """
+
+    def __init__(self, maxsize: int = 256, directory: str | Path | None = None) -> None:
+        """Initialize WorkoutCache.
+
+        Args:
+            maxsize: Maximum number of entries in memory.
+            directory: Directory of the on-disk tier. Not used if None.
+
+        """
+        self._maxsize = maxsize
+        self._directory = None if directory is None else Path(directory)
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        workout: str,
+        author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+        name: str = "Structured workout",
+        category: str | None = None,
+        subcategory: str | None = None,
+    ) -> CacheEntry:
+        """Return a converted workout, converting it on a miss.
+
+        Args:
+            workout: Workout as a string.
+            author: Author.
+            name: Workout name.
+            category: Workout category.
+            subcategory: Workout subcategory.
+
+        Returns:
+            Converted workout.
+
+        """
+        key = cache_key(workout, author, name, category, subcategory)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+
+        entry = self._load(key)
+        if entry is None:
+            zwog = ZWOG(workout, author, name, category, subcategory)
+            entry = CacheEntry(
+                blocks=to_compact(zwog.workout),
+                pretty=str(zwog),
+                tss=zwog.tss,
+                zwo=zwog.zwo_bytes,
+            )
+            self._store(key, entry)
+            with self._lock:
+                self._misses += 1
+        else:
+            with self._lock:
+                self._disk_hits += 1
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def cache_info(self) -> CacheInfo:
+        """Return the cache statistics."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._disk_hits,
+                self._misses,
+                self._maxsize,
+                len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Clear the in-memory tier and the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._disk_hits = self._misses = 0
+
+    def _path(self, key: str) -> Path | None:
+        """Return the path of an on-disk entry."""
+        return None if self._directory is None else self._directory / f"{key}.json"
+
+    def _load(self, key: str) -> CacheEntry | None:
+        """Return an on-disk entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached workout or None if the entry is missing or unreadable.
+
+        """
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return CacheEntry(
+                blocks=to_compact(_block_from_dict(block) for block in data["workout"]),
+                pretty=data["pretty"],
+                tss=data["tss"],
+                zwo=data["zwo"].encode("utf-8"),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry on disk.
+
+        The entry is written to a temporary file that is renamed in place, so
+        that other processes never read partial entries. Entries that cannot
+        be written are only kept in memory.
+
+        Args:
+            key: Cache key.
+            entry: Cached workout.
+
+        """
+        path = self._path(key)
+        if path is None:
+            return
+        data = {
+            "workout": [asdict(block) for block in entry.workout],
+            "pretty": entry.pretty,
+            "tss": entry.tss,
+            "zwo": entry.zwo.decode("utf-8"),
+        }
+        temporary = None
+        try:
+            with NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+            ) as file:
+                temporary = Path(file.name)
+                json.dump(data, file)
+            temporary.replace(path)
+        except OSError:
+            if temporary is not None:
+                temporary.unlink(missing_ok=True)
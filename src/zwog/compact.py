@@ -0,0 +1,129 @@
+"""Compact, immutable workout representation.
+
+:class:`CompactInterval` and :class:`CompactBlock` hold the same data as
+:class:`zwog.utils.Interval` and :class:`zwog.utils.Block`, but they are
+slotted and frozen, and ramp powers are ``(low, high)`` tuples. They are
+hashable, so that identical intervals and blocks of a workout library can be
+shared.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from zwog.utils import Block, Interval
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable
+
+    _T = TypeVar("_T", bound=Hashable)
+else:
+    _T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class CompactInterval:
+    """Immutable interval data."""
+
+    duration: int
+    power: float | tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactBlock:
+    """Immutable block data, possibly with nested groups."""
+
+    intervals: "tuple[CompactInterval | CompactBlock, ...]"
+    repeats: int = 1
+
+
+def _intern(pool: dict[Any, Any] | None, value: _T) -> _T:
+    """Return the pooled object equal to the value."""
+    return value if pool is None else pool.setdefault(value, value)
+
+
+def _to_compact_block(block: Block, pool: dict[Any, Any] | None) -> CompactBlock:
+    """Convert a block into a compact block.
+
+    Args:
+        block: Block.
+        pool: Objects to share, see :func:`to_compact`.
+
+    Returns:
+        Compact block.
+
+    """
+    return _intern(
+        pool,
+        CompactBlock(
+            intervals=tuple(
+                _to_compact_block(item, pool)
+                if isinstance(item, Block)
+                else _intern(
+                    pool,
+                    CompactInterval(
+                        duration=item.duration,
+                        power=(item.power[0], item.power[1])
+                        if isinstance(item.power, list)
+                        else item.power,
+                    ),
+                )
+                for item in block.intervals
+            ),
+            repeats=block.repeats,
+        ),
+    )
+
+
+def to_compact(
+    blocks: "Iterable[Block]", pool: dict[Any, Any] | None = None
+) -> tuple[CompactBlock, ...]:
+    """Convert blocks into the compact representation.
+
+    Args:
+        blocks: Workout.
+        pool: Objects to share between workouts. Equal intervals and blocks
+            are replaced with the objects already in the pool, and new ones
+            are added to it. Not used if None.
+
+    Returns:
+        Workout as compact blocks.
+
+    """
+    return tuple(_to_compact_block(block, pool) for block in blocks)
+
+
+def _from_compact_block(block: CompactBlock) -> Block:
+    """Convert a compact block into a block.
+
+    Args:
+        block: Compact block.
+
+    Returns:
+        Block.
+
+    """
+    return Block(
+        intervals=[
+            _from_compact_block(item)
+            if isinstance(item, CompactBlock)
+            else Interval(
+                duration=item.duration,
+                power=list(item.power) if isinstance(item.power, tuple) else item.power,
+            )
+            for item in block.intervals
+        ],
+        repeats=block.repeats,
+    )
+
+
+def from_compact(blocks: "Iterable[CompactBlock]") -> list[Block]:
+    """Convert compact blocks into blocks.
+
+    Args:
+        blocks: Workout as compact blocks.
+
+    Returns:
+        Workout.
+
+    """
+    return [_from_compact_block(block) for block in blocks]
@@ -2,7 +2,9 @@
 
 ZWOG_GRAMMAR = r"""workout: block*
 block: [repeats "x"] intervals
-intervals: interval~1 ("," interval)*
+intervals: item ("," item)*
+?item: interval|group
+group: "(" [repeats "x"] intervals ")" -> block
 interval: ramp|steady_state
 steady_state: durations "@" steady_state_power "%" "FTP"
 ramp: durations "from" ramp_power "%" "FTP"
@@ -10,13 +12,13 @@ durations: duration+
 duration: NUMBER TIME_UNIT
 time_unit: TIME_UNIT
 TIME_UNIT: "sec"|"s"|"min"|"m"|"hrs"|"h"
-repeats: INT
+repeats: REPEATS
+REPEATS.2: /[0-9]+(?=[ \t\f\r\n]*x)/
 steady_state_power: NUMBER -> power
 ramp_power: NUMBER "to" NUMBER -> power
 
 %ignore WS
 %import common.WS
-%import common.INT
 %import common.NUMBER
 """
 
@@ -24,3 +26,9 @@ SECONDS_IN_HOUR = 3600
 SECONDS_IN_MINUTE = 60
 
 INTERVALST_LENGTH = 2
+
+MAX_GROUP_DEPTH = 32  # levels of nested groups
+MAX_INTERVALS = 1_000_000  # intervals with the repeats expanded
+
+# lower bounds of the power zones 2-7 in percent of FTP (Coggan)
+POWER_ZONES = (55.0, 75.0, 90.0, 105.0, 120.0, 150.0)
@@ -0,0 +1,297 @@
+"""Output formats produced from the parsed blocks.
+
+An :class:`Emitter` receives the blocks of a workout one by one and returns
+its output at the end, so that :meth:`zwog.utils.ZWOG.emit` can produce
+several formats in one pass over the blocks::
+
+    zwo, mrc, segments = workout.emit(ZwoEmitter(), MrcEmitter(), JsonEmitter())
+
+Every block is passed as a :class:`BlockData`, whose text, ZWO fragment, and
+expanded intervals are computed at most once however many emitters use them.
+
+ZWO, the workout as text, ERG and MRC course files, and a JSON segment list
+are built in.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from functools import cached_property
+from io import StringIO
+from itertools import accumulate, pairwise
+from typing import TYPE_CHECKING
+
+from zwog.constants import SECONDS_IN_MINUTE
+from zwog.utils import Block, iter_intervals
+
+if TYPE_CHECKING:
+    from zwog.utils import ZWOG
+
+
+class BlockData:
+    """Block of a workout with the views shared by the emitters.
+
+    Every view is computed on first access, so that a view that no emitter
+    uses costs nothing and a view that several emitters use is computed once.
+    """
+
+    def __init__(
+        self, workout: "ZWOG", block: Block, start: int, *, first: bool, last: bool
+    ) -> None:
+        """Initialize BlockData.
+
+        Args:
+            workout: Workout of the block.
+            block: Block.
+            start: Start of the block in seconds from the start of the workout.
+            first: Whether the block is the first one of the workout.
+            last: Whether the block is the last one of the workout.
+
+        """
+        self.workout = workout
+        self.block = block
+        self.start = start
+        self.first = first
+        self.last = last
+
+    @cached_property
+    def pretty(self) -> str:
+        """Get the block as a line of the workout as a string."""
+        return self.workout._block_to_pretty(self.block)  # noqa: SLF001
+
+    @cached_property
+    def zwo(self) -> str:
+        """Get the block as a ZWO fragment."""
+        return self.workout._block_to_zwo(  # noqa: SLF001
+            self.block, first=self.first, last=self.last
+        )
+
+    @cached_property
+    def intervals(self) -> list[tuple[int, float, float]]:
+        """Get the durations and powers of the intervals of one repeat.
+
+        Nested groups are expanded. The powers are at the start and at the end
+        of the interval, in percent of FTP.
+        """
+        return [
+            (interval.duration, interval.power[0], interval.power[1])
+            if isinstance(interval.power, list)
+            else (interval.duration, interval.power, interval.power)
+            for interval in iter_intervals(Block(self.block.intervals))
+        ]
+
+    @cached_property
+    def starts(self) -> list[int]:
+        """Get the starts of the intervals with the repeats expanded.
+
+        The times are in seconds from the start of the workout and followed by
+        the end of the block.
+        """
+        return list(
+            accumulate(
+                (duration for duration, _, _ in self.intervals * self.block.repeats),
+                initial=self.start,
+            )
+        )
+
+    @cached_property
+    def minutes(self) -> list[str]:
+        """Get :attr:`starts` in minutes, as written in course files."""
+        return [f"{start / SECONDS_IN_MINUTE:.2f}" for start in self.starts]
+
+
+class Emitter(ABC):
+    """Producer of an output format.
+
+    :meth:`begin` is called first, then :meth:`block` for every block in
+    order, and :meth:`end` returns the output. An emitter can be reused after
+    :meth:`end`.
+    """
+
+    workout: "ZWOG"
+
+    def begin(self, workout: "ZWOG") -> None:
+        """Start a workout.
+
+        Args:
+            workout: Workout, for its metadata.
+
+        """
+        self.workout = workout
+
+    @abstractmethod
+    def block(self, data: BlockData) -> None:
+        """Process a block.
+
+        Args:
+            data: Block and its views.
+
+        """
+
+    @abstractmethod
+    def end(self) -> str:
+        """Return the output of the workout."""
+
+
+class PrettyEmitter(Emitter):
+    """Workout as a string, the same as ``str(workout)``."""
+
+    def begin(self, workout: "ZWOG") -> None:
+        """Start a workout."""
+        super().begin(workout)
+        self._lines: list[str] = []
+
+    def block(self, data: BlockData) -> None:
+        """Collect the line of a block."""
+        self._lines.append(data.pretty)
+
+    def end(self) -> str:
+        """Return the workout as a string."""
+        return "\n".join(self._lines)
+
+
+class ZwoEmitter(Emitter):
+    """ZWO document, the same as :attr:`zwog.utils.ZWOG.zwo_workout`."""
+
+    def begin(self, workout: "ZWOG") -> None:
+        """Start a workout."""
+        super().begin(workout)
+        self._lines: list[str] = []
+        self._fragments: list[str] = []
+
+    def block(self, data: BlockData) -> None:
+        """Collect the line, for the description, and the ZWO fragment of a block."""
+        self._lines.append(data.pretty)
+        self._fragments.append(data.zwo)
+
+    def end(self) -> str:
+        """Return the ZWO document."""
+        document = StringIO()
+        self.workout._write_zwo(  # noqa: SLF001
+            document.write, "\n".join(self._lines), self._fragments
+        )
+        document.write("\n")
+        return document.getvalue()
+
+
+class _CourseEmitter(Emitter):
+    """Course file with a power point at both ends of every interval."""
+
+    units = "PERCENT"
+
+    def __init__(self, ftp: int | None = None) -> None:
+        """Initialize the emitter.
+
+        Args:
+            ftp: Functional threshold power in watts. Powers are written in
+                percent of FTP if None.
+
+        """
+        self.ftp = ftp
+
+    def begin(self, workout: "ZWOG") -> None:
+        """Start a workout."""
+        super().begin(workout)
+        self._lines: list[str] = []
+        self._values: dict[float, str] = {}
+
+    def _value(self, power: float) -> str:
+        """Return a power in percent of FTP in the units of the file."""
+        if (value := self._values.get(power)) is None:
+            value = self._values[power] = (
+                f"{power:g}" if self.ftp is None else str(round(self.ftp * power / 100))
+            )
+        return value
+
+    def block(self, data: BlockData) -> None:
+        """Convert the intervals of a block into power points."""
+        value = self._value
+        values = [
+            (value(power_low), value(power_high))
+            for _, power_low, power_high in data.intervals
+        ] * data.block.repeats
+        self._lines.extend(
+            f"{start}\t{low}\n{end}\t{high}"
+            for (start, end), (low, high) in zip(
+                pairwise(data.minutes), values, strict=True
+            )
+        )
+
+    def end(self) -> str:
+        name = " ".join(self.workout.name.split())
+        return "\n".join(
+            [
+                "[COURSE HEADER]",
+                "VERSION = 2",
+                "UNITS = ENGLISH",
+                f"DESCRIPTION = {name}",
+                f"FILE NAME = {name}",
+                *([] if self.ftp is None else [f"FTP = {self.ftp}"]),
+                f"MINUTES {self.units}",
+                "[END COURSE HEADER]",
+                "[COURSE DATA]",
+                *self._lines,
+                "[END COURSE DATA]",
+                "",
+            ]
+        )
+
+
+class MrcEmitter(_CourseEmitter):
+    """MRC course file with powers in percent of FTP."""
+
+    def __init__(self) -> None:
+        """Initialize MrcEmitter."""
+        super().__init__()
+
+
+class ErgEmitter(_CourseEmitter):
+    """ERG course file with powers in watts."""
+
+    units = "WATTS"
+
+    def __init__(self, ftp: int) -> None:
+        """Initialize ErgEmitter.
+
+        Args:
+            ftp: Functional threshold power in watts.
+
+        """
+        super().__init__(ftp)
+
+
+class JsonEmitter(Emitter):
+    """JSON object with the metadata and the segments with repeats expanded.
+
+    Segments have the fields of :class:`zwog.timeline.Segment`.
+    """
+
+    def begin(self, workout: "ZWOG") -> None:
+        """Start a workout."""
+        super().begin(workout)
+        self._segments: list[dict[str, float]] = []
+
+    def block(self, data: BlockData) -> None:
+        """Convert the intervals of a block into segments."""
+        self._segments.extend(
+            {
+                "start": start,
+                "duration": duration,
+                "power_low": power_low,
+                "power_high": power_high,
+            }
+            for start, (duration, power_low, power_high) in zip(
+                data.starts, data.intervals * data.block.repeats, strict=False
+            )
+        )
+
+    def end(self) -> str:
+        """Return the JSON document."""
+        return json.dumps(
+            {
+                "author": self.workout.author,
+                "name": self.workout.name,
+                "category": self.workout.category,
+                "subcategory": self.workout.subcategory,
+                "segments": self._segments,
+            }
+        )
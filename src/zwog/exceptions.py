@@ -0,0 +1,28 @@
+"""Exceptions raised while parsing workouts.
+
+Workouts are parsed by the standalone parser generated into
+:mod:`zwog._parser`, so parse errors are the exception classes of that
+module, re-exported here, and not those of :mod:`lark.exceptions`. Catch
+:class:`LarkError` from this module, or one of its subclasses
+:class:`UnexpectedInput`, :class:`UnexpectedCharacters`,
+:class:`UnexpectedToken`, and :class:`UnexpectedEOF`. Invalid values, such
+as zero durations, are reported as a :class:`LarkError` too, wrapping the
+:class:`ValueError` of the rule, and groups nested too deep raise
+:class:`ValueError`.
+"""
+
+from zwog._parser import (
+    LarkError,
+    UnexpectedCharacters,
+    UnexpectedEOF,
+    UnexpectedInput,
+    UnexpectedToken,
+)
+
+__all__ = [
+    "LarkError",
+    "UnexpectedCharacters",
+    "UnexpectedEOF",
+    "UnexpectedInput",
+    "UnexpectedToken",
+]
@@ -0,0 +1,299 @@
+"""Import of ZWO files.
+
+:func:`read_zwo` reads ``SteadyState``, ``Ramp``, ``Warmup``, ``Cooldown``,
+and ``IntervalsT`` elements back into :class:`zwog.utils.Block` and
+:class:`zwog.utils.Interval`. The file is parsed with
+:func:`xml.etree.ElementTree.iterparse`, and every element is cleared as soon
+as it is converted, so that memory use does not grow with the size of the
+file apart from the blocks themselves.
+
+The workout model does not tell a warmup or a cooldown from a ramp at the
+start or at the end of a workout, so a lone ``Ramp`` element at either end is
+imported together with its neighbor, and ZWOG writes the same elements again.
+"""
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from zwog.algebra import ComposedWorkout
+from zwog.utils import Block, Interval, _format_error, _map_jobs, _WorkoutRules
+
+METADATA = ("author", "name", "category", "subcategory")
+# elements that are merged into a repeated block when repeated in a row
+MERGEABLE = ("SteadyState", "Ramp")
+
+
+@dataclass
+class ImportResult:
+    """Result of importing a ZWO file."""
+
+    input_file: Path
+    workout: ComposedWorkout | None = None
+    error: str | None = None
+
+
+def _duration(attributes: dict[str, str], name: str) -> int:
+    """Return a duration attribute in seconds.
+
+    Args:
+        attributes: Attributes of the element.
+        name: Attribute name.
+
+    Returns:
+        Duration rounded to whole seconds.
+
+    Raises:
+        ValueError: The duration is not strictly positive.
+
+    """
+    duration = round(float(attributes[name]))
+    if duration <= 0:
+        msg = "Interval duration values need to be strictly positive"
+        raise ValueError(msg)
+    return duration
+
+
+def _power(attributes: dict[str, str], name: str) -> float:
+    """Return a power attribute in percent of FTP.
+
+    Args:
+        attributes: Attributes of the element.
+        name: Attribute name.
+
+    Returns:
+        Power in percent of FTP.
+
+    Raises:
+        ValueError: The power is negative.
+
+    """
+    # round away floating point noise, e.g. 0.275 * 100 == 27.500000000000004
+    power = round(float(attributes[name]) * 100, 9)
+    if power < 0:
+        msg = "Power values need to be positive"
+        raise ValueError(msg)
+    return power
+
+
+def _repeats(attributes: dict[str, str]) -> int:
+    """Return the repeat count of an element, validated like a parsed one.
+
+    A :class:`ValueError` is raised if the count is not a strictly positive
+    integer.
+
+    Args:
+        attributes: Attributes of the element.
+
+    Returns:
+        Repeat count, 1 if the attribute is missing.
+
+    """
+    _, repeats = _WorkoutRules.repeats([int(attributes.get("Repeat", "1"))])
+    return repeats
+
+
+def element_to_block(tag: str, attributes: dict[str, str]) -> Block:
+    """Convert a ZWO workout element into a block.
+
+    Args:
+        tag: Element tag.
+        attributes: Element attributes.
+
+    Returns:
+        Block of the element.
+
+    Raises:
+        ValueError: The element is not supported or an attribute is missing.
+
+    """
+    try:
+        if tag == "SteadyState":
+            power_name = "Power" if "Power" in attributes else "PowerLow"
+            return Block(
+                [
+                    Interval(
+                        _duration(attributes, "Duration"),
+                        _power(attributes, power_name),
+                    )
+                ]
+            )
+        if tag in {"Ramp", "Warmup", "Cooldown"}:
+            return Block(
+                [
+                    Interval(
+                        _duration(attributes, "Duration"),
+                        [
+                            _power(attributes, "PowerLow"),
+                            _power(attributes, "PowerHigh"),
+                        ],
+                    )
+                ]
+            )
+        if tag == "IntervalsT":
+            return Block(
+                [
+                    Interval(
+                        _duration(attributes, "OnDuration"),
+                        _power(attributes, "OnPower"),
+                    ),
+                    Interval(
+                        _duration(attributes, "OffDuration"),
+                        _power(attributes, "OffPower"),
+                    ),
+                ],
+                _repeats(attributes),
+            )
+    except KeyError as error:
+        msg = f"Missing attribute {error.args[0]} of {tag}"
+        raise ValueError(msg) from None
+    msg = f"Unsupported ZWO element: {tag}"
+    raise ValueError(msg)
+
+
+def _iter_elements(
+    source: str | Path | BinaryIO, metadata: dict[str, str]
+) -> Iterator[tuple[str, dict[str, str]]]:
+    """Iterate over the workout elements of a ZWO file.
+
+    Args:
+        source: Filename or binary file-like object.
+        metadata: Dictionary to which the metadata of the workout is added.
+
+    Yields:
+        Tags and attributes of the workout elements.
+
+    """
+    from xml.etree.ElementTree import iterparse  # noqa: PLC0415, S405
+
+    path: list[str] = []
+    parents = []
+    for event, element in iterparse(source, events=("start", "end")):  # noqa: S314
+        if event == "start":
+            path.append(element.tag)
+            parents.append(element)
+            continue
+        path.pop()
+        parents.pop()
+        if path == ["workout_file", "workout"]:
+            yield element.tag, dict(element.attrib)
+            # drop the converted element and its text events
+            parents[-1].clear()
+        elif path == ["workout_file"]:
+            if element.tag in METADATA:
+                metadata[element.tag] = element.text or ""
+            parents[-1].clear()
+
+
+def _merge_edges(blocks: list[Block], tags: list[str]) -> list[Block]:
+    """Merge lone ramps at the ends of a workout into their neighbors.
+
+    Args:
+        blocks: Blocks.
+        tags: Tags of the elements of the blocks.
+
+    Returns:
+        Blocks written as the same elements.
+
+    """
+
+    def items(block: Block) -> "list[Interval | Block]":
+        return list(block.intervals) if block.repeats == 1 else [block]
+
+    def is_lone_ramp(idx: int) -> bool:
+        return tags[idx] == "Ramp" and blocks[idx].repeats == 1
+
+    def can_merge(idx: int) -> bool:
+        # an IntervalsT element without repeats would be inlined
+        return not (tags[idx] == "IntervalsT" and blocks[idx].repeats == 1)
+
+    first, last = 0, len(blocks) - 1
+    if last > first and is_lone_ramp(last) and can_merge(last - 1):
+        blocks[-2:] = [Block([*items(blocks[-2]), *blocks[-1].intervals])]
+        last -= 1
+    if last > first and is_lone_ramp(first) and can_merge(first + 1):
+        blocks[:2] = [Block([*blocks[0].intervals, *items(blocks[1])])]
+    return blocks
+
+
+def read_zwo(source: str | Path | BinaryIO) -> ComposedWorkout:
+    """Read a workout from a ZWO file.
+
+    Repeated ``SteadyState`` and ``Ramp`` elements become repeated blocks, and
+    every ``IntervalsT`` element becomes a repeated block of two intervals.
+
+    Args:
+        source: Filename or binary file-like object.
+
+    Returns:
+        Workout with the metadata of the file. The author and the name
+        default to those of :class:`zwog.utils.ZWOG`.
+
+    """
+    metadata: dict[str, str] = {}
+    blocks: list[Block] = []
+    tags: list[str] = []
+    for tag, attributes in _iter_elements(source, metadata):
+        block = element_to_block(tag, attributes)
+        if tag in MERGEABLE and tags and tags[-1] == tag:
+            previous = blocks[-1]
+            if previous.intervals == block.intervals:
+                previous.repeats += 1
+                continue
+        blocks.append(block)
+        tags.append(tag)
+    return ComposedWorkout.from_blocks(_merge_edges(blocks, tags), **metadata)
+
+
+def _read_zwo_file(input_file: Path) -> ImportResult:
+    """Read a workout from a ZWO file and report errors in the result.
+
+    Args:
+        input_file: ZWO file.
+
+    Returns:
+        Import result.
+
+    """
+    try:
+        return ImportResult(input_file, read_zwo(input_file))
+    except Exception as error:  # noqa: BLE001
+        return ImportResult(input_file, error=_format_error(error))
+
+
+def read_zwo_files(
+    input_files: Iterable[Path], jobs: int | None = 1
+) -> Iterator[ImportResult]:
+    """Read workouts from ZWO files.
+
+    Args:
+        input_files: ZWO files.
+        jobs: Number of worker processes. None uses all CPUs.
+
+    Yields:
+        Import results in the order of the input files. Errors are reported
+        in the results instead of being raised.
+
+    """
+    yield from _map_jobs(_read_zwo_file, input_files, jobs=jobs)
+
+
+def read_zwo_directory(
+    directory: Path, jobs: int | None = 1, *, recursive: bool = False
+) -> Iterator[ImportResult]:
+    """Read the workouts of the ZWO files in a directory.
+
+    Args:
+        directory: Directory.
+        jobs: Number of worker processes. None uses all CPUs.
+        recursive: Whether to read the files in subdirectories as well.
+
+    Returns:
+        Import results sorted by filename, see :func:`read_zwo_files`.
+
+    """
+    pattern = "**/*.zwo" if recursive else "*.zwo"
+    return read_zwo_files(
+        sorted(x for x in directory.glob(pattern) if x.is_file()), jobs
+    )
@@ -0,0 +1,589 @@
+"""SQLite index of workout libraries.
+
+:class:`WorkoutIndex` scans directories of workout texts and ZWO files, and
+stores the segments and the metrics of every workout in a SQLite database:
+the duration, TSS, intensity factor, maximum power, and the time spent in
+each power zone. Queries then read the metrics instead of converting the
+workouts again.
+
+Updates are incremental. Files whose modification time and size did not
+change are skipped, and files that changed are only converted again if their
+SHA-256 digest changed.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from hashlib import sha256
+from importlib.metadata import version
+from io import BytesIO
+from pathlib import Path
+from typing import Any, NoReturn
+
+from zwog.constants import POWER_ZONES, SECONDS_IN_HOUR, SECONDS_IN_MINUTE
+from zwog.importer import read_zwo
+from zwog.timeline import Segment, Timeline
+from zwog.utils import ZWOG, _format_error, _map_jobs
+
+INDEX_FORMAT = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS workouts (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    author TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    subcategory TEXT,
+    text TEXT NOT NULL,
+    duration REAL NOT NULL,
+    tss REAL NOT NULL,
+    intensity_factor REAL NOT NULL,
+    max_power REAL NOT NULL,
+    zones TEXT NOT NULL,
+    {zone_columns}
+);
+CREATE INDEX IF NOT EXISTS workouts_duration ON workouts (duration);
+CREATE INDEX IF NOT EXISTS workouts_tss ON workouts (tss);
+CREATE INDEX IF NOT EXISTS workouts_max_power ON workouts (max_power);
+CREATE TABLE IF NOT EXISTS segments (
+    workout_id INTEGER NOT NULL REFERENCES workouts (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    power_low REAL NOT NULL,
+    power_high REAL NOT NULL,
+    PRIMARY KEY (workout_id, position)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = (
+    "path, mtime_ns, size, hash, author, name, category, subcategory, text, "
+    "duration, tss, intensity_factor, max_power, zones"
+)
+
+# time above a power in a segment, with the power as the only parameter
+_SEGMENT_TIME_ABOVE = """
+CASE WHEN power_low = power_high THEN
+    CASE WHEN power_low >= :power THEN duration ELSE 0 END
+ELSE
+    duration * max(0, min(1, (max(power_low, power_high) - :power)
+                              / abs(power_high - power_low)))
+END
+"""
+
+
+@dataclass
+class IndexStats:
+    """Statistics of an index update."""
+
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    errors: list[tuple[Path, str]] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class IndexedWorkout:
+    """Workout in the index."""
+
+    path: Path
+    author: str
+    name: str
+    category: str | None
+    subcategory: str | None
+    text: str
+    duration: float
+    tss: float
+    intensity_factor: float
+    max_power: float
+    zones: tuple[float, ...]
+
+
+@dataclass(frozen=True)
+class _Record:
+    """Converted workout file to be stored."""
+
+    hash: str
+    author: str
+    name: str
+    category: str | None
+    subcategory: str | None
+    text: str
+    tss: float
+    timeline: Timeline
+
+
+def _convert(path: Path, known_hash: str | None) -> _Record | str | None:
+    """Convert a workout file.
+
+    Args:
+        path: Workout text or ZWO file.
+        known_hash: Digest of the file in the index, if any.
+
+    Returns:
+        Converted file, None if its digest is the known one, or the error
+        message if the file cannot be converted.
+
+    """
+    try:
+        content = path.read_bytes()
+        digest = sha256(content).hexdigest()
+        if digest == known_hash:
+            return None
+        workout: ZWOG
+        if path.suffix == ".zwo":
+            workout = read_zwo(BytesIO(content))
+        else:
+            workout = ZWOG(content.decode("utf-8"), name=path.stem)
+        return _Record(
+            hash=digest,
+            author=workout.author,
+            name=workout.name,
+            category=workout.category,
+            subcategory=workout.subcategory,
+            text=str(workout),
+            tss=workout.tss,
+            timeline=workout.timeline,
+        )
+    except Exception as error:  # noqa: BLE001
+        return _format_error(error)
+
+
+def _convert_all(
+    files: list[tuple[Path, str | None]], jobs: int | None
+) -> Iterator[_Record | str | None]:
+    """Convert workout files, in worker processes unless ``jobs`` is 1.
+
+    Args:
+        files: Files with their digests in the index.
+        jobs: Number of worker processes. None uses all CPUs.
+
+    Yields:
+        Results of :func:`_convert` in the order of the files.
+
+    """
+    paths = [path for path, _ in files]
+    digests = [digest for _, digest in files]
+    yield from _map_jobs(_convert, paths, digests, jobs=jobs if len(files) > 1 else 1)
+
+
+class WorkoutIndex:
+    """SQLite index of workout files.
+
+    The index is rebuilt from scratch if it was written by another version of
+    zwog or with other zone boundaries.
+    """
+
+    def __init__(
+        self, database: str | Path, zones: Sequence[float] = POWER_ZONES
+    ) -> None:
+        """Initialize WorkoutIndex.
+
+        Args:
+            database: Database filename, created if it does not exist.
+            zones: Zone boundaries in percent of FTP, see
+                :meth:`zwog.timeline.Timeline.time_in_zones`.
+
+        """
+        self.database = Path(database)
+        self.zones = tuple(float(x) for x in zones)
+        self._connection = sqlite3.connect(self.database)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._setup()
+
+    def _setup(self) -> None:
+        """Create the tables, dropping those of an incompatible index."""
+        meta = {
+            "format": str(INDEX_FORMAT),
+            "version": version("zwog"),
+            "zones": json.dumps(self.zones),
+        }
+        with self._connection:
+            try:
+                stored = dict(self._connection.execute("SELECT key, value FROM meta"))
+            except sqlite3.OperationalError:
+                stored = {}
+            if stored != meta:
+                self._connection.executescript(
+                    "DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS workouts;"
+                    "DROP TABLE IF EXISTS meta;"
+                )
+            zone_columns = ",\n    ".join(
+                f"zone_{idx} REAL NOT NULL" for idx in range(len(self.zones) + 1)
+            )
+            self._connection.executescript(_SCHEMA.format(zone_columns=zone_columns))
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items()
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "WorkoutIndex":
+        """Return the index."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the database."""
+        self.close()
+
+    def _scan(self, directory: Path, *, recursive: bool) -> list[Path]:
+        """Return the workout files of a directory.
+
+        Hidden files and the files of the database are skipped.
+
+        Args:
+            directory: Directory.
+            recursive: Whether to include subdirectories.
+
+        Returns:
+            Filenames.
+
+        """
+        database = self.database.resolve()
+        return sorted(
+            path
+            for path in directory.glob("**/*" if recursive else "*")
+            if path.is_file()
+            and not any(x.startswith(".") for x in path.relative_to(directory).parts)
+            and not (
+                path.parent == database.parent and path.name.startswith(database.name)
+            )
+        )
+
+    def update(
+        self, directory: str | Path, *, recursive: bool = False, jobs: int | None = 1
+    ) -> IndexStats:
+        """Index the workout files of a directory.
+
+        Files with the ``.zwo`` suffix are read as ZWO files, see
+        :func:`zwog.importer.read_zwo`, and other files as workout texts named
+        after the file. Workouts of files that no longer exist are removed,
+        among the files of the directory, and of its subdirectories if
+        ``recursive``.
+
+        Args:
+            directory: Directory.
+            recursive: Whether to include subdirectories.
+            jobs: Number of worker processes. None uses all CPUs.
+
+        Returns:
+            Update statistics. Files that cannot be converted are reported in
+            the statistics and are not indexed.
+
+        """
+        directory = Path(directory).resolve()
+        stats = IndexStats()
+        known = {
+            Path(path): (mtime_ns, size, digest)
+            for path, mtime_ns, size, digest in self._connection.execute(
+                "SELECT path, mtime_ns, size, hash FROM workouts"
+            )
+            # only the files that are scanned again can be removed
+            if (
+                Path(path).is_relative_to(directory)
+                if recursive
+                else Path(path).parent == directory
+            )
+        }
+        changed: list[tuple[Path, str | None]] = []
+        status: dict[Path, tuple[int, int]] = {}
+        for path in self._scan(directory, recursive=recursive):
+            stat = path.stat()
+            status[path] = (stat.st_mtime_ns, stat.st_size)
+            mtime_ns, size, digest = known.get(path, (None, None, None))
+            if (mtime_ns, size) == status[path]:
+                stats.unchanged += 1
+            else:
+                changed.append((path, digest))
+
+        with self._connection:
+            removed = [str(x) for x in known if x not in status]
+            self._connection.executemany(
+                "DELETE FROM workouts WHERE path = ?", ((x,) for x in removed)
+            )
+            stats.removed = len(removed)
+            for (path, digest), result in zip(
+                changed, _convert_all(changed, jobs), strict=True
+            ):
+                if isinstance(result, str):
+                    stats.errors.append((path, result))
+                    self._connection.execute(
+                        "DELETE FROM workouts WHERE path = ?", (str(path),)
+                    )
+                elif result is None:
+                    stats.unchanged += 1
+                    self._connection.execute(
+                        "UPDATE workouts SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (*status[path], str(path)),
+                    )
+                else:
+                    self._store(path, status[path], result)
+                    if digest is None:
+                        stats.added += 1
+                    else:
+                        stats.updated += 1
+        return stats
+
+    def _store(self, path: Path, status: tuple[int, int], record: _Record) -> None:
+        """Store a converted workout file, replacing the previous one.
+
+        Args:
+            path: Workout file.
+            status: Modification time in nanoseconds and size of the file.
+            record: Converted file.
+
+        """
+        timeline = record.timeline
+        duration = timeline.total_duration
+        zones = timeline.time_in_zones(self.zones)
+        max_power = max((*timeline.power_low, *timeline.power_high), default=0.0)
+        intensity_factor = (
+            record.tss * SECONDS_IN_HOUR / (duration * 100) if duration else 0.0
+        )
+        self._connection.execute("DELETE FROM workouts WHERE path = ?", (str(path),))
+        zone_names = ", ".join(f"zone_{idx}" for idx in range(len(zones)))
+        cursor = self._connection.execute(
+            f"INSERT INTO workouts ({_COLUMNS}, {zone_names}) "  # noqa: S608
+            f"VALUES ({', '.join('?' * (14 + len(zones)))})",
+            (
+                str(path),
+                *status,
+                record.hash,
+                record.author,
+                record.name,
+                record.category,
+                record.subcategory,
+                record.text,
+                duration,
+                record.tss,
+                intensity_factor,
+                max_power,
+                json.dumps(zones),
+                *zones,
+            ),
+        )
+        self._connection.executemany(
+            "INSERT INTO segments VALUES (?, ?, ?, ?, ?)",
+            (
+                (cursor.lastrowid, position, *segment)
+                for position, segment in enumerate(
+                    zip(
+                        timeline.duration,
+                        timeline.power_low,
+                        timeline.power_high,
+                        strict=True,
+                    )
+                )
+            ),
+        )
+
+    def query(
+        self,
+        *,
+        min_duration: float | None = None,
+        max_duration: float | None = None,
+        min_tss: float | None = None,
+        max_tss: float | None = None,
+        max_power: float | None = None,
+        time_above: tuple[float, float] | None = None,
+    ) -> list[IndexedWorkout]:
+        """Return the indexed workouts that match all the given conditions.
+
+        Args:
+            min_duration: Minimum duration in seconds.
+            max_duration: Maximum duration in seconds.
+            min_tss: Minimum TSS.
+            max_tss: Maximum TSS.
+            max_power: Maximum of the highest power in percent of FTP.
+            time_above: Power in percent of FTP and minimum time in seconds
+                spent at or above it. Zone boundaries are answered from the
+                zone times, and other powers from the stored segments.
+
+        Returns:
+            Workouts ordered by path.
+
+        """
+        conditions: list[str] = []
+        parameters: dict[str, Any] = {}
+        for column, operator, value in [
+            ("duration", ">=", min_duration),
+            ("duration", "<=", max_duration),
+            ("tss", ">=", min_tss),
+            ("tss", "<=", max_tss),
+            ("max_power", "<=", max_power),
+        ]:
+            if value is not None:
+                conditions.append(f"{column} {operator} :{column}{len(conditions)}")
+                parameters[f"{column}{len(conditions) - 1}"] = value
+        if time_above is not None:
+            power, seconds = time_above
+            parameters.update(power=power, seconds=seconds)
+            if power in self.zones:
+                first = self.zones.index(power) + 1
+                above = " + ".join(
+                    f"zone_{idx}" for idx in range(first, len(self.zones) + 1)
+                )
+            else:
+                above = (
+                    f"(SELECT coalesce(sum({_SEGMENT_TIME_ABOVE}), 0) "  # noqa: S608
+                    "FROM segments WHERE workout_id = workouts.id)"
+                )
+            # allow for the rounding of the zone times
+            conditions.append(f"{above} >= :seconds - 1e-6")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self._connection.execute(
+            f"SELECT path, author, name, category, subcategory, text, duration, "  # noqa: S608
+            f"tss, intensity_factor, max_power, zones FROM workouts {where} "
+            "ORDER BY path",
+            parameters,
+        )
+        cursor.row_factory = sqlite3.Row
+        return [
+            IndexedWorkout(
+                **{
+                    **dict(row),
+                    "path": Path(row["path"]),
+                    "zones": tuple(json.loads(row["zones"])),
+                }
+            )
+            for row in cursor
+        ]
+
+    def segments(self, path: str | Path) -> list[Segment]:
+        """Return the stored segments of an indexed workout.
+
+        Args:
+            path: Workout file.
+
+        Returns:
+            Segments as in :attr:`zwog.utils.ZWOG.timeline`, or an empty list
+            if the file is not indexed.
+
+        """
+        start = 0.0
+        segments = []
+        for duration, power_low, power_high in self._connection.execute(
+            "SELECT segments.duration, power_low, power_high FROM segments "
+            "JOIN workouts ON workouts.id = workout_id WHERE path = ? "
+            "ORDER BY position",
+            (str(Path(path).resolve()),),
+        ):
+            segments.append(Segment(start, duration, power_low, power_high))
+            start += duration
+        return segments
+
+
+def _range(values: Sequence[float] | None, scale: float) -> tuple[Any, Any]:
+    """Return the bounds of a range option."""
+    return (None, None) if values is None else (values[0] * scale, values[1] * scale)
+
+
+def main(argv: list[str] | None = None) -> NoReturn:
+    """Index command line interface.
+
+    Args:
+        argv: Command line arguments.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="zwog index",
+        description="Index a directory of workout texts and ZWO files, and "
+        "query the index",
+    )
+    parser.add_argument("directory", type=Path, help="workout directory")
+    parser.add_argument(
+        "-D",
+        "--database",
+        type=Path,
+        default=None,
+        help="index database (default: DIRECTORY/.zwog-index.sqlite)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="include subdirectories"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 uses all CPUs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="query the index without scanning the directory",
+    )
+    parser.add_argument(
+        "--duration",
+        nargs=2,
+        type=float,
+        metavar=("MIN", "MAX"),
+        help="list workouts between MIN and MAX minutes",
+    )
+    parser.add_argument(
+        "--tss",
+        nargs=2,
+        type=float,
+        metavar=("MIN", "MAX"),
+        help="list workouts with TSS between MIN and MAX",
+    )
+    parser.add_argument(
+        "--above",
+        nargs=2,
+        type=float,
+        metavar=("PERCENT", "MINUTES"),
+        help="list workouts with at least MINUTES at or above PERCENT of FTP",
+    )
+    options = parser.parse_args(argv)
+    if options.jobs < 0:
+        parser.error("argument -j/--jobs: must not be negative")
+
+    database = options.database or options.directory / ".zwog-index.sqlite"
+    errors = 0
+    with WorkoutIndex(database) as index:
+        if not options.no_update:
+            start = time.perf_counter()
+            stats = index.update(
+                options.directory,
+                recursive=options.recursive,
+                jobs=options.jobs or None,
+            )
+            errors = len(stats.errors)
+            for path, error in stats.errors:
+                sys.stderr.write(f"{path}: {error}\n")
+            sys.stderr.write(
+                f"Indexed {stats.added} new, {stats.updated} changed, and "
+                f"{stats.unchanged} unchanged files, removed {stats.removed} "
+                f"({errors} errors) in "
+                f"{time.perf_counter() - start:.2f}s\n"
+            )
+        if options.duration or options.tss or options.above:
+            min_duration, max_duration = _range(options.duration, SECONDS_IN_MINUTE)
+            min_tss, max_tss = _range(options.tss, 1)
+            for workout in index.query(
+                min_duration=min_duration,
+                max_duration=max_duration,
+                min_tss=min_tss,
+                max_tss=max_tss,
+                time_above=(
+                    None
+                    if options.above is None
+                    else (options.above[0], options.above[1] * SECONDS_IN_MINUTE)
+                ),
+            ):
+                sys.stdout.write(
+                    f"{workout.path}\t{workout.duration / SECONDS_IN_MINUTE:.0f} min"
+                    f"\t{workout.tss:.0f} TSS\t{workout.name}\n"
+                )
+    sys.exit(1 if errors else 0)
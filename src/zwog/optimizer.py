@@ -0,0 +1,215 @@
+"""Optimization of workouts into fewer ZWO elements.
+
+:func:`optimize_blocks` rewrites the blocks of a workout without changing its
+power profile. Adjacent steady states with the same power are merged, and
+repeated patterns of intervals, also across blocks, are folded into repeated
+blocks, so that on/off patterns become ``IntervalsT`` elements instead of
+being unrolled. Blocks with nested groups are kept as they are.
+"""
+
+from typing import TYPE_CHECKING
+
+from zwog.constants import INTERVALST_LENGTH
+from zwog.timeline import check_expansion
+from zwog.utils import Block, Interval, iter_intervals
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+MAX_PATTERN_LENGTH = 8  # intervals
+
+
+def _merge_steady_states(blocks: "Iterable[Block]") -> list[Interval]:
+    """Return the intervals with repeats expanded and steady states merged.
+
+    Args:
+        blocks: Blocks without nested groups.
+
+    Returns:
+        Intervals, where no two adjacent steady states have the same power.
+
+    """
+    blocks = list(blocks)
+    check_expansion(blocks)
+    intervals: list[Interval] = []
+    for block in blocks:
+        for interval in iter_intervals(block):
+            if (
+                intervals
+                and not isinstance(interval.power, list)
+                and intervals[-1].power == interval.power
+            ):
+                intervals[-1] = Interval(
+                    intervals[-1].duration + interval.duration, interval.power
+                )
+            else:
+                intervals.append(interval)
+    return intervals
+
+
+def _count_repeats(intervals: list[Interval], start: int, length: int) -> int:
+    """Count the consecutive repeats of a pattern.
+
+    Args:
+        intervals: Intervals.
+        start: Start of the pattern.
+        length: Length of the pattern.
+
+    Returns:
+        Number of times the pattern occurs in a row from its start.
+
+    """
+    pattern = intervals[start : start + length]
+    count = 1
+    end = start + length
+    while intervals[end : end + length] == pattern:
+        count += 1
+        end += length
+    return count
+
+
+def _count_elements(blocks: "Iterable[Block]") -> int:
+    """Count the ZWO elements of a workout without expanding it.
+
+    Args:
+        blocks: Workout.
+
+    Returns:
+        Number of elements in the ``workout`` element of the ZWO file.
+
+    """
+    count = 0
+    for block in blocks:
+        if len(block.intervals) == INTERVALST_LENGTH and all(
+            isinstance(x, Interval) and not isinstance(x.power, list)
+            for x in block.intervals
+        ):
+            count += 1
+        else:
+            count += block.repeats * sum(
+                _count_elements([x]) if isinstance(x, Block) else 1
+                for x in block.intervals
+            )
+    return count
+
+
+def _fold(intervals: list[Interval]) -> list[Block]:
+    """Fold repeated patterns of intervals into repeated blocks.
+
+    Args:
+        intervals: Intervals.
+
+    Returns:
+        Blocks of the intervals.
+
+    """
+    optimized: list[Block] = []
+    start = 0
+    while start < len(intervals):
+        best_length, best_count, best_saving = 1, 1, 0
+        for length in range(1, min(MAX_PATTERN_LENGTH, len(intervals) - start) + 1):
+            count = _count_repeats(intervals, start, length)
+            if count == 1:
+                continue
+            # unrolled, every interval is an element of its own
+            saving = length * count - _count_elements(
+                [Block(list(intervals[start : start + length]), count)]
+            )
+            if (saving, count * length) > (best_saving, best_count * best_length):
+                best_length, best_count, best_saving = length, count, saving
+        optimized.append(
+            Block(
+                intervals=list(intervals[start : start + best_length]),
+                repeats=best_count,
+            )
+        )
+        start += best_length * best_count
+    return optimized
+
+
+def _is_lone_ramp(block: Block) -> bool:
+    """Check whether the block is a single ramp.
+
+    Args:
+        block: Block.
+
+    Returns:
+        True if the block is written as a ``Warmup`` at the start of a workout
+        or as a ``Cooldown`` at its end, False otherwise.
+
+    """
+    return (
+        block.repeats == 1
+        and len(block.intervals) == 1
+        and isinstance(block.intervals[0], Interval)
+        and isinstance(block.intervals[0].power, list)
+    )
+
+
+def _keep_edges(blocks: list[Block], optimized: list[Block]) -> None:
+    """Avoid new warmups and cooldowns in an optimized workout.
+
+    A ramp that becomes a block of its own at the start or the end would be
+    written as a ``Warmup`` or a ``Cooldown``, so it is joined with its
+    neighbouring block instead, if that is not repeated.
+
+    Args:
+        blocks: Workout.
+        optimized: Optimized workout, changed in place.
+
+    """
+    for idx, other in ((0, 1), (-1, -2)):
+        if (
+            len(optimized) > 1
+            and _is_lone_ramp(optimized[idx])
+            and not _is_lone_ramp(blocks[idx])
+            and optimized[other].repeats == 1
+            and not any(isinstance(x, Block) for x in optimized[other].intervals)
+        ):
+            first, second = sorted((idx, other))
+            optimized[first : second + 1 or None] = [
+                Block([*optimized[first].intervals, *optimized[second].intervals])
+            ]
+
+
+def optimize_blocks(blocks: "Iterable[Block]") -> list[Block]:
+    """Optimize a workout into fewer ZWO elements.
+
+    Runs of blocks without nested groups are expanded and adjacent steady
+    states with the same power are merged. Then, from the start of each run,
+    the pattern of up to :data:`MAX_PATTERN_LENGTH` intervals whose repeats
+    save the most ZWO elements becomes a repeated block, preferring patterns
+    that cover more intervals, and intervals that do not repeat become blocks
+    of their own. Blocks with nested groups are kept, so that huge nested
+    repeats are never expanded.
+
+    Args:
+        blocks: Workout.
+
+    Returns:
+        Workout with the same power profile, at most as many ZWO elements,
+        and the same warmup and cooldown. The workout itself is returned if
+        optimizing would not keep them.
+
+    """
+    blocks = list(blocks)
+    optimized: list[Block] = []
+    run: list[Block] = []
+    for block in blocks:
+        if any(isinstance(x, Block) for x in block.intervals):
+            optimized.extend(_fold(_merge_steady_states(run)))
+            optimized.append(block)
+            run = []
+        else:
+            run.append(block)
+    optimized.extend(_fold(_merge_steady_states(run)))
+    if not optimized:
+        return optimized
+    _keep_edges(blocks, optimized)
+    if (
+        _count_elements(optimized) > _count_elements(blocks)
+        or _is_lone_ramp(optimized[0]) != _is_lone_ramp(blocks[0])
+        or _is_lone_ramp(optimized[-1]) != _is_lone_ramp(blocks[-1])
+    ):
+        return blocks
+    return optimized
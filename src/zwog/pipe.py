@@ -0,0 +1,270 @@
+"""Streaming NDJSON conversion.
+
+Every input line is a conversion request, see :mod:`zwog.protocol`, with an
+optional ``id``. Every output line is a JSON object with the input ``line``
+number, the ``id`` if given, and the result of the request.
+
+Lines are read lazily, and with a single job every line is converted and
+written as soon as it is read. With several jobs, the lines are converted in
+chunks in worker processes, each keeping the parser and a
+:class:`zwog.cache.WorkoutCache` warm, and only a bounded number of chunks is
+in flight at a time, so that memory use does not grow with the length of the
+stream.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from itertools import islice
+from typing import TYPE_CHECKING, Any, NoReturn
+
+from zwog.protocol import convert_request, error_to_json, parse_request
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+CHUNK_SIZE = 16  # lines per task
+CHUNKS_PER_JOB = 2  # chunks in flight per worker process
+
+
+def convert_line(line: str, number: int = 1) -> dict[str, Any]:
+    """Convert an input line.
+
+    Args:
+        line: JSON conversion request.
+        number: Line number.
+
+    Returns:
+        Line number, id, and the ZWO document, pretty text, and TSS, or an
+        error. Errors are reported in the result instead of being raised, so
+        that a bad line never ends the stream.
+
+    """
+    result: dict[str, Any] = {"line": number}
+    try:
+        request = parse_request(line)
+    except Exception as error:  # noqa: BLE001
+        result["error"] = error_to_json(error)
+        return result
+    if "id" in request:
+        result["id"] = request["id"]
+    result.update(convert_request(request))
+    return result
+
+
+def _convert_chunk(chunk: list[tuple[int, str]]) -> list[dict[str, Any]]:
+    """Convert numbered input lines.
+
+    Runs in the worker processes, which keep their own cache.
+
+    Args:
+        chunk: Line numbers and lines.
+
+    Returns:
+        Results.
+
+    """
+    return [convert_line(line, number) for number, line in chunk]
+
+
+def _numbered(lines: "Iterable[str]") -> "Iterator[tuple[int, str]]":
+    """Return numbered, non-empty lines."""
+    return ((n, line) for n, line in enumerate(lines, 1) if line.strip())
+
+
+def _chunks(lines: "Iterable[str]", size: int) -> "Iterator[list[tuple[int, str]]]":
+    """Return numbered, non-empty lines in chunks.
+
+    Args:
+        lines: Input lines.
+        size: Chunk size.
+
+    Yields:
+        Line numbers and lines.
+
+    """
+    numbered = _numbered(lines)
+    while chunk := list(islice(numbered, size)):
+        yield chunk
+
+
+def _ordered(
+    executor: Executor, chunks: "Iterable[list[tuple[int, str]]]", in_flight: int
+) -> "Iterator[dict[str, Any]]":
+    """Convert chunks in the executor and yield the results in input order.
+
+    Args:
+        executor: Executor converting the chunks.
+        chunks: Numbered input lines in chunks.
+        in_flight: Maximum number of chunks submitted at a time.
+
+    Yields:
+        Results.
+
+    """
+    queue: deque[Future[list[dict[str, Any]]]] = deque()
+    for chunk in chunks:
+        queue.append(executor.submit(_convert_chunk, chunk))
+        if len(queue) >= in_flight:
+            yield from queue.popleft().result()
+    while queue:
+        yield from queue.popleft().result()
+
+
+def _unordered(
+    executor: Executor, chunks: "Iterable[list[tuple[int, str]]]", in_flight: int
+) -> "Iterator[dict[str, Any]]":
+    """Convert chunks in the executor and yield the results as they complete.
+
+    Args:
+        executor: Executor converting the chunks.
+        chunks: Numbered input lines in chunks.
+        in_flight: Maximum number of chunks submitted at a time.
+
+    Yields:
+        Results.
+
+    """
+    pending: set[Future[list[dict[str, Any]]]] = set()
+    for chunk in chunks:
+        pending.add(executor.submit(_convert_chunk, chunk))
+        if len(pending) >= in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+    for future in wait(pending).done:
+        yield from future.result()
+
+
+def convert_stream(
+    lines: "Iterable[str]",
+    jobs: int = 1,
+    *,
+    ordered: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+) -> "Iterator[dict[str, Any]]":
+    """Convert a stream of NDJSON requests.
+
+    Args:
+        lines: Input lines. Empty lines are skipped.
+        jobs: Number of worker processes. All CPUs are used if 0, and the
+            lines are converted in this process if 1.
+        ordered: Whether to keep the output in input order. Otherwise, the
+            results are yielded as soon as their chunk is converted.
+        chunk_size: Number of lines per task in worker processes.
+
+    Yields:
+        Results, see :func:`convert_line`. With a single job, every result is
+        yielded before the next line is read.
+
+    """
+    if jobs == 1:
+        for number, line in _numbered(lines):
+            yield convert_line(line, number)
+    else:
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            convert = _ordered if ordered else _unordered
+            yield from convert(
+                executor, _chunks(lines, chunk_size), CHUNKS_PER_JOB * workers
+            )
+
+
+def main(argv: list[str] | None = None) -> NoReturn:
+    """NDJSON pipe command line interface.
+
+    Args:
+        argv: Command line arguments.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="zwog pipe",
+        description="Convert a stream of workouts, one JSON object per line",
+    )
+    parser.add_argument(
+        "-i",
+        "--input_file",
+        "--input-file",
+        action="store",
+        dest="input_file",
+        type=argparse.FileType("r"),
+        default=None,
+        help="input filename (default: stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output_file",
+        "--output-file",
+        action="store",
+        dest="output_file",
+        type=argparse.FileType("w"),
+        default=None,
+        help="output filename (default: stdout)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 uses all CPUs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-u",
+        "--unordered",
+        action="store_true",
+        dest="unordered",
+        help="write results as they complete instead of in input order",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        "--chunk-size",
+        action="store",
+        dest="chunk_size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="number of lines per task (default: %(default)s)",
+    )
+    options = parser.parse_args(argv)
+    if options.jobs < 0:
+        parser.error("-j/--jobs must be at least 0")
+    if options.chunk_size < 1:
+        parser.error("--chunk_size must be at least 1")
+
+    start = time.perf_counter()
+    count = errors = 0
+    with (
+        options.input_file or sys.stdin as input_file,
+        options.output_file or sys.stdout as output_file,
+    ):
+        for result in convert_stream(
+            input_file,
+            options.jobs,
+            ordered=not options.unordered,
+            chunk_size=options.chunk_size,
+        ):
+            count += 1
+            errors += "error" in result
+            output_file.write(json.dumps(result) + "\n")
+            output_file.flush()
+    elapsed = time.perf_counter() - start
+    sys.stderr.write(
+        f"Converted {count - errors}/{count} workouts ({errors} errors) in "
+        f"{elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f} workouts/s)\n"
+    )
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
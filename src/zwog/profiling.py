@@ -0,0 +1,218 @@
+"""Per-stage profiling of workout conversion.
+
+The conversion code marks its stages with :func:`stage`. Stages are only
+measured inside :func:`profile`, otherwise marking a stage costs a context
+variable lookup.
+"""
+
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from cProfile import Profile
+    from pstats import Stats
+
+STAGES = (
+    "parser",
+    "parse",
+    "transform",
+    "optimize",
+    "pretty",
+    "zwo",
+    "tss",
+    "write",
+)
+
+
+@dataclass
+class StageStats:
+    """Statistics of a stage.
+
+    Time and memory blocks are exclusive, i.e., nested stages are not counted
+    in their parent stage.
+
+    Attributes:
+        calls: Number of times the stage ran.
+        seconds: Wall time in seconds.
+        net_blocks: Change in the number of allocated memory blocks, see
+            :func:`sys.getallocatedblocks`. Blocks allocated and freed within
+            the stage are not counted, and the value is negative if the stage
+            frees more blocks than it allocates.
+
+    """
+
+    calls: int = 0
+    seconds: float = 0.0
+    net_blocks: int = 0
+
+
+@dataclass
+class _Frame:
+    """Running stage."""
+
+    name: str
+    start: float
+    start_blocks: int
+    child_seconds: float = 0.0
+    child_blocks: int = 0
+
+
+@dataclass
+class Profiler:
+    """Collector of stage statistics.
+
+    Attributes:
+        cprofile_stage: Stage to run under :mod:`cProfile`. Not used if None.
+        callback: Function called with the stage name, wall time in seconds,
+            and net number of allocated memory blocks whenever a stage ends.
+        stages: Statistics per stage, in the order the stages first ran.
+
+    """
+
+    cprofile_stage: str | None = None
+    callback: "Callable[[str, float, int], object] | None" = None
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    _cprofile: "Profile | None" = field(default=None, init=False, repr=False)
+    _stack: list[_Frame] = field(default_factory=list, init=False, repr=False)
+
+    @property
+    def stats(self) -> "Stats | None":
+        """Get the cProfile statistics of the chosen stage, if it ran."""
+        if self._cprofile is None:
+            return None
+        from pstats import Stats  # noqa: PLC0415
+
+        return Stats(self._cprofile)
+
+    @contextmanager
+    def stage(self, name: str) -> "Iterator[None]":
+        """Measure a stage.
+
+        Args:
+            name: Stage name.
+
+        Yields:
+            None.
+
+        """
+        cprofile = None
+        if name == self.cprofile_stage and all(
+            frame.name != name for frame in self._stack
+        ):
+            if self._cprofile is None:
+                from cProfile import Profile  # noqa: PLC0415
+
+                self._cprofile = Profile()
+            cprofile = self._cprofile
+        frame = _Frame(name, perf_counter(), sys.getallocatedblocks())
+        self._stack.append(frame)
+        if cprofile is not None:
+            cprofile.enable()
+        try:
+            yield
+        finally:
+            if cprofile is not None:
+                cprofile.disable()
+            seconds = perf_counter() - frame.start
+            blocks = sys.getallocatedblocks() - frame.start_blocks
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].child_seconds += seconds
+                self._stack[-1].child_blocks += blocks
+            stats = self.stages.setdefault(name, StageStats())
+            stats.calls += 1
+            stats.seconds += seconds - frame.child_seconds
+            stats.net_blocks += blocks - frame.child_blocks
+            if self.callback is not None:
+                self.callback(
+                    name, seconds - frame.child_seconds, blocks - frame.child_blocks
+                )
+
+    def report(self) -> str:
+        """Return the statistics as a table."""
+        lines = [f"{'stage':<12}{'calls':>8}{'time (ms)':>14}{'net blocks':>18}"]
+        lines.extend(
+            f"{name:<12}{stats.calls:>8}{stats.seconds * 1000:>14.3f}"
+            f"{stats.net_blocks:>18}"
+            for name, stats in self.stages.items()
+        )
+        total = sum(stats.seconds for stats in self.stages.values())
+        lines.append(f"{'total':<12}{'':>8}{total * 1000:>14.3f}")
+        return "\n".join(lines) + "\n"
+
+
+_PROFILER: ContextVar[Profiler | None] = ContextVar("zwog_profiler", default=None)
+
+
+@contextmanager
+def stage(name: str) -> "Iterator[None]":
+    """Mark a stage of the conversion.
+
+    Args:
+        name: Stage name, one of :data:`STAGES`.
+
+    Yields:
+        None.
+
+    """
+    profiler = _PROFILER.get()
+    if profiler is None:
+        yield
+    else:
+        with profiler.stage(name):
+            yield
+
+
+def staged(name: str, func: "Callable[[str], object]") -> "Callable[[str], object]":
+    """Run every call of a function as a stage.
+
+    Used to time writing separately from serializing when the document is
+    streamed piece by piece.
+
+    Args:
+        name: Stage name, one of :data:`STAGES`.
+        func: Function called with a string, e.g., the write method of a file.
+
+    Returns:
+        Function measuring every call, or ``func`` itself outside
+        :func:`profile`.
+
+    """
+    profiler = _PROFILER.get()
+    if profiler is None:
+        return func
+
+    def call(text: str) -> object:
+        with profiler.stage(name):
+            return func(text)
+
+    return call
+
+
+@contextmanager
+def profile(
+    cprofile_stage: str | None = None,
+    callback: "Callable[[str, float, int], object] | None" = None,
+) -> "Iterator[Profiler]":
+    """Profile the stages of conversions in the context.
+
+    Args:
+        cprofile_stage: Stage to run under :mod:`cProfile`. Not used if None.
+        callback: Function called with the stage name, wall time in seconds,
+            and net number of allocated memory blocks whenever a stage ends.
+
+    Yields:
+        Profiler collecting the statistics.
+
+    """
+    profiler = Profiler(cprofile_stage=cprofile_stage, callback=callback)
+    token = _PROFILER.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _PROFILER.reset(token)
@@ -0,0 +1,86 @@
+"""JSON conversion requests.
+
+Shared by the conversion server and the NDJSON pipe. A request is a JSON
+object with the ``workout`` text and optional metadata (``author``,
+``name``, ``category``, ``subcategory``). A result holds either the ZWO
+document, the pretty text, and TSS, or an ``error`` with its ``type`` and
+``message``.
+"""
+
+import json
+from typing import Any
+
+from zwog.cache import WorkoutCache
+
+METADATA = ("author", "name", "category", "subcategory")
+
+_cache = WorkoutCache()
+
+
+def parse_request(data: str | bytes) -> dict[str, Any]:
+    """Return a validated conversion request.
+
+    Members other than the workout and the metadata are kept as they are.
+    An invalid JSON document raises a :class:`ValueError` too, see
+    :func:`json.loads`.
+
+    Args:
+        data: JSON object.
+
+    Returns:
+        Workout text and metadata, without a null author or name.
+
+    Raises:
+        ValueError: The request is not valid.
+
+    """
+    request = json.loads(data)
+    if not isinstance(request, dict) or not isinstance(request.get("workout"), str):
+        msg = "'workout' must be a string"
+        raise ValueError(msg)  # noqa: TRY004
+    for key in METADATA:
+        if key in request and not isinstance(request[key], str | None):
+            msg = f"'{key}' must be a string or null"
+            raise ValueError(msg)
+    if request.get("author") is None:
+        request.pop("author", None)
+    if request.get("name") is None:
+        request.pop("name", None)
+    return request
+
+
+def error_to_json(error: Exception) -> dict[str, str]:
+    """Return an error as a JSON object.
+
+    Args:
+        error: Error.
+
+    Returns:
+        Error type and the first line of its message.
+
+    """
+    lines = str(error).strip().splitlines()
+    return {"type": type(error).__name__, "message": lines[0] if lines else ""}
+
+
+def convert_request(request: dict[str, Any]) -> dict[str, Any]:
+    """Convert a validated request.
+
+    Runs in the worker processes of the server and the pipe, which keep their
+    own cache.
+
+    Args:
+        request: Workout text and metadata, see :func:`parse_request`.
+
+    Returns:
+        ZWO document, pretty text, and TSS, or an error. Errors are reported
+        in the result instead of being raised.
+
+    """
+    try:
+        entry = _cache.get(
+            request["workout"], **{k: request[k] for k in METADATA if k in request}
+        )
+    except Exception as error:  # noqa: BLE001
+        return {"error": error_to_json(error)}
+    return {"zwo": entry.zwo.decode("utf-8"), "pretty": entry.pretty, "tss": entry.tss}
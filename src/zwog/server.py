@@ -0,0 +1,412 @@
+"""Local conversion server.
+
+A small HTTP/1.1 server on :mod:`asyncio`, listening on a local TCP port or a
+Unix socket. ``POST /convert`` takes a conversion request and returns its
+result, see :mod:`zwog.protocol`. Other errors are reported in the same
+shape, with the ``HTTPError`` type and the status phrase as the message.
+``GET /health`` reports that the server is up.
+
+Conversions run in a pool of worker processes, each keeping the parser and a
+:class:`zwog.cache.WorkoutCache` warm, so that the event loop stays
+responsive.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import suppress
+from functools import partial
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from zwog.protocol import convert_request, error_to_json, parse_request
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+_T = TypeVar("_T")
+
+MAX_REQUEST_SIZE = 1 << 20  # bytes
+MAX_HEADERS = 100
+MAX_CONCURRENCY = 64
+MAX_CONNECTIONS = 256
+IDLE_TIMEOUT = 30.0  # seconds
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str | None = None) -> None:
+        """Initialize HTTPError.
+
+        Args:
+            status: HTTP status.
+            message: Error message. The status phrase if None.
+
+        """
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class ConversionServer:
+    """Conversion server.
+
+    Requests are served concurrently, but at most ``max_concurrency``
+    conversions are queued in the executor at a time. At most
+    ``max_connections`` connections are open at a time, further ones are
+    answered 503 and closed. Every request has to arrive within
+    ``idle_timeout`` seconds per part (request line, headers, and body), so
+    that slow clients cannot hold connections open.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_request_size: int = MAX_REQUEST_SIZE,
+        idle_timeout: float = IDLE_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+    ) -> None:
+        """Initialize ConversionServer.
+
+        Args:
+            executor: Executor running the conversions.
+            max_concurrency: Maximum number of conversions in progress.
+            max_request_size: Maximum size of request bodies in bytes.
+            idle_timeout: Seconds to wait for the next request on a connection,
+                and for the headers and the body of a request.
+            max_connections: Maximum number of open connections.
+
+        """
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_request_size = max_request_size
+        self._idle_timeout = idle_timeout
+        self._max_connections = max_connections
+        self._connections = 0
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """Start serving on a TCP port.
+
+        Args:
+            host: Host address.
+            port: Port. A free port is chosen if 0.
+
+        Returns:
+            Started server.
+
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        """Start serving on a Unix socket.
+
+        Args:
+            path: Socket path.
+
+        Returns:
+            Started server.
+
+        """
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of a connection.
+
+        Args:
+            reader: Connection reader.
+            writer: Connection writer.
+
+        """
+        if self._connections >= self._max_connections:
+            with suppress(ConnectionError):
+                writer.write(
+                    _response(HTTPStatus.SERVICE_UNAVAILABLE, keep_alive=False)
+                )
+                await writer.drain()
+            writer.close()
+            return
+        self._connections += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request_line = await asyncio.wait_for(
+                        reader.readline(), self._idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                try:
+                    keep_alive, status, response = await self._respond(
+                        request_line, reader
+                    )
+                except HTTPError as error:
+                    # the rest of the request is not read, so close the connection
+                    keep_alive = False
+                    status, response = error.status, {"error": error_to_json(error)}
+                writer.write(_response(status, response, keep_alive=keep_alive))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # the client went away or sent an overlong line
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _respond(
+        self, request_line: bytes, reader: asyncio.StreamReader
+    ) -> tuple[bool, HTTPStatus, dict[str, Any]]:
+        """Read a request and return the response.
+
+        Args:
+            request_line: First line of the request.
+            reader: Connection reader.
+
+        Returns:
+            Whether to keep the connection alive, response status, and
+            response.
+
+        Raises:
+            HTTPError: The request cannot be served.
+
+        """
+        try:
+            method, target, http_version = request_line.decode("latin-1").split()
+        except ValueError as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST) from error
+        headers = await self._wait_for(_read_headers(reader))
+        keep_alive = (
+            headers.get("connection", "").lower() != "close"
+            and http_version == "HTTP/1.1"
+        )
+
+        if target == "/health":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            return keep_alive, HTTPStatus.OK, {"status": "ok"}
+        if target != "/convert":
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        body = await self._wait_for(self._read_body(headers, reader))
+        try:
+            request = parse_request(body)
+        except (ValueError, RecursionError) as error:
+            return keep_alive, HTTPStatus.BAD_REQUEST, {"error": error_to_json(error)}
+
+        async with self._semaphore:
+            try:
+                response = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, partial(convert_request, request)
+                )
+            except Exception as error:
+                raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR) from error
+        status = HTTPStatus.BAD_REQUEST if "error" in response else HTTPStatus.OK
+        return keep_alive, status, response
+
+    async def _wait_for(self, read: "Awaitable[_T]") -> _T:
+        """Wait for a part of a request for at most the idle timeout.
+
+        Args:
+            read: Coroutine reading the part.
+
+        Returns:
+            Result of the coroutine.
+
+        Raises:
+            HTTPError: The part did not arrive in time.
+
+        """
+        try:
+            return await asyncio.wait_for(read, self._idle_timeout)
+        except asyncio.TimeoutError as error:
+            raise HTTPError(HTTPStatus.REQUEST_TIMEOUT) from error
+
+    async def _read_body(
+        self, headers: dict[str, str], reader: asyncio.StreamReader
+    ) -> bytes:
+        """Read the body of a request.
+
+        Args:
+            headers: Request headers.
+            reader: Connection reader.
+
+        Returns:
+            Request body.
+
+        Raises:
+            HTTPError: The body has no length or it is too large.
+
+        """
+        if "transfer-encoding" in headers:
+            raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "Chunked requests")
+        try:
+            length = int(headers["content-length"])
+        except (KeyError, ValueError) as error:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED) from error
+        if not 0 <= length <= self._max_request_size:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        return await reader.readexactly(length)
+
+
+def _response(
+    status: HTTPStatus,
+    response: dict[str, Any] | None = None,
+    *,
+    keep_alive: bool,
+) -> bytes:
+    """Return an HTTP response.
+
+    Args:
+        status: Response status.
+        response: JSON response. An error with the status phrase if None.
+        keep_alive: Whether the connection is kept alive.
+
+    Returns:
+        Status line, headers, and body.
+
+    """
+    if response is None:
+        response = {"error": error_to_json(HTTPError(status))}
+    body = json.dumps(response).encode()
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("latin-1") + body
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    """Read the headers of a request.
+
+    Args:
+        reader: Connection reader.
+
+    Returns:
+        Headers with lower-case names.
+
+    Raises:
+        HTTPError: There are too many headers.
+
+    """
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADERS + 1):
+        line = await reader.readline()
+        if line in {b"\r\n", b"\n", b""}:
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+
+async def serve(options: argparse.Namespace) -> None:
+    """Run the server until it is cancelled.
+
+    Args:
+        options: Command line options.
+
+    """
+    with ProcessPoolExecutor(max_workers=options.workers or None) as executor:
+        server = ConversionServer(
+            executor,
+            max_concurrency=options.max_concurrency,
+            max_request_size=options.max_request_size,
+            max_connections=options.max_connections,
+        )
+        if options.unix_socket is not None:
+            listener = await server.start_unix(options.unix_socket)
+        else:
+            listener = await server.start_tcp(options.host, options.port)
+        addresses = ", ".join(str(x.getsockname()) for x in listener.sockets)
+        sys.stderr.write(f"Serving on {addresses}\n")
+        async with listener:
+            await listener.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Conversion server command line interface.
+
+    Args:
+        argv: Command line arguments.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="zwog serve", description="Zwift workout generator server"
+    )
+    parser.add_argument(
+        "--host",
+        action="store",
+        dest="host",
+        type=str,
+        default="127.0.0.1",
+        help="host address (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        action="store",
+        dest="port",
+        type=int,
+        default=8080,
+        help="port (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-u",
+        "--unix_socket",
+        "--unix-socket",
+        action="store",
+        dest="unix_socket",
+        type=str,
+        default=None,
+        help="listen on a Unix socket instead of a port",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        action="store",
+        dest="workers",
+        type=int,
+        default=0,
+        help="number of worker processes, 0 uses all CPUs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max_concurrency",
+        "--max-concurrency",
+        action="store",
+        dest="max_concurrency",
+        type=int,
+        default=MAX_CONCURRENCY,
+        help="maximum number of conversions in progress (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max_request_size",
+        "--max-request-size",
+        action="store",
+        dest="max_request_size",
+        type=int,
+        default=MAX_REQUEST_SIZE,
+        help="maximum request size in bytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max_connections",
+        "--max-connections",
+        action="store",
+        dest="max_connections",
+        type=int,
+        default=MAX_CONNECTIONS,
+        help="maximum number of open connections (default: %(default)s)",
+    )
+    options = parser.parse_args(argv)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(options))
+
+
+if __name__ == "__main__":
+    main()
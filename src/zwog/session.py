@@ -0,0 +1,188 @@
+"""Incremental workout sessions for interactive editing."""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from zwog.exceptions import LarkError
+from zwog.utils import ZWOG, Block, parse_workout
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Top-level blocks parsed from a piece of the workout text."""
+
+    source: str
+    blocks: list[Block]
+    pretty: list[str]
+    tss: list[float]
+    zwo: list[str]
+
+
+def split_chunks(workout: str) -> list[str]:
+    """Split a workout into chunks of whole top-level blocks.
+
+    The workout is split at line breaks, unless the block continues on the
+    next line. An interval always ends with ``FTP`` and a group with ``)``, so
+    a line that does not end with either, a line inside an open group, or a
+    line followed by a line starting with a comma, is continued.
+
+    Args:
+        workout: Workout as a string.
+
+    Returns:
+        Chunks without surrounding whitespace. Empty lines are dropped.
+
+    """
+    chunks: list[str] = []
+    current = ""
+    depth = 0  # open groups in the current chunk
+    for line in workout.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if current and (
+            depth > 0 or not current.endswith(("FTP", ")")) or stripped.startswith(",")
+        ):
+            current = f"{current}\n{stripped}"
+        else:
+            if current:
+                chunks.append(current)
+            current = stripped
+            depth = 0
+        depth += stripped.count("(") - stripped.count(")")
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class WorkoutSession(ZWOG):
+    """Workout that is re-processed incrementally as its text changes.
+
+    The workout is split into chunks of top-level blocks (see
+    :func:`split_chunks`). The blocks, strings, TSS, and ZWO fragments of each
+    chunk are kept between updates, so only chunks that changed are parsed and
+    converted again. The session is a :class:`zwog.utils.ZWOG`, so all its
+    outputs reflect the current text.
+
+    Invalid text is parsed as a whole to raise the same exceptions as
+    :func:`zwog.utils.parse_workout`, and the session keeps its previous text.
+    """
+
+    def __init__(
+        self,
+        workout: str = "",
+        author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+        name: str = "Structured workout",
+        category: str | None = None,
+        subcategory: str | None = None,
+    ) -> None:
+        """Initialize WorkoutSession.
+
+        Args:
+            workout: Workout as a string.
+            author: Author.
+            name: Workout name.
+            category: Workout category.
+            subcategory: Workout subcategory.
+
+        """
+        super().__init__("", author, name, category, subcategory)
+        self._text = ""
+        self._chunks: dict[str, Chunk] = {}
+        self._current: list[Chunk] = []
+        self.update(workout)
+
+    @property
+    def text(self) -> str:
+        """Get the workout as a string."""
+        return self._text
+
+    def update(self, workout: str) -> None:
+        """Replace the workout text.
+
+        Args:
+            workout: New workout as a string.
+
+        """
+        try:
+            current = [
+                self._chunks.get(source) or self._parse_chunk(source)
+                for source in split_chunks(workout)
+            ]
+        except (LarkError, ValueError):
+            # raise the exception with positions in the whole text
+            current = [self._parse_chunk(workout, parse_workout(workout))]
+
+        self._text = workout
+        self._current = current
+        # drop chunks that are no longer in the workout
+        self._chunks = {chunk.source: chunk for chunk in current}
+        self._workout = [block for chunk in current for block in chunk.blocks]
+        for name in ("_zwo_workout", "zwo_bytes", "timeline"):
+            self.__dict__.pop(name, None)
+
+    def edit(self, start: int, end: int, text: str) -> None:
+        """Replace a part of the workout text.
+
+        Args:
+            start: Start offset of the replaced text.
+            end: End offset of the replaced text.
+            text: Replacement text.
+
+        """
+        self.update(self._text[:start] + text + self._text[end:])
+
+    def _parse_chunk(self, source: str, blocks: list[Block] | None = None) -> Chunk:
+        """Parse and convert a chunk.
+
+        Args:
+            source: Chunk as a string.
+            blocks: Blocks of the chunk if already parsed.
+
+        Returns:
+            Converted chunk.
+
+        """
+        if blocks is None:
+            blocks = parse_workout(source)
+        return Chunk(
+            source=source,
+            blocks=blocks,
+            pretty=[self._block_to_pretty(block) for block in blocks],
+            tss=[self._block_to_tss(block) for block in blocks],
+            zwo=[self._block_to_zwo(block) for block in blocks],
+        )
+
+    @property
+    def _pretty_workout(self) -> str:
+        """Return the workout as a string from the chunks."""
+        return "\n".join(pretty for chunk in self._current for pretty in chunk.pretty)
+
+    @property
+    def _tss(self) -> float:
+        """Return TSS from the chunks."""
+        return sum(tss for chunk in self._current for tss in chunk.tss)
+
+    def _zwo_fragments(self) -> "Iterator[str]":
+        """Return the ZWO fragments of the blocks from the chunks.
+
+        The first and the last block are converted again, because they can be
+        a warmup and a cooldown.
+
+        Yields:
+            XML elements of the intervals of each block.
+
+        """
+        fragments = [fragment for chunk in self._current for fragment in chunk.zwo]
+        for block_idx, fragment in enumerate(fragments):
+            if block_idx in {0, len(fragments) - 1}:
+                yield self._block_to_zwo(
+                    self._workout[block_idx],
+                    first=block_idx == 0,
+                    last=block_idx == len(fragments) - 1,
+                )
+            else:
+                yield fragment
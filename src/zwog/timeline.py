@@ -0,0 +1,416 @@
+"""Compiled workout timelines."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, pairwise, repeat
+from math import ceil, inf
+from operator import add, mul
+from typing import TYPE_CHECKING, NamedTuple, cast
+
+from zwog.constants import MAX_INTERVALS, POWER_ZONES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from zwog.compact import CompactBlock
+    from zwog.utils import Block
+
+
+def _expanded_length(block: "Block | CompactBlock") -> int:
+    """Return the number of intervals of a block with the repeats expanded."""
+    return block.repeats * sum(
+        _expanded_length(cast("Block | CompactBlock", item))
+        if hasattr(item, "intervals")
+        else 1
+        for item in block.intervals
+    )
+
+
+def check_expansion(blocks: "Iterable[Block | CompactBlock]") -> int:
+    """Check that the repeats of a workout can be expanded.
+
+    Nested repeats multiply, so a short workout can stand for billions of
+    intervals. They are only counted here, without expanding them.
+
+    Args:
+        blocks: Workout as blocks or compact blocks.
+
+    Returns:
+        Number of intervals with the repeats expanded.
+
+    Raises:
+        ValueError: There are more than :data:`zwog.constants.MAX_INTERVALS`
+            intervals with the repeats expanded.
+
+    """
+    length = sum(map(_expanded_length, blocks))
+    if length > MAX_INTERVALS:
+        msg = (
+            f"Workouts can have at most {MAX_INTERVALS} intervals with the "
+            f"repeats expanded, not {length}"
+        )
+        raise ValueError(msg)
+    return length
+
+
+class Segment(NamedTuple):
+    """Segment of a timeline."""
+
+    start: float
+    duration: float
+    power_low: float
+    power_high: float
+
+
+class Timeline:
+    """Workout as contiguous arrays of segments.
+
+    Repeats are expanded, so that every interval the rider performs is one
+    segment. The arrays hold the segment start time and duration in seconds,
+    and the power at the start (``power_low``) and at the end (``power_high``)
+    of the segment in percent of FTP. Steady-states have equal powers.
+    """
+
+    __slots__ = ("duration", "power_high", "power_low", "start")
+
+    def __init__(
+        self,
+        start: "array[float]",
+        duration: "array[float]",
+        power_low: "array[float]",
+        power_high: "array[float]",
+    ) -> None:
+        """Initialize Timeline.
+
+        Args:
+            start: Segment start times in seconds.
+            duration: Segment durations in seconds.
+            power_low: Powers at the segment starts in percent of FTP.
+            power_high: Powers at the segment ends in percent of FTP.
+
+        """
+        self.start = start
+        self.duration = duration
+        self.power_low = power_low
+        self.power_high = power_high
+
+    @classmethod
+    def from_blocks(
+        cls, blocks: "Iterable[Block] | Iterable[CompactBlock]"
+    ) -> "Timeline":
+        """Compile blocks into a timeline.
+
+        A ValueError is raised if the workout has too many intervals with the
+        repeats expanded, see :func:`check_expansion`.
+
+        Args:
+            blocks: Workout as blocks or compact blocks.
+
+        Returns:
+            Timeline of the workout.
+
+        """
+        workout = cast("list[Block | CompactBlock]", list(blocks))
+        check_expansion(workout)
+        duration = array("d")
+        power_low = array("d")
+        power_high = array("d")
+        for block in workout:
+            block_duration, block_low, block_high = _block_arrays(block)
+            duration.extend(block_duration)
+            power_low.extend(block_low)
+            power_high.extend(block_high)
+        start = array("d", accumulate(duration, initial=0.0))
+        start.pop()
+        return cls(start, duration, power_low, power_high)
+
+    def __len__(self) -> int:
+        """Return the number of segments."""
+        return len(self.start)
+
+    def __iter__(self) -> "Iterator[Segment]":
+        """Return an iterator over the segments."""
+        return map(Segment, self.start, self.duration, self.power_low, self.power_high)
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether the timelines have the same segments."""
+        if not isinstance(other, Timeline):
+            return NotImplemented
+        return (
+            self.start == other.start
+            and self.duration == other.duration
+            and self.power_low == other.power_low
+            and self.power_high == other.power_high
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @property
+    def total_duration(self) -> float:
+        """Get the total duration in seconds."""
+        return self.start[-1] + self.duration[-1] if self.start else 0.0
+
+    def power_at(self, time: float) -> float:
+        """Return the target power at a time.
+
+        Args:
+            time: Time in seconds.
+
+        Returns:
+            Power in percent of FTP.
+
+        Raises:
+            ValueError: The time is outside of the workout.
+
+        """
+        if not 0 <= time < self.total_duration:
+            msg = f"Time {time} is outside of the workout"
+            raise ValueError(msg)
+        return self._interpolate(self, bisect_right(self.start, time) - 1, time)
+
+    def slice(self, start: float, end: float) -> "Timeline":
+        """Return the part of the timeline between two times.
+
+        Segments crossing the boundaries are cut, and the powers of cut ramps
+        are interpolated. Segment start times are kept relative to the
+        original timeline.
+
+        Args:
+            start: Start time in seconds.
+            end: End time in seconds.
+
+        Returns:
+            Timeline between the start and end times.
+
+        """
+        start = max(start, 0.0)
+        end = min(end, self.total_duration)
+        if start >= end:
+            return Timeline(array("d"), array("d"), array("d"), array("d"))
+        first = bisect_right(self.start, start) - 1
+        last = bisect_left(self.start, end)
+
+        timeline = Timeline(
+            self.start[first:last],
+            self.duration[first:last],
+            self.power_low[first:last],
+            self.power_high[first:last],
+        )
+        # cut the last segment before the first one in case they are the same
+        segment_end = timeline.start[-1] + timeline.duration[-1]
+        if segment_end > end:
+            timeline.power_high[-1] = self._interpolate(timeline, -1, end)
+            timeline.duration[-1] = end - timeline.start[-1]
+        if timeline.start[0] < start:
+            timeline.power_low[0] = self._interpolate(timeline, 0, start)
+            timeline.duration[0] -= start - timeline.start[0]
+            timeline.start[0] = start
+        return timeline
+
+    def time_in_zones(self, boundaries: "Sequence[float]" = POWER_ZONES) -> list[float]:
+        """Return the time spent in each power zone.
+
+        Zones are the half-open power ranges between consecutive boundaries,
+        below the first one, and from the last one up. Ramps are split
+        between the zones they cross in proportion to the power range in
+        each zone, so the times are exact without sampling.
+
+        Args:
+            boundaries: Strictly increasing zone boundaries in percent of FTP,
+                by default the lower bounds of the zones 2-7.
+
+        Returns:
+            Times in seconds, one more than the number of boundaries.
+
+        Raises:
+            ValueError: The boundaries are not strictly increasing.
+
+        """
+        if any(x >= y for x, y in pairwise(boundaries)):
+            msg = f"Zone boundaries {list(boundaries)} are not strictly increasing"
+            raise ValueError(msg)
+        edges = [-inf, *boundaries, inf]
+        times = [0.0] * (len(boundaries) + 1)
+        for duration, power_low, power_high in zip(
+            self.duration, self.power_low, self.power_high, strict=True
+        ):
+            low, high = sorted((power_low, power_high))
+            first = bisect_right(boundaries, low)
+            if low == high:
+                times[first] += duration
+                continue
+            for zone in range(first, bisect_right(boundaries, high) + 1):
+                overlap = min(edges[zone + 1], high) - max(edges[zone], low)
+                times[zone] += duration * overlap / (high - low)
+        return times
+
+    def iter_power(
+        self, resolution: float = 1, chunk_size: int = 4096
+    ) -> "Iterator[array[float]]":
+        """Iterate over the target power sampled at a fixed resolution.
+
+        The power is sampled at multiples of ``resolution`` seconds as in
+        :meth:`power_at`. The samples are yielded in chunks of at most
+        ``chunk_size`` samples, so that long workouts are never held in memory
+        at once. A chunk never spans more than one segment.
+
+        Args:
+            resolution: Time between samples in seconds.
+            chunk_size: Maximum number of samples per chunk.
+
+        Yields:
+            Chunks of powers in percent of FTP.
+
+        Raises:
+            ValueError: The resolution or chunk size is not positive.
+
+        """
+        if chunk_size <= 0:
+            msg = f"Chunk size {chunk_size} is not positive"
+            raise ValueError(msg)
+        for _, count, power, step in self._samples(resolution):
+            for offset in range(0, count, chunk_size):
+                yield self._fill(
+                    power + offset * step, step, min(chunk_size, count - offset)
+                )
+
+    def power_trace(self, resolution: float = 1) -> "array[float]":
+        """Return the target power sampled at a fixed resolution.
+
+        Same samples as :meth:`iter_power`, but in one preallocated array.
+
+        Args:
+            resolution: Time between samples in seconds.
+
+        Returns:
+            Powers in percent of FTP.
+
+        """
+        samples = list(self._samples(resolution))
+        trace = array("d", bytes(trace_length(self.total_duration, resolution) * 8))
+        for first, count, power, step in samples:
+            trace[first : first + count] = self._fill(power, step, count)
+        return trace
+
+    def _samples(self, resolution: float) -> "Iterator[tuple[int, int, float, float]]":
+        """Iterate over the samples of each segment.
+
+        Args:
+            resolution: Time between samples in seconds.
+
+        Yields:
+            Index of the first sample, number of samples, power at the first
+            sample and power step between samples. Segments without samples
+            are skipped.
+
+        Raises:
+            ValueError: The resolution is not positive.
+
+        """
+        if resolution <= 0:
+            msg = f"Resolution {resolution} is not positive"
+            raise ValueError(msg)
+        for idx in range(len(self)):
+            first = trace_length(self.start[idx], resolution)
+            count = (
+                trace_length(self.start[idx] + self.duration[idx], resolution) - first
+            )
+            if count > 0:
+                slope = (self.power_high[idx] - self.power_low[idx]) / self.duration[
+                    idx
+                ]
+                yield (
+                    first,
+                    count,
+                    self._interpolate(self, idx, first * resolution),
+                    slope * resolution,
+                )
+
+    @staticmethod
+    def _fill(power: float, step: float, count: int) -> "array[float]":
+        """Return evenly spaced powers.
+
+        Args:
+            power: First power.
+            step: Step between powers.
+            count: Number of powers.
+
+        Returns:
+            Powers.
+
+        """
+        if not step:
+            return array("d", [power]) * count
+        return array(
+            "d", map(add, repeat(power, count), map(mul, repeat(step), range(count)))
+        )
+
+    @staticmethod
+    def _interpolate(timeline: "Timeline", idx: int, time: float) -> float:
+        """Return the power of a segment at a time.
+
+        Args:
+            timeline: Timeline.
+            idx: Segment index.
+            time: Time in seconds within the segment.
+
+        Returns:
+            Power in percent of FTP.
+
+        """
+        fraction = (time - timeline.start[idx]) / timeline.duration[idx]
+        return timeline.power_low[idx] + fraction * (
+            timeline.power_high[idx] - timeline.power_low[idx]
+        )
+
+
+def trace_length(duration: float, resolution: float) -> int:
+    """Return the number of samples of a duration.
+
+    Args:
+        duration: Duration in seconds.
+        resolution: Time between samples in seconds.
+
+    Returns:
+        Number of sample times in ``[0, duration)``.
+
+    """
+    # round away floating point noise, e.g. 0.3 / 0.1 == 2.9999999999999996
+    return ceil(round(duration / resolution, 9))
+
+
+def _block_arrays(
+    block: "Block | CompactBlock",
+) -> "tuple[array[float], array[float], array[float]]":
+    """Return the durations and powers of a block with the repeats expanded.
+
+    Args:
+        block: Block or compact block, possibly with nested groups.
+
+    Returns:
+        Durations, powers at the starts, and powers at the ends of the
+        segments.
+
+    """
+    duration = array("d")
+    power_low = array("d")
+    power_high = array("d")
+    for item in block.intervals:
+        if hasattr(item, "intervals"):
+            group = _block_arrays(cast("Block | CompactBlock", item))
+            duration.extend(group[0])
+            power_low.extend(group[1])
+            power_high.extend(group[2])
+            continue
+        duration.append(item.duration)
+        if isinstance(item.power, list | tuple):
+            power_low.append(item.power[0])
+            power_high.append(item.power[1])
+        else:
+            power_low.append(item.power)
+            power_high.append(item.power)
+    return (
+        duration * block.repeats,
+        power_low * block.repeats,
+        power_high * block.repeats,
+    )
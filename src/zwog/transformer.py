@@ -0,0 +1,10 @@
+"""Workout parse-tree transformer."""
+
+from typing import Any
+
+from zwog._parser import Transformer
+from zwog.utils import _WorkoutRules
+
+
+class WorkoutTransformer(_WorkoutRules, Transformer[Any, Any]):
+    """Class to process workout parse-trees."""
@@ -1,25 +1,42 @@
 """Routines for processing workouts."""
 
-import argparse
+import errno
+import re
 import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
-from importlib.metadata import version
-from typing import Any, NoReturn
-from xml.etree.ElementTree import (  # noqa: S405
-    Element,
-    ElementTree,
-    SubElement,
-    tostring,
-)
-
-from lark import Lark, Transformer
+from functools import cache, cached_property, partial
+from glob import glob
+from io import BufferedIOBase, RawIOBase, TextIOBase
+from itertools import starmap
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, BinaryIO, NoReturn, TextIO, TypeVar, cast
 
 from zwog.constants import (
     INTERVALST_LENGTH,
+    MAX_GROUP_DEPTH,
     SECONDS_IN_HOUR,
     SECONDS_IN_MINUTE,
-    ZWOG_GRAMMAR,
 )
+from zwog.profiling import STAGES, profile, stage, staged
+from zwog.timeline import Timeline, check_expansion
+
+if TYPE_CHECKING:
+    import argparse
+    from array import array
+    from socket import socket
+    from xml.etree.ElementTree import Element, ElementTree  # noqa: S405
+
+    from zwog._parser import Lark
+    from zwog.emitters import Emitter
+    from zwog.transformer import WorkoutTransformer  # noqa: F401
+
+# The parser, ElementTree, argparse, and process pools are imported when they
+# are first needed, so that importing zwog and starting the command line
+# interface stay fast.
 
 
 @dataclass
@@ -32,16 +49,42 @@ class Interval:
 
 @dataclass
 class Block:
-    """Block data."""
+    """Block data.
 
-    intervals: list[Interval]
+    Blocks can be nested as repeated groups of intervals, which are kept with
+    their repeat counts instead of being expanded.
+    """
+
+    intervals: list["Interval | Block"]
     repeats: int = 1
 
 
-class WorkoutTransformer(Transformer[Any, Any]):
-    """Class to process workout parse-trees."""
+def iter_intervals(block: Block) -> Iterator[Interval]:
+    """Iterate over the intervals of a block with the repeats expanded.
+
+    Args:
+        block: Block.
+
+    Yields:
+        Intervals in the order they are performed.
+
+    """
+    for _ in range(block.repeats):
+        for item in block.intervals:
+            if isinstance(item, Block):
+                yield from iter_intervals(item)
+            else:
+                yield item
+
+
+class _WorkoutRules:
+    """Rules turning parse-tree nodes into workout data.
 
-    INT = int
+    Used by :class:`zwog.transformer.WorkoutTransformer` and by the fast path of
+    :func:`parse_workout`, which does not need the parser.
+    """
+
+    REPEATS = int
     NUMBER = float
     TIME_UNIT = str
     duration = tuple
@@ -112,16 +155,293 @@ class WorkoutTransformer(Transformer[Any, Any]):
         return "repeats", r[0]
 
     @staticmethod
-    def intervals(i: list[Interval]) -> tuple[str, list[Interval]]:
-        """Return intervals."""
-        return "intervals", i
+    def intervals(
+        i: "Sequence[Interval | Block]",
+    ) -> tuple[str, list[Interval | Block]]:
+        """Return intervals, with the groups that are not repeated inlined."""
+        items: list[Interval | Block] = []
+        for item in i:
+            if isinstance(item, Block) and item.repeats == 1:
+                items.extend(item.intervals)
+            else:
+                items.append(item)
+        return "intervals", items
 
     @staticmethod
     def block(
-        b: list[tuple[str, int | list[Interval]]],
+        b: "Sequence[tuple[str, int | Sequence[Interval | Block]]]",
     ) -> Block:
-        """Return block."""
-        return Block(**dict(x for x in b if x))  # type: ignore[arg-type]
+        """Return block, with a single repeated group merged into it."""
+        block = Block(**dict(x for x in b if x))  # type: ignore[arg-type]
+        if len(block.intervals) == 1 and isinstance(block.intervals[0], Block):
+            group = block.intervals[0]
+            return Block(
+                intervals=group.intervals, repeats=block.repeats * group.repeats
+            )
+        return block
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Return names imported on first use.
+
+    Raises:
+        AttributeError: Unknown name.
+
+    """
+    if name == "WorkoutTransformer":
+        from zwog.transformer import WorkoutTransformer  # noqa: PLC0415
+
+        return WorkoutTransformer
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+_PARSER_LOCK = Lock()
+
+
+@cache
+def _build_parser() -> "Lark":
+    """Return the workout parser."""
+    with stage("parser"):
+        from zwog._parser import Lark_StandAlone  # noqa: PLC0415
+
+        return cast("Lark", Lark_StandAlone())
+
+
+def get_parser() -> "Lark":
+    """Get the shared workout parser.
+
+    The pre-generated LALR parser (see :mod:`zwog.build_parser`) is loaded on
+    first use and reused afterwards. It is safe to call from several threads.
+
+    Returns:
+        Workout parser.
+
+    """
+    with _PARSER_LOCK:
+        return _build_parser()
+
+
+# Regular expressions mirroring the terminals of ZWOG_GRAMMAR
+_WS = r"[ \t\f\r\n]*"
+_NUMBER = (
+    r"(?:[0-9]+[eE][+-]?[0-9]+"
+    r"|(?:[0-9]+\.(?:[0-9]+)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?"
+    r"|[0-9]+)"
+)
+_T = TypeVar("_T")
+
+_TIME_UNIT = r"(?:sec|min|hrs|s|m|h)"
+
+_REPEATS_RE = re.compile(rf"([0-9]+){_WS}x{_WS}")
+_DURATION_RE = re.compile(rf"({_NUMBER}){_WS}({_TIME_UNIT}){_WS}")
+_INTERVAL_RE = re.compile(
+    rf"((?:{_NUMBER}{_WS}{_TIME_UNIT}{_WS})+)"
+    rf"(?:@{_WS}({_NUMBER}){_WS}"
+    rf"|from{_WS}({_NUMBER}){_WS}to{_WS}({_NUMBER}){_WS})"
+    rf"%{_WS}FTP{_WS}"
+)
+_COMMA_RE = re.compile(rf",{_WS}")
+_OPEN_RE = re.compile(rf"\({_WS}")
+_CLOSE_RE = re.compile(rf"\){_WS}")
+_PARENTHESES_RE = re.compile(r"[()]")
+
+
+def _escape(text: str) -> str:
+    """Return the text with ``&``, ``<``, and ``>`` escaped for XML.
+
+    Same as :func:`xml.sax.saxutils.escape`, which imports :mod:`urllib`.
+    """
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _is_text_file(file: object) -> bool:
+    """Return whether a file-like object is written strings rather than bytes.
+
+    Text files are detected by their type or their ``encoding`` attribute, and
+    every other file-like object is written bytes.
+    """
+    return isinstance(file, TextIOBase) or isinstance(
+        getattr(file, "encoding", None), str
+    )
+
+
+def _write_utf8(file: BinaryIO, text: str) -> None:
+    """Write text to a binary file in UTF-8."""
+    file.write(text.encode("utf-8"))
+
+
+def _write_raw(file: RawIOBase, data: memoryview) -> None:
+    """Write all the data to a raw file.
+
+    Args:
+        file: Raw file.
+        data: Data.
+
+    Raises:
+        BlockingIOError: If the file is non-blocking and not ready for writing.
+            ``characters_written`` is the number of bytes written before.
+
+    """
+    view = data
+    # raw files can write less than asked, or nothing at all
+    while view:
+        written = file.write(view)
+        if written is None:
+            raise BlockingIOError(
+                errno.EAGAIN,
+                "The file is not ready for writing",
+                len(data) - len(view),
+            )
+        view = view[written:]
+
+
+class _FastPathError(Exception):
+    """The workout cannot be parsed on the fast path."""
+
+
+def _parse_interval_fast(workout: str, pos: int) -> tuple[Interval, int]:
+    """Parse an interval without building a parse-tree.
+
+    Args:
+        workout: Workout as a string.
+        pos: Position of the interval.
+
+    Returns:
+        Interval and the position after it.
+
+    Raises:
+        _FastPathError: The interval does not match the grammar.
+
+    """
+    if not (match := _INTERVAL_RE.match(workout, pos)):
+        raise _FastPathError
+    durations, power, power_low, power_high = match.groups()
+    interval = Interval(
+        duration=_WorkoutRules.durations(
+            [(float(value), unit) for value, unit in _DURATION_RE.findall(durations)]
+        ),
+        power=_WorkoutRules.power(
+            [float(power)]
+            if power is not None
+            else [float(power_low), float(power_high)]
+        ),
+    )
+    return interval, match.end()
+
+
+def _parse_block_fast(workout: str, pos: int) -> tuple[Block, int]:
+    """Parse a block or a group without building a parse-tree.
+
+    Args:
+        workout: Workout as a string.
+        pos: Position of the block, or the position after the opening
+            parenthesis of a group.
+
+    Returns:
+        Block and the position after it, or before the closing parenthesis of
+        a group.
+
+    Raises:
+        _FastPathError: The block does not match the grammar.
+
+    """
+    block: list[tuple[str, int | list[Interval | Block]]] = []
+    if match := _REPEATS_RE.match(workout, pos):
+        block.append(_WorkoutRules.repeats([int(match[1])]))
+        pos = match.end()
+    items: list[Interval | Block] = []
+    while True:
+        item: Interval | Block
+        if match := _OPEN_RE.match(workout, pos):
+            item, pos = _parse_block_fast(workout, match.end())
+            if not (match := _CLOSE_RE.match(workout, pos)):
+                raise _FastPathError
+            pos = match.end()
+        else:
+            item, pos = _parse_interval_fast(workout, pos)
+        items.append(item)
+        if not (match := _COMMA_RE.match(workout, pos)):
+            break
+        pos = match.end()
+    block.append(_WorkoutRules.intervals(items))
+    return _WorkoutRules.block(block), pos
+
+
+def _parse_workout_fast(workout: str) -> list[Block]:
+    """Parse the workout without building a parse-tree.
+
+    :class:`_FastPathError` is raised if the workout does not match the
+    grammar.
+
+    Args:
+        workout: Workout as a string.
+
+    Returns:
+        Workout.
+
+    """
+    blocks = []
+    pos = len(workout) - len(workout.lstrip(" \t\f\r\n"))
+    end = len(workout)
+    while pos < end:
+        block, pos = _parse_block_fast(workout, pos)
+        blocks.append(block)
+    return blocks
+
+
+def _check_nesting(workout: str) -> None:
+    """Check that groups are not nested too deeply to be processed.
+
+    Groups can be nested at most :data:`zwog.constants.MAX_GROUP_DEPTH` levels
+    deep.
+
+    Args:
+        workout: Workout as a string.
+
+    Raises:
+        ValueError: Groups are nested too deeply.
+
+    """
+    if workout.count("(") <= MAX_GROUP_DEPTH:
+        return
+    depth = 0
+    for match in _PARENTHESES_RE.finditer(workout):
+        depth += 1 if match[0] == "(" else -1
+        if depth > MAX_GROUP_DEPTH:
+            msg = (
+                f"Groups can be nested at most {MAX_GROUP_DEPTH} levels deep, "
+                f"at position {match.start()}"
+            )
+            raise ValueError(msg)
+
+
+def parse_workout(workout: str) -> list[Block]:
+    """Parse a workout.
+
+    Well-formed workouts are turned into blocks straight from the text, without
+    building a parse-tree. Otherwise, the workout is processed with the parser
+    and :class:`zwog.transformer.WorkoutTransformer` so that the raised
+    exception is the same. Groups nested too deeply for either of them raise
+    a ValueError, see :func:`_check_nesting`.
+
+    Args:
+        workout: Workout as a string.
+
+    Returns:
+        Workout.
+
+    """
+    with stage("parse"):
+        _check_nesting(workout)
+        try:
+            return _parse_workout_fast(workout)
+        except (_FastPathError, ValueError):
+            tree = get_parser().parse(workout)
+    with stage("transform"):
+        from zwog.transformer import WorkoutTransformer  # noqa: PLC0415
+
+        return cast(list[Block], WorkoutTransformer().transform(tree))
 
 
 class ZWOG:
@@ -134,6 +454,8 @@ class ZWOG:
         name: str = "Structured workout",
         category: str | None = None,
         subcategory: str | None = None,
+        *,
+        optimize: bool = False,
     ) -> None:
         """Initialize ZWOG.
 
@@ -143,21 +465,41 @@ class ZWOG:
             name: Workout name.
             category: Workout category.
             subcategory: Workout subcategory.
+            optimize: Whether to rewrite the workout into fewer ZWO elements
+                with the same power profile, see
+                :func:`zwog.optimizer.optimize_blocks`.
 
         """
-        parser = Lark(ZWOG_GRAMMAR, start="workout", maybe_placeholders=False)
-
         self._name = name
         self._author = author
         self._category = category
         self._subcategory = subcategory
 
-        self._workout: list[Block] = WorkoutTransformer().transform(
-            parser.parse(workout)
-        )
-        self._pretty_workout = self._to_pretty(self._workout)
-        self._zwo_workout = self._to_zwo(self._workout)
-        self._tss = self._to_tss(self._workout)
+        self._workout = parse_workout(workout)
+        if optimize:
+            from zwog.optimizer import optimize_blocks  # noqa: PLC0415
+
+            with stage("optimize"):
+                self._workout = optimize_blocks(self._workout)
+
+    @cached_property
+    def _pretty_workout(self) -> str:
+        """Return the workout as a string, computed on first access."""
+        with stage("pretty"):
+            return self._to_pretty(self._workout)
+
+    @cached_property
+    def _zwo_workout(self) -> "ElementTree":
+        """Return the workout as ZWO, computed on first access."""
+        pretty = self._pretty_workout
+        with stage("zwo"):
+            return self._to_zwo(self._workout, pretty)
+
+    @cached_property
+    def _tss(self) -> float:
+        """Return TSS, computed on first access."""
+        with stage("tss"):
+            return self._to_tss(self._workout)
 
     def save_zwo(self, filename: str) -> None:
         """Save the workout in the ZWO format.
@@ -166,7 +508,64 @@ class ZWOG:
             filename: Filename.
 
         """
-        self._zwo_workout.write(filename)
+        with (
+            stage("write"),
+            Path(filename).open(
+                "w", encoding="us-ascii", errors="xmlcharrefreplace", newline="\n"
+            ) as file,
+            stage("zwo"),
+        ):
+            self._write_zwo(staged("write", file.write))
+
+    @cached_property
+    def zwo_bytes(self) -> bytes:
+        """Get the workout as ZWO encoded in UTF-8, serialized on first access."""
+        pieces: list[str] = []
+        with stage("zwo"):
+            self._write_zwo(pieces.append)
+            pieces.append("\n")
+            return "".join(pieces).encode("utf-8")
+
+    def write_zwo(
+        self, file: "TextIO | BinaryIO | RawIOBase | BufferedIOBase | socket"
+    ) -> None:
+        """Write the workout in the ZWO format to a file-like object.
+
+        The output is the same as :attr:`zwo_workout`. Text files, i.e.,
+        :class:`io.TextIOBase` instances and objects with an ``encoding``, are
+        written strings, and any other object with a ``write`` method is
+        written bytes in UTF-8. Both are written incrementally, without
+        holding the document in memory. Unbuffered raw files and sockets, as
+        well as binary files once :attr:`zwo_bytes` has been computed, are
+        written :attr:`zwo_bytes` through a :class:`memoryview`, without
+        copying or encoding the document again. A non-blocking raw file that
+        is not ready for writing raises :class:`BlockingIOError`.
+
+        Args:
+            file: Text or binary file-like object, or a connected socket.
+
+        """
+        if hasattr(file, "sendall"):
+            data = memoryview(self.zwo_bytes)
+            with stage("write"):
+                cast("socket", file).sendall(data)
+        elif isinstance(file, RawIOBase):
+            data = memoryview(self.zwo_bytes)
+            with stage("write"):
+                _write_raw(file, data)
+        elif _is_text_file(file):
+            write = staged("write", cast(TextIO, file).write)
+            with stage("zwo"):
+                self._write_zwo(write)
+                write("\n")
+        elif "zwo_bytes" in self.__dict__:
+            with stage("write"):
+                cast(BinaryIO, file).write(memoryview(self.zwo_bytes))
+        else:
+            write = staged("write", partial(_write_utf8, cast(BinaryIO, file)))
+            with stage("zwo"):
+                self._write_zwo(write)
+                write("\n")
 
     def __str__(self) -> str:
         """Return str."""
@@ -182,13 +581,100 @@ class ZWOG:
         """Return workout."""
         return self._workout
 
+    @property
+    def duration(self) -> int:
+        """Get the duration in seconds."""
+        return sum(self._block_to_duration(block) for block in self._workout)
+
+    @property
+    def author(self) -> str:
+        """Get the author."""
+        return self._author
+
+    @property
+    def name(self) -> str:
+        """Get the workout name."""
+        return self._name
+
+    @property
+    def category(self) -> str | None:
+        """Get the workout category."""
+        return self._category
+
+    @property
+    def subcategory(self) -> str | None:
+        """Get the workout subcategory."""
+        return self._subcategory
+
+    def emit(self, *emitters: "Emitter") -> list[str]:
+        """Produce several output formats in one pass over the blocks.
+
+        Args:
+            *emitters: Emitters of the formats, see :mod:`zwog.emitters`.
+
+        Returns:
+            Outputs in the order of the emitters.
+
+        """
+        from zwog.emitters import BlockData  # noqa: PLC0415
+
+        check_expansion(self._workout)
+        for emitter in emitters:
+            emitter.begin(self)
+        start = 0
+        last = len(self._workout) - 1
+        for block_idx, block in enumerate(self._workout):
+            data = BlockData(
+                self, block, start, first=block_idx == 0, last=block_idx == last
+            )
+            for emitter in emitters:
+                emitter.block(data)
+            start += self._block_to_duration(block)
+        return [emitter.end() for emitter in emitters]
+
+    @cached_property
+    def timeline(self) -> Timeline:
+        """Get the workout as a timeline with repeats expanded."""
+        return Timeline.from_blocks(self._workout)
+
+    def power_trace(self, resolution: float = 1) -> "array[float]":
+        """Return the second-by-second target power.
+
+        See :meth:`zwog.timeline.Timeline.power_trace`.
+
+        Args:
+            resolution: Time between samples in seconds.
+
+        Returns:
+            Powers in percent of FTP.
+
+        """
+        return self.timeline.power_trace(resolution)
+
+    def iter_power_trace(
+        self, resolution: float = 1, chunk_size: int = 4096
+    ) -> "Iterator[array[float]]":
+        """Iterate over the second-by-second target power in chunks.
+
+        See :meth:`zwog.timeline.Timeline.iter_power`.
+
+        Args:
+            resolution: Time between samples in seconds.
+            chunk_size: Maximum number of samples per chunk.
+
+        Returns:
+            Iterator over chunks of powers in percent of FTP.
+
+        """
+        return self.timeline.iter_power(resolution, chunk_size)
+
     @property
     def zwo_workout(self) -> str:
         """Get the workout as ZWO."""
-        return tostring(self.element_workout, encoding="unicode") + "\n"
+        return self.zwo_bytes.decode("utf-8")
 
     @property
-    def element_workout(self) -> Element:
+    def element_workout(self) -> "Element":
         """Get the workout as element."""
         return self._zwo_workout.getroot()
 
@@ -203,7 +689,11 @@ class ZWOG:
             True if a ramp, False otherwise.
 
         """
-        return len(block.intervals) == 1 and isinstance(block.intervals[0].power, list)
+        return (
+            len(block.intervals) == 1
+            and isinstance(block.intervals[0], Interval)
+            and isinstance(block.intervals[0].power, list)
+        )
 
     @staticmethod
     def _is_steady_state(block: Block) -> bool:
@@ -216,8 +706,10 @@ class ZWOG:
             True if a steady-state, False otherwise.
 
         """
-        return len(block.intervals) == 1 and not isinstance(
-            block.intervals[0].power, list
+        return (
+            len(block.intervals) == 1
+            and isinstance(block.intervals[0], Interval)
+            and not isinstance(block.intervals[0].power, list)
         )
 
     @staticmethod
@@ -231,24 +723,23 @@ class ZWOG:
             True if an intervalst , False otherwise.
 
         """
-        return (
-            len(block.intervals) == INTERVALST_LENGTH
-            and not isinstance(block.intervals[0].power, list)
-            and not isinstance(block.intervals[1].power, list)
+        return len(block.intervals) == INTERVALST_LENGTH and all(
+            isinstance(interval, Interval) and not isinstance(interval.power, list)
+            for interval in block.intervals
         )
 
     @staticmethod
-    def _interval_to_xml(
+    def _interval_to_attributes(
         interval: Interval | list[Interval], repeats: int = 1
-    ) -> Element:
-        """Return the interval as a XML node.
+    ) -> tuple[str, dict[str, str]]:
+        """Return the interval as a XML tag and attributes.
 
         Args:
             interval: The interval.
             repeats: Number of repeats.
 
         Returns:
-            XML node representing the interval.
+            XML tag and attributes representing the interval.
 
         Raises:
             TypeError: Unexpected interval type.
@@ -256,86 +747,218 @@ class ZWOG:
         """
         if isinstance(interval, Interval):
             if not isinstance(interval.power, list):  # steady-state
-                element = Element("SteadyState")
-                element.set("Duration", str(interval.duration))
-                element.set("Power", str(interval.power / 100))
-            else:  # ramp
-                element = Element("Ramp")
-                element.set("Duration", str(interval.duration))
-                element.set("PowerLow", str(interval.power[0] / 100))
-                element.set("PowerHigh", str(interval.power[1] / 100))
-        elif (
+                return "SteadyState", {
+                    "Duration": str(interval.duration),
+                    "Power": str(interval.power / 100),
+                }
+            # ramp
+            return "Ramp", {
+                "Duration": str(interval.duration),
+                "PowerLow": str(interval.power[0] / 100),
+                "PowerHigh": str(interval.power[1] / 100),
+            }
+        if (
             isinstance(interval, list)
             and isinstance(interval[0].power, float)
             and isinstance(interval[1].power, float)
         ):  # intervalst
-            element = Element("IntervalsT")
-            element.set("Repeat", str(repeats))
-            element.set("OnDuration", str(interval[0].duration))
-            element.set("OnPower", str(interval[0].power / 100))
-            element.set("OffDuration", str(interval[1].duration))
-            element.set("OffPower", str(interval[1].power / 100))
+            return "IntervalsT", {
+                "Repeat": str(repeats),
+                "OnDuration": str(interval[0].duration),
+                "OnPower": str(interval[0].power / 100),
+                "OffDuration": str(interval[1].duration),
+                "OffPower": str(interval[1].power / 100),
+            }
+        msg = f"Unexpected interval: {interval}"
+        raise TypeError(msg)
+
+    def _zwo_metadata(self, pretty: str) -> list[tuple[str, str]]:
+        """Return the metadata of the ZWO file.
+
+        Args:
+            pretty: Blocks as a string, used in the description.
+
+        Returns:
+            XML tags and texts of the metadata.
+
+        """
+        return [
+            (child, value)
+            for child, value in [
+                ("author", self._author),
+                ("name", self._name),
+                (
+                    "description",
+                    ("This workout was generated using ZWOG.\n\n" f"{pretty}"),
+                ),
+                ("sportType", "bike"),
+                ("category", self._category),
+                ("subcategory", self._subcategory),
+            ]
+            if value is not None
+        ]
+
+    def _zwo_intervals(
+        self, blocks: list[Block]
+    ) -> Iterator[tuple[str, dict[str, str]]]:
+        """Return the intervals of the ZWO file.
+
+        Args:
+            blocks: Blocks.
+
+        Yields:
+            XML tags and attributes of the intervals.
+
+        """
+        for block_idx, block in enumerate(blocks):
+            yield from self._block_to_intervals(
+                block, first=block_idx == 0, last=block_idx == len(blocks) - 1
+            )
+
+    def _block_to_intervals(
+        self, block: Block, *, first: bool = False, last: bool = False
+    ) -> Iterator[tuple[str, dict[str, str]]]:
+        """Return the intervals of a block in the ZWO file.
+
+        Args:
+            block: Block.
+            first: Whether the block is the first one of the workout.
+            last: Whether the block is the last one of the workout.
+
+        Yields:
+            XML tags and attributes of the intervals.
+
+        """
+        # warmup and cooldown
+        if (first or last) and self._is_ramp(block) and block.repeats == 1:
+            _, attributes = self._interval_to_attributes(
+                cast(Interval, block.intervals[0])
+            )
+            yield ("Warmup" if first else "Cooldown"), attributes
+        # ramp or steady state
+        elif self._is_ramp(block) or self._is_steady_state(block):
+            for _ in range(block.repeats):
+                yield self._interval_to_attributes(cast(Interval, block.intervals[0]))
+        # intervalst
+        elif self._is_intervalst(block):
+            yield self._interval_to_attributes(
+                cast(list[Interval], block.intervals), repeats=block.repeats
+            )
+        # non intervalst, with nested groups expanded here
         else:
-            msg = f"Unexpected interval: {interval}"
-            raise TypeError(msg)
-        return element
+            for _ in range(block.repeats):
+                for item in block.intervals:
+                    if isinstance(item, Block):
+                        yield from self._block_to_intervals(item)
+                    else:
+                        yield self._interval_to_attributes(item)
+
+    def _block_to_zwo(
+        self, block: Block, *, first: bool = False, last: bool = False
+    ) -> str:
+        """Return the intervals of a block as a ZWO fragment.
+
+        Args:
+            block: Block.
+            first: Whether the block is the first one of the workout.
+            last: Whether the block is the last one of the workout.
+
+        Returns:
+            XML elements of the intervals.
+
+        """
+        check_expansion([block])
+        if block.repeats > 1 and any(isinstance(x, Block) for x in block.intervals):
+            # a nested block is neither a warmup nor a cooldown, so its
+            # fragment is converted once and repeated
+            return self._block_to_zwo(Block(block.intervals)) * block.repeats
+        # attribute values are numbers, so there is nothing to escape
+        return "".join(
+            f"<{tag}"
+            + "".join(f' {key}="{value}"' for key, value in attributes.items())
+            + " />"
+            for tag, attributes in self._block_to_intervals(
+                block, first=first, last=last
+            )
+        )
+
+    def _zwo_fragments(self) -> Iterator[str]:
+        """Return the ZWO fragments of the blocks.
+
+        Yields:
+            XML elements of the intervals of each block.
+
+        """
+        for block_idx, block in enumerate(self._workout):
+            yield self._block_to_zwo(
+                block,
+                first=block_idx == 0,
+                last=block_idx == len(self._workout) - 1,
+            )
 
-    def _to_zwo(self, blocks: list[Block]) -> ElementTree:
+    def _to_zwo(self, blocks: list[Block], pretty: str) -> "ElementTree":
         """Convert to ZWO.
 
         See: https://github.com/h4l/zwift-workout-file-reference/blob/master/zwift_workout_file_tag_reference.md
 
         Args:
             blocks: Blocks.
+            pretty: Blocks as a string, used in the description.
 
         Returns:
             XML tree representing the workout.
 
         """
+        from xml.etree.ElementTree import (  # noqa: PLC0415, S405
+            Element,
+            ElementTree,
+            SubElement,
+        )
+
+        check_expansion(blocks)
         root = Element("workout_file")
 
         # fill metadata
-        for child, value in [
-            ("author", self._author),
-            ("name", self._name),
-            (
-                "description",
-                (
-                    "This workout was generated using ZWOG.\n\n"
-                    f"{self._to_pretty(blocks)}"
-                ),
-            ),
-            ("sportType", "bike"),
-            ("category", self._category),
-            ("subcategory", self._subcategory),
-        ]:
-            if value is not None:
-                tmp = SubElement(root, child)
-                tmp.text = value
+        for child, value in self._zwo_metadata(pretty):
+            tmp = SubElement(root, child)
+            tmp.text = value
 
         tmp = SubElement(root, "workout")
-        for block_idx, block in enumerate(blocks):
-            # warmup and ramp
-            if block_idx in {0, (len(blocks) - 1)} and self._is_ramp(block):
-                element = self._interval_to_xml(block.intervals[0])
-                element.tag = "Warmup" if block_idx == 0 else "Cooldown"
-                tmp.append(element)
-            # ramp or steady state
-            elif self._is_ramp(block) or self._is_steady_state(block):
-                for _ in range(block.repeats):
-                    tmp.append(self._interval_to_xml(block.intervals[0]))
-            # intervalst
-            elif self._is_intervalst(block):
-                tmp.append(
-                    self._interval_to_xml(block.intervals, repeats=block.repeats)
-                )
-            # non intervalst
-            else:
-                for _ in range(block.repeats):
-                    for interval in block.intervals:
-                        tmp.append(self._interval_to_xml(interval))
+        tmp.extend(starmap(Element, self._zwo_intervals(blocks)))
         return ElementTree(root)
 
+    def _write_zwo(
+        self,
+        write: Callable[[str], object],
+        pretty: str | None = None,
+        fragments: Iterable[str] | None = None,
+    ) -> None:
+        """Write the workout in the ZWO format piece by piece.
+
+        The output is the same as serializing :attr:`element_workout` with
+        :mod:`xml.etree.ElementTree`, but no tree is built.
+
+        Args:
+            write: Function writing a piece of the document.
+            pretty: Blocks as a string. :attr:`_pretty_workout` if None.
+            fragments: ZWO fragments of the blocks. :meth:`_zwo_fragments` if
+                None.
+
+        """
+        check_expansion(self._workout)
+        write("<workout_file>")
+        if pretty is None:
+            pretty = self._pretty_workout
+        for child, value in self._zwo_metadata(pretty):
+            write(f"<{child}>{_escape(value)}</{child}>" if value else f"<{child} />")
+        workout_tag = "<workout>"
+        for fragment in self._zwo_fragments() if fragments is None else fragments:
+            write(workout_tag + fragment)
+            workout_tag = ""
+        write(
+            "<workout /></workout_file>" if workout_tag else "</workout></workout_file>"
+        )
+
     @staticmethod
     def _duration_to_pretty_str(duration: int) -> str:
         """Prettify and stringify duration given in seconds.
@@ -424,12 +1047,25 @@ class ZWOG:
             str: String representation of the workout.
 
         """
-        return "\n".join(
-            (f"{block.repeats}x " if block.repeats > 1 else "")
-            + ", ".join(
-                [self._interval_to_str(interval) for interval in block.intervals]
-            )
-            for block in blocks
+        return "\n".join(self._block_to_pretty(block) for block in blocks)
+
+    def _block_to_pretty(self, block: Block) -> str:
+        """Return a block as a string.
+
+        Args:
+            block: Block.
+
+        Returns:
+            String representation of the block.
+
+        """
+        return (f"{block.repeats}x " if block.repeats > 1 else "") + ", ".join(
+            [
+                f"({self._block_to_pretty(item)})"
+                if isinstance(item, Block)
+                else self._interval_to_str(item)
+                for item in block.intervals
+            ]
         )
 
     def _to_tss(self, blocks: list[Block]) -> float:
@@ -442,21 +1078,341 @@ class ZWOG:
             Calculated TSS.
 
         """
-        return sum(
-            self._interval_to_tss(block.intervals[0])
-            if self._is_ramp(block) or self._is_steady_state(block)
-            else sum(
-                block.repeats * self._interval_to_tss(interval)
-                for interval in block.intervals
+        return sum(self._block_to_tss(block) for block in blocks)
+
+    def _block_to_tss(self, block: Block) -> float:
+        """Calculate TSS for a block.
+
+        Args:
+            block: Block.
+
+        Returns:
+            Calculated TSS.
+
+        """
+        return block.repeats * sum(
+            self._block_to_tss(item)
+            if isinstance(item, Block)
+            else self._interval_to_tss(item)
+            for item in block.intervals
+        )
+
+    def _block_to_duration(self, block: Block) -> int:
+        """Calculate the duration of a block.
+
+        Args:
+            block: Block.
+
+        Returns:
+            Duration in seconds.
+
+        """
+        return block.repeats * sum(
+            self._block_to_duration(item) if isinstance(item, Block) else item.duration
+            for item in block.intervals
+        )
+
+
+def _format_error(error: Exception) -> str:
+    """Return an error as its type and the first line of its message."""
+    message = next(iter(str(error).splitlines()), "")
+    return f"{type(error).__name__}: {message}"
+
+
+def _map_jobs(
+    func: "Callable[..., _T]", *iterables: "Iterable[Any]", jobs: int | None = 1
+) -> "Iterator[_T]":
+    """Map a function over files, in worker processes unless ``jobs`` is 1.
+
+    Args:
+        func: Function converting a file, run in the worker processes.
+        *iterables: Arguments of the function.
+        jobs: Number of worker processes. None uses all CPUs.
+
+    Yields:
+        Results in the order of the arguments.
+
+    """
+    if jobs == 1:
+        yield from map(func, *iterables)
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+        arguments = [list(x) for x in iterables]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(
+                func,
+                *arguments,
+                # a few chunks per worker, so that workers finishing early
+                # take on more files
+                chunksize=max(1, len(arguments[0]) // (4 * (jobs or 8))),
             )
-            for block in blocks
+
+
+@dataclass
+class ConversionResult:
+    """Result of converting a workout file."""
+
+    input_file: Path
+    output_file: Path
+    error: str | None = None
+
+
+def expand_inputs(inputs: list[str]) -> list[Path]:
+    """Expand files, directories, and glob patterns into workout files.
+
+    Directories are expanded into the files they contain, except ZWO files.
+    Inputs that match nothing are kept so that they can be reported.
+
+    Args:
+        inputs: Filenames, directories, or glob patterns.
+
+    Returns:
+        Workout files without duplicates.
+
+    """
+    input_files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            input_files.extend(
+                sorted(x for x in path.iterdir() if x.is_file() and x.suffix != ".zwo")
+            )
+        elif path.exists():
+            input_files.append(path)
+        elif matches := sorted(glob(item, recursive=True)):  # noqa: PTH207
+            input_files.extend(Path(x) for x in matches if Path(x).is_file())
+        else:
+            input_files.append(path)
+    return list(dict.fromkeys(input_files))
+
+
+def convert_file(
+    input_file: Path,
+    output_file: Path,
+    author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+    name: str | None = None,
+    category: str | None = None,
+    subcategory: str | None = None,
+    *,
+    optimize: bool = False,
+) -> ConversionResult:
+    """Convert a workout file into a ZWO file.
+
+    Args:
+        input_file: Workout file.
+        output_file: ZWO file.
+        author: Author.
+        name: Workout name. Defaults to the stem of the input filename.
+        category: Workout category.
+        subcategory: Workout subcategory.
+        optimize: Whether to optimize the workout into fewer ZWO elements.
+
+    Returns:
+        Conversion result. Errors are reported in the result instead of
+        being raised.
+
+    """
+    try:
+        workout = ZWOG(
+            input_file.read_text(encoding="utf-8"),
+            author,
+            input_file.stem if name is None else name,
+            category,
+            subcategory,
+            optimize=optimize,
+        )
+        with output_file.open("wb") as file:
+            workout.write_zwo(file)
+    except Exception as error:  # noqa: BLE001
+        return ConversionResult(input_file, output_file, _format_error(error))
+    return ConversionResult(input_file, output_file)
+
+
+def convert_files(
+    input_files: list[Path],
+    output_dir: Path | None = None,
+    jobs: int | None = 1,
+    author: str = ("Zwift workout generator (https://github.com/tare/zwog)"),
+    name: str | None = None,
+    category: str | None = None,
+    subcategory: str | None = None,
+    *,
+    optimize: bool = False,
+) -> Iterator[ConversionResult]:
+    """Convert workout files into ZWO files.
+
+    Args:
+        input_files: Workout files.
+        output_dir: Output directory. Defaults to the directory of each input
+            file.
+        jobs: Number of worker processes. None uses all CPUs.
+        author: Author.
+        name: Workout name. Defaults to the stem of each input filename.
+        category: Workout category.
+        subcategory: Workout subcategory.
+        optimize: Whether to optimize the workouts into fewer ZWO elements.
+
+    Yields:
+        Conversion results in the order of the input files. Inputs whose
+        output file is also the output file of an earlier input are not
+        converted and reported as errors.
+
+    """
+    output_files = [
+        (input_file.parent if output_dir is None else output_dir)
+        / f"{input_file.stem}.zwo"
+        for input_file in input_files
+    ]
+    first_inputs: dict[Path, Path] = {}
+    duplicates: dict[int, ConversionResult] = {}
+    for idx, (input_file, output_file) in enumerate(
+        zip(input_files, output_files, strict=True)
+    ):
+        first_input = first_inputs.setdefault(output_file.resolve(), input_file)
+        if first_input is not input_file:
+            duplicates[idx] = ConversionResult(
+                input_file,
+                output_file,
+                f"FileExistsError: {output_file} is already written for "
+                f"{first_input}",
+            )
+    if duplicates:
+        unique = [idx for idx in range(len(input_files)) if idx not in duplicates]
+        results = convert_files(
+            [input_files[idx] for idx in unique],
+            output_dir,
+            jobs,
+            author,
+            name,
+            category,
+            subcategory,
+            optimize=optimize,
         )
+        for idx in range(len(input_files)):
+            yield duplicates[idx] if idx in duplicates else next(results)
+        return
+    convert = partial(
+        convert_file,
+        author=author,
+        name=name,
+        category=category,
+        subcategory=subcategory,
+        optimize=optimize,
+    )
+    yield from _map_jobs(convert, input_files, output_files, jobs=jobs)
+
+
+def _convert_batch(options: "argparse.Namespace") -> NoReturn:
+    """Convert workout files and report a summary."""
+    input_files = expand_inputs(options.inputs)
+    if options.output_dir is not None:
+        options.output_dir.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    errors = 0
+    for result in convert_files(
+        input_files,
+        options.output_dir,
+        options.jobs or None,
+        options.author,
+        options.name,
+        options.category,
+        options.subcategory,
+        optimize=options.optimize,
+    ):
+        if result.error is not None:
+            errors += 1
+            sys.stderr.write(f"{result.input_file}: {result.error}\n")
+    elapsed = time.perf_counter() - start
+
+    sys.stderr.write(
+        f"Converted {len(input_files) - errors}/{len(input_files)} files "
+        f"({errors} errors) in {elapsed:.2f}s "
+        f"({len(input_files) / elapsed if elapsed else 0:.1f} files/s)\n"
+    )
+    sys.exit(1 if errors else 0)
+
+
+@contextmanager
+def _profiling(options: "argparse.Namespace") -> Iterator[None]:
+    """Profile the conversion if requested on the command line.
+
+    The report is written to stderr when the context exits, also when the
+    conversion ends with :func:`sys.exit`.
+
+    Args:
+        options: Command line options.
+
+    Yields:
+        None.
+
+    """
+    if not options.profile:
+        yield
+        return
+    with profile(options.profile_stage) as profiler:
+        try:
+            yield
+        finally:
+            sys.stderr.write(profiler.report())
+            stats = profiler.stats
+            if stats is not None:
+                if options.profile_output is not None:
+                    stats.dump_stats(options.profile_output)
+                else:
+                    stats.stream = sys.stderr  # type: ignore[attr-defined]
+                    stats.sort_stats("cumulative").print_stats(25)
+
+
+def _subcommand(argv: list[str]) -> None:
+    """Run a sub-command and exit if the arguments start with one.
+
+    Args:
+        argv: Command line arguments.
+
+    """
+    if argv[:1] == ["serve"]:
+        from zwog.server import main as serve  # noqa: PLC0415
+
+        serve(argv[1:])
+        sys.exit(0)
+    if argv[:1] == ["pipe"]:
+        from zwog.pipe import main as pipe  # noqa: PLC0415
+
+        pipe(argv[1:])
+    if argv[:1] == ["index"]:
+        from zwog.index import main as index  # noqa: PLC0415
+
+        index(argv[1:])
+
+
+def main(argv: list[str] | None = None) -> NoReturn:
+    """ZWOG command line interface.
 
+    Args:
+        argv: Command line arguments.
 
-def main() -> NoReturn:
-    """ZWOG command line interface."""
-    parser = argparse.ArgumentParser(description="Zwift workout generator")
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    _subcommand(argv)
 
+    import argparse  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        description="Zwift workout generator",
+        epilog="Run 'zwog serve --help' for the conversion server, "
+        "'zwog pipe --help' for streaming NDJSON conversion, and "
+        "'zwog index --help' for indexing workout libraries.",
+    )
+
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        metavar="INPUT",
+        help="input files, directories, or glob patterns (batch mode)",
+    )
     parser.add_argument(
         "-i",
         "--input_file",
@@ -464,7 +1420,7 @@ def main() -> NoReturn:
         action="store",
         dest="input_file",
         type=argparse.FileType("r"),
-        default=sys.stdin,
+        default=None,
         help="input filename",
     )
     parser.add_argument(
@@ -473,10 +1429,29 @@ def main() -> NoReturn:
         nargs="?",
         action="store",
         dest="output_file",
-        type=argparse.FileType("w"),
-        default=sys.stdout,
+        type=Path,
+        default=None,
         help="output filename",
     )
+    parser.add_argument(
+        "-d",
+        "--output_dir",
+        "--output-dir",
+        action="store",
+        dest="output_dir",
+        type=Path,
+        default=None,
+        help="output directory (batch mode)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 uses all CPUs (batch mode)",
+    )
     parser.add_argument(
         "-a",
         "--author",
@@ -493,9 +1468,10 @@ def main() -> NoReturn:
         action="store",
         dest="name",
         type=str,
-        default="Structured workout",
+        default=None,
         required=False,
-        help="workout name",
+        help="workout name (default: 'Structured workout', or the input "
+        "filename in batch mode)",
     )
     parser.add_argument(
         "-c",
@@ -517,27 +1493,93 @@ def main() -> NoReturn:
         required=False,
         help="subcategory",
     )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        action="store_true",
+        dest="optimize",
+        help="merge adjacent equal intervals and repeated patterns into fewer "
+        "ZWO elements",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        dest="profile",
+        help="print the time and the net change in allocated memory blocks of "
+        "each conversion stage to stderr",
+    )
+    parser.add_argument(
+        "--profile_stage",
+        "--profile-stage",
+        action="store",
+        dest="profile_stage",
+        choices=STAGES,
+        default=None,
+        metavar="STAGE",
+        help="run a stage under cProfile and print its statistics to stderr, "
+        f"one of {', '.join(STAGES)} (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile_output",
+        "--profile-output",
+        action="store",
+        dest="profile_output",
+        type=Path,
+        default=None,
+        help="write the cProfile statistics to a pstats file instead",
+    )
     parser.add_argument(
         "-v",
         "--version",
-        action="version",
-        version=f"zwog {version('zwog')}",
+        action="store_true",
+        dest="version",
+        help="show program's version number and exit",
     )
 
-    options = parser.parse_args()
-
-    with options.input_file:
-        workout_text = options.input_file.read()
-
-    workout = ZWOG(
-        workout_text,
-        options.author,
-        options.name,
-        options.category,
-        options.subcategory,
-    )
+    options = parser.parse_args(argv)
+
+    if options.version:
+        # looking up the version scans the installed distributions
+        from importlib.metadata import version  # noqa: PLC0415
+
+        sys.stdout.write(f"zwog {version('zwog')}\n")
+        sys.exit(0)
+
+    if options.jobs < 0:
+        parser.error("argument -j/--jobs: must not be negative")
+    if options.inputs and (
+        options.input_file is not None or options.output_file is not None
+    ):
+        parser.error("-i/-o cannot be combined with batch mode inputs")
+    if not options.inputs and options.output_dir is not None:
+        parser.error("-d/--output_dir requires batch mode inputs")
+    if options.profile_output is not None and options.profile_stage is None:
+        parser.error("--profile_output requires --profile_stage")
+    options.profile = options.profile or options.profile_stage is not None
+    if options.profile and options.jobs != 1:
+        parser.error("--profile requires -j/--jobs 1")
+
+    with _profiling(options):
+        if options.inputs:
+            _convert_batch(options)
+
+        with options.input_file or sys.stdin as input_file:
+            workout_text = input_file.read()
+
+        workout = ZWOG(
+            workout_text,
+            options.author,
+            "Structured workout" if options.name is None else options.name,
+            options.category,
+            options.subcategory,
+            optimize=options.optimize,
+        )
 
-    with options.output_file:
-        options.output_file.write(workout.zwo_workout)
+        with (
+            nullcontext(sys.stdout.buffer)
+            if options.output_file is None
+            else options.output_file.open("wb")
+        ) as output_file:
+            workout.write_zwo(output_file)
 
     sys.exit(0)
@@ -0,0 +1,141 @@
+"""unit tests for zwog.algebra."""
+
+from random import Random
+
+import pytest
+
+from zwog.algebra import ComposedWorkout
+from zwog.utils import ZWOG, Block, Interval
+
+WARMUP = "10m from 40 to 80% FTP"
+MAIN = "3x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP\n2x 20m @ 90% FTP"
+COOLDOWN = "5m from 60 to 40% FTP"
+
+
+def assert_same(workout: ComposedWorkout, text: str) -> None:
+    """Assert that the composed workout matches a workout parsed from text."""
+    zwog = ZWOG(text, "author", "name", "category")
+    assert workout.workout == zwog.workout
+    assert str(workout) == str(zwog)
+    assert workout.tss == pytest.approx(zwog.tss)
+    assert workout.duration == zwog.duration
+    assert workout.zwo_bytes == zwog.zwo_bytes
+    assert workout.timeline == zwog.timeline
+
+
+def test_composed_workout() -> None:
+    """Test concatenating workouts."""
+    warmup, main, cooldown = ZWOG(WARMUP), ZWOG(MAIN), ZWOG(COOLDOWN)
+    workout = ComposedWorkout([warmup, main], "author", "name", "category")
+    assert_same(workout, f"{WARMUP}\n{MAIN}")
+    concatenated = workout.concat(cooldown, ComposedWorkout([main]))
+    assert_same(concatenated, f"{WARMUP}\n{MAIN}\n{COOLDOWN}\n{MAIN}")
+    assert all(x is y for x, y in zip(concatenated.parts, workout.parts, strict=False))
+    assert_same(ComposedWorkout([], "author", "name", "category"), "")
+
+
+def test_lazy_parts() -> None:
+    """Test that strings and ZWO fragments are converted on first use."""
+    text = (
+        "1000x (1000x (1000x 1s @ 50% FTP, 1s @ 60% FTP), 1s @ 70% FTP), 1s @ 80% FTP"
+    )
+    workout = ComposedWorkout([ZWOG(text)]).repeat(2).scale_power(0.5)
+    assert workout.tss == pytest.approx(ZWOG(text).tss)
+    assert all("zwo" not in vars(x) for x in workout.parts)
+    with pytest.raises(ValueError, match="at most"):
+        _ = workout.zwo_bytes
+
+    workout = ComposedWorkout([ZWOG(MAIN)]).repeat(3)
+    assert all({"pretty", "zwo"}.isdisjoint(vars(x)) for x in workout.parts)
+    _ = workout.zwo_bytes
+    # the repeated parts are converted once and shared
+    assert all({"pretty", "zwo"} <= set(vars(x)) for x in workout.parts)
+
+
+def test_repeat() -> None:
+    """Test repeating a workout."""
+    workout = ComposedWorkout([ZWOG(MAIN)], "author", "name", "category")
+    assert_same(workout.repeat(3), "\n".join([MAIN] * 3))
+    assert_same(workout.repeat(0), "")
+    with pytest.raises(ValueError, match="positive"):
+        workout.repeat(-1)
+
+
+def test_scale_power() -> None:
+    """Test scaling the powers of a workout."""
+    workout = ComposedWorkout([ZWOG(f"{WARMUP}\n{MAIN}")], "author", "name", "category")
+    assert_same(
+        workout.scale_power(0.5),
+        "10m from 20 to 40% FTP\n"
+        "3x (4x 30s @ 60% FTP, 30s @ 25% FTP), 5m @ 27.5% FTP\n"
+        "2x 20m @ 45% FTP",
+    )
+    with pytest.raises(ValueError, match="positive"):
+        workout.scale_power(-1)
+
+
+def test_scale_duration() -> None:
+    """Test scaling the durations of a workout."""
+    workout = ComposedWorkout([ZWOG(f"{WARMUP}\n{MAIN}")], "author", "name", "category")
+    assert_same(
+        workout.scale_duration(1.5),
+        "15m from 40 to 80% FTP\n"
+        "3x (4x 45s @ 120% FTP, 45s @ 50% FTP), 7m30s @ 55% FTP\n"
+        "2x 30m @ 90% FTP",
+    )
+    assert workout.scale_duration(0.1).duration == 60 + 3 * (4 * 6 + 30) + 240
+    with pytest.raises(ValueError, match="strictly positive"):
+        workout.scale_duration(0.01)
+
+
+@pytest.mark.parametrize(
+    ("start", "end", "expected"),
+    [
+        (0, 600, WARMUP),
+        (-10, 100000, f"{WARMUP}\n{MAIN}"),
+        (300, 600, "5m from 60 to 80% FTP"),
+        (
+            600 + 540,
+            600 + 1620 + 60,
+            "2x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP\n1m @ 90% FTP",
+        ),
+        (
+            600 + 15,
+            600 + 540 + 600,
+            "15s @ 120% FTP, 30s @ 50% FTP, (3x 30s @ 120% FTP, 30s @ 50% FTP), "
+            "5m @ 55% FTP\n"
+            "(4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP\n"
+            "30s @ 120% FTP, 30s @ 50% FTP",
+        ),
+        (600, 600, ""),
+        (700, 600, ""),
+    ],
+)
+def test_slice(start: int, end: int, expected: str) -> None:
+    """Test slicing a workout."""
+    workout = ComposedWorkout([ZWOG(f"{WARMUP}\n{MAIN}")], "author", "name", "category")
+    assert_same(workout.slice(start, end), expected)
+
+
+def test_slice_shares_blocks() -> None:
+    """Test that blocks within the times are not converted again."""
+    workout = ComposedWorkout([ZWOG(f"{WARMUP}\n{MAIN}\n{COOLDOWN}")])
+    sliced = workout.slice(300, workout.duration - 60)
+    assert sliced.parts[1] is workout.parts[1]
+    assert sliced.parts[2] is workout.parts[2]
+    assert sliced.workout[0] == Block([Interval(300, [60.0, 80.0])])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_slice_profile(seed: int) -> None:
+    """Test that slices have the power profile of the workout."""
+    rng = Random(seed)  # noqa: S311
+    workout = ComposedWorkout([ZWOG(f"{WARMUP}\n{MAIN}\n{COOLDOWN}")])
+    trace = workout.power_trace()
+    for _ in range(20):
+        start = rng.randrange(workout.duration)
+        end = rng.randrange(start + 1, workout.duration + 1)
+        sliced = workout.slice(start, end)
+        assert sliced.duration == end - start
+        assert list(sliced.power_trace()) == pytest.approx(list(trace[start:end]))
+        assert ZWOG(str(sliced)).duration == sliced.duration
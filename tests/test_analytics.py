@@ -0,0 +1,88 @@
+"""unit tests for zwog.analytics."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from zwog.analytics import pack, tss_many, zones_many  # noqa: E402
+from zwog.utils import ZWOG  # noqa: E402
+
+WORKOUTS = [
+    r"60s @ 100% FTP",
+    r"60s from 0 to 100% FTP",
+    r"1h @ 66% FTP, 1h @ 100% FTP",
+    r"",
+    r"3x 60s @ 100% FTP 2x 1m from 40 to 80% FTP, 30s @ 120% FTP",
+    r"2x 10m from 40 to 80% FTP 5m @ 50% FTP 3x 5m from 70 to 50% FTP",
+]
+
+
+def test_tss_many() -> None:
+    """Test tss_many against ZWOG."""
+    workouts = [ZWOG(x) for x in WORKOUTS]
+    metrics = tss_many(workouts)
+    assert metrics.tss.tolist() == pytest.approx([x.tss for x in workouts])
+    assert metrics.duration.tolist() == [x.timeline.total_duration for x in workouts]
+    assert metrics.intensity_factor.tolist() == pytest.approx(
+        [
+            1.0,
+            0.5,
+            0.83,
+            0.0,
+            (3 * 60 * 100 + 2 * (60 * 60 + 30 * 120)) / (3 * 60 + 2 * 90) / 100,
+            (2 * 600 * 60 + 300 * 50 + 3 * 300 * 60) / (2 * 600 + 300 + 3 * 300) / 100,
+        ]
+    )
+
+
+def test_tss_many_blocks() -> None:
+    """Test tss_many with blocks and packed segments."""
+    blocks = [ZWOG(x).workout for x in WORKOUTS]
+    expected = tss_many([ZWOG(x) for x in WORKOUTS])
+    for metrics in [tss_many(blocks), tss_many(pack(blocks))]:
+        assert metrics.tss.tolist() == expected.tss.tolist()
+        assert metrics.duration.tolist() == expected.duration.tolist()
+
+
+def test_tss_many_empty() -> None:
+    """Test tss_many without workouts."""
+    metrics = tss_many([])
+    assert metrics.tss.shape == (0,)
+    assert metrics.intensity_factor.shape == (0,)
+
+
+def test_pack() -> None:
+    """Test pack."""
+    segments = pack([ZWOG(r"2x 1m @ 50% FTP"), ZWOG(r""), ZWOG(r"1m @ 60% FTP")])
+    assert segments.count == 3  # noqa: PLR2004
+    assert segments.workout.tolist() == [0, 0, 2]
+    assert segments.duration.tolist() == [60, 60, 60]
+    assert segments.power_low.tolist() == [50, 50, 60]
+
+
+@pytest.mark.parametrize("boundaries", [(55, 75, 90, 105, 120, 150), (), (50, 100)])
+def test_zones_many(boundaries: tuple[float, ...]) -> None:
+    """Test zones_many against Timeline.time_in_zones."""
+    workouts = [ZWOG(x) for x in WORKOUTS]
+    times = zones_many(workouts, boundaries)
+    assert times.shape == (len(WORKOUTS), len(boundaries) + 1)
+    for row, workout in zip(times.tolist(), workouts, strict=True):
+        assert row == pytest.approx(workout.timeline.time_in_zones(boundaries))
+    assert times.sum(axis=1).tolist() == pytest.approx(
+        tss_many(workouts).duration.tolist()
+    )
+
+
+def test_zones_many_ramps() -> None:
+    """Test that ramps are split at the zone boundaries."""
+    segments = pack([ZWOG(r"60s from 0 to 100% FTP").workout])
+    assert zones_many(segments).tolist() == [[33.0, 12.0, 9.0, 6.0, 0.0, 0.0, 0.0]]
+    assert zones_many(
+        [ZWOG(r"2x 60s from 100 to 0% FTP, 30s @ 50% FTP")], [50]
+    ).tolist() == [[60.0, 120.0]]
+
+
+def test_zones_many_exceptions() -> None:
+    """Test zones_many with invalid boundaries."""
+    with pytest.raises(ValueError, match="not strictly increasing"):
+        zones_many([], [50, 50])
@@ -0,0 +1,48 @@
+"""unit tests for benchmarks.suite."""
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.suite import compare, main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def results(**best: float) -> dict[str, object]:
+    """Return a benchmark run with the best time of every stage."""
+    return {
+        "results": [
+            {"stage": stage, "blocks": 10, "repeats": 1, "best": seconds}
+            for stage, seconds in best.items()
+        ]
+    }
+
+
+def test_compare(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test flagging regressions."""
+    baseline = results(parse=0.001, zwo=0.002, save=0.003)
+    current = results(parse=0.0012, zwo=0.003, string=0.001)
+    assert compare(baseline, current, threshold=0.25) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3  # noqa: PLR2004
+    assert not lines[0].endswith("REGRESSION")
+    assert lines[1].startswith("zwo")
+    assert lines[1].endswith("1.50x  REGRESSION")
+    assert lines[2] == "1 regression(s) beyond 25%"
+
+    assert compare(baseline, current, threshold=0.5) == 0
+
+
+@pytest.mark.parametrize(("slowdown", "code"), [(1.1, 0), (2, 1)])
+def test_main_compare(tmp_path: "Path", slowdown: float, code: int) -> None:
+    """Test the exit code of the compare command."""
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(results(parse=0.001)), encoding="utf-8")
+    current.write_text(json.dumps(results(parse=0.001 * slowdown)), encoding="utf-8")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["compare", str(baseline), str(current)])
+    assert exc_info.value.code == code
@@ -0,0 +1,107 @@
+"""unit tests for zwog.build_parser."""
+
+import subprocess  # noqa: S404
+import sys
+from hashlib import sha256
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from zwog import _parser  # noqa: PLC2701
+from zwog.constants import ZWOG_GRAMMAR
+from zwog.utils import get_parser
+
+WORKOUTS = [
+    r"",
+    r"55s @ 100% FTP",
+    r"1h1hrs1m 1min1sec  1sec @ 100% FTP",
+    r"3 x 150s from 50 to 100% FTP, 2m @ 50% FTP 5s @ 10  %   FTP  ",
+    r"10min from 40 to 85% FTP 3x 5min @ 95% FTP, 5min @ 86% FTP",
+    r"3x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5min @ 55% FTP",
+    r"2x 1m @ 50% FTP, ((2 x 1m @ 60% FTP), (1m from 10 to 20% FTP)) 1m @ 50% FTP",
+]
+
+INVALID_WORKOUTS = [
+    r"x",
+    r"1h @ 50%",
+    r"1f from 10 to 50% FTP",
+    r"2x 1h from 10 to 50% FTP, 2x 1h @ 50% FTP",
+    r"2x (1m @ 50% FTP",
+    r"2x 1m @ 50% FTP)",
+    r"()",
+    r"1m @ 50% FTP, 2x (1m @ 50% FTP)",
+]
+
+
+def load_module(path: Path) -> ModuleType:
+    """Load a module from a file.
+
+    Args:
+        path: Path to the module.
+
+    Returns:
+        Loaded module.
+
+    """
+    spec = spec_from_file_location("generated_parser", path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_grammar_sha256() -> None:
+    """Test that the standalone parser was generated from the current grammar."""
+    expected = sha256(ZWOG_GRAMMAR.encode()).hexdigest()
+    assert expected == _parser.GRAMMAR_SHA256
+
+
+def test_import_without_lark() -> None:
+    """Test that importing zwog does not import lark."""
+    subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "import sys, zwog; zwog.ZWOG('1m @ 50% FTP'); "
+            "assert 'lark' not in sys.modules",
+        ],
+        check=True,
+    )
+
+
+@pytest.mark.parametrize("test_input", WORKOUTS)
+def test_parser_drift(test_input: str) -> None:
+    """Test that the standalone parser matches the grammar."""
+    build_parser = pytest.importorskip("zwog.build_parser")
+    assert (
+        get_parser().parse(test_input).pretty()
+        == build_parser.build_lalr_parser().parse(test_input).pretty()
+    )
+
+
+@pytest.mark.parametrize("test_input", INVALID_WORKOUTS)
+def test_parser_drift_exceptions(test_input: str) -> None:
+    """Test that the standalone parser rejects the same workouts."""
+    build_parser = pytest.importorskip("zwog.build_parser")
+    with pytest.raises(Exception) as expected:  # noqa: PT011
+        build_parser.build_lalr_parser().parse(test_input)
+    with pytest.raises(Exception) as actual:  # noqa: PT011
+        get_parser().parse(test_input)
+    assert type(actual.value).__name__ == type(expected.value).__name__
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test generating the standalone parser."""
+    build_parser = pytest.importorskip("zwog.build_parser")
+    output_file = tmp_path / "parser.py"
+    build_parser.main(["-o", str(output_file)])
+    generated_parser = load_module(output_file)
+    assert generated_parser.GRAMMAR_SHA256 == _parser.GRAMMAR_SHA256
+    for workout in WORKOUTS:
+        assert (
+            generated_parser.Lark_StandAlone().parse(workout).pretty()
+            == get_parser().parse(workout).pretty()
+        )
@@ -0,0 +1,139 @@
+"""unit tests for zwog.cache."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from zwog.cache import CacheInfo, WorkoutCache, cache_key, normalize_workout
+from zwog.exceptions import UnexpectedCharacters
+from zwog.utils import ZWOG
+
+WORKOUT = "10m from 40 to 80% FTP\n3x 1m @ 120% FTP, 2m @ 50% FTP"
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        ("", ""),
+        ("  1m @ 50% FTP\n", "1m @ 50% FTP"),
+        ("1m @ 50% FTP\n\t2m  @ 60% FTP", "1m @ 50% FTP 2m @ 60% FTP"),
+        ("\f1m @\r\n50% FTP ", "1m @ 50% FTP"),
+        ("1m\xa0@ 50% FTP\v", "1m\xa0@ 50% FTP\v"),
+    ],
+)
+def test_normalize_workout(test_input: str, expected: str) -> None:
+    """Test normalize_workout."""
+    assert normalize_workout(test_input) == expected
+
+
+def test_cache_key() -> None:
+    """Test cache_key."""
+    key = cache_key(WORKOUT, "author", "name")
+    assert key == cache_key(f" {WORKOUT.replace(' ', '  ')}\n", "author", "name")
+    assert key != cache_key(WORKOUT, "author", "name", "category")
+    assert key != cache_key(WORKOUT, "author", "other name")
+    assert cache_key(WORKOUT, "a", "b", None, "c") != cache_key(
+        WORKOUT, "a", "b", "c", None
+    )
+
+
+def test_workout_cache() -> None:
+    """Test the in-memory tier."""
+    cache = WorkoutCache(maxsize=2)
+    entry = cache.get(WORKOUT, "author", "name")
+    zwog = ZWOG(WORKOUT, "author", "name")
+    assert entry.workout == zwog.workout
+    assert entry.pretty == str(zwog)
+    assert entry.tss == zwog.tss
+    assert entry.zwo == zwog.zwo_bytes
+    # callers get their own copy of the parsed workout
+    entry.workout.clear()
+    assert entry.workout == zwog.workout
+    assert cache.get(WORKOUT.replace("\n", " "), "author", "name") is entry
+    assert cache.cache_info() == CacheInfo(1, 0, 1, 2, 1)
+
+    cache.get("1m @ 50% FTP", "author", "name")
+    cache.get(WORKOUT, "author", "name")  # the other entry is the LRU one
+    cache.get("2m @ 50% FTP", "author", "name")
+    assert cache.cache_info() == CacheInfo(2, 0, 3, 2, 2)
+    cache.get(WORKOUT, "author", "name")
+    assert cache.cache_info() == CacheInfo(3, 0, 3, 2, 2)
+    cache.get("1m @ 50% FTP", "author", "name")
+    assert cache.cache_info() == CacheInfo(3, 0, 4, 2, 2)
+
+    cache.clear()
+    assert cache.cache_info() == CacheInfo(0, 0, 0, 2, 0)
+
+
+def test_workout_cache_unicode_whitespace() -> None:
+    """Test that whitespace the grammar rejects misses the cache."""
+    cache = WorkoutCache()
+    cache.get("1m @ 50% FTP", "author", "name")
+    with pytest.raises(UnexpectedCharacters):
+        cache.get("1m\xa0@ 50% FTP", "author", "name")
+    assert cache.cache_info().hits == 0
+
+
+def test_workout_cache_disk(tmp_path: Path) -> None:
+    """Test the on-disk tier."""
+    cache = WorkoutCache(directory=tmp_path / "cache")
+    entry = cache.get(WORKOUT, "author", "name", "category", "subcategory")
+    (path,) = (tmp_path / "cache").iterdir()
+    assert (
+        path.name
+        == f"{cache_key(WORKOUT, 'author', 'name', 'category', 'subcategory')}.json"
+    )
+
+    # another process sharing the directory
+    other = WorkoutCache(directory=tmp_path / "cache")
+    assert other.get(WORKOUT, "author", "name", "category", "subcategory") == entry
+    assert other.cache_info() == CacheInfo(0, 1, 0, 256, 1)
+
+    # unreadable entries are misses and get replaced
+    path.write_text(json.dumps({"workout": []}), encoding="utf-8")
+    other = WorkoutCache(directory=tmp_path / "cache")
+    assert other.get(WORKOUT, "author", "name", "category", "subcategory") == entry
+    assert other.cache_info() == CacheInfo(0, 0, 1, 256, 1)
+    assert (
+        WorkoutCache(directory=tmp_path / "cache").get(
+            WORKOUT, "author", "name", "category", "subcategory"
+        )
+        == entry
+    )
+    assert [x.name for x in (tmp_path / "cache").iterdir()] == [path.name]
+
+
+def test_workout_cache_disk_nested(tmp_path: Path) -> None:
+    """Test that nested groups survive the on-disk tier."""
+    workout = r"2x 1m @ 90% FTP, (3x 20s @ 150% FTP, 10s @ 40% FTP)"
+    entry = WorkoutCache(directory=tmp_path).get(workout)
+    other = WorkoutCache(directory=tmp_path)
+    assert other.get(workout).workout == entry.workout == ZWOG(workout).workout
+    assert other.cache_info().disk_hits == 1
+
+
+def test_workout_cache_encoding(tmp_path: Path) -> None:
+    """Test that cached documents are the UTF-8 encoded ZWO documents."""
+    zwog = ZWOG(WORKOUT, "Jöhn Døw", "Café")
+    assert WorkoutCache().get(WORKOUT, "Jöhn Døw", "Café").zwo == zwog.zwo_bytes
+    WorkoutCache(directory=tmp_path).get(WORKOUT, "Jöhn Døw", "Café")
+    cache = WorkoutCache(directory=tmp_path)
+    assert cache.get(WORKOUT, "Jöhn Døw", "Café").zwo == zwog.zwo_bytes
+    assert cache.cache_info().disk_hits == 1
+
+
+def test_workout_cache_disk_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that entries that cannot be stored on disk are kept in memory."""
+    cache = WorkoutCache(directory=tmp_path)
+
+    def fail(*_: object) -> None:
+        raise PermissionError
+
+    monkeypatch.setattr(Path, "replace", fail)
+    entry = cache.get(WORKOUT)
+    assert entry.tss == ZWOG(WORKOUT).tss
+    assert cache.get(WORKOUT) is entry
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,64 @@
+"""unit tests for zwog.compact."""
+
+import dataclasses
+
+import pytest
+
+from zwog.compact import CompactBlock, CompactInterval, from_compact, to_compact
+from zwog.timeline import Timeline
+from zwog.utils import ZWOG
+
+WORKOUT = r"10m from 40 to 80% FTP 3x 1m @ 120% FTP, 2m @ 50% FTP 2m @ 50% FTP"
+
+
+def test_to_compact() -> None:
+    """Test to_compact and from_compact."""
+    workout = ZWOG(WORKOUT).workout
+    blocks = to_compact(workout)
+    assert blocks == (
+        CompactBlock((CompactInterval(600, (40.0, 80.0)),)),
+        CompactBlock((CompactInterval(60, 120.0), CompactInterval(120, 50.0)), 3),
+        CompactBlock((CompactInterval(120, 50.0),)),
+    )
+    assert from_compact(blocks) == workout
+    assert Timeline.from_blocks(blocks) == Timeline.from_blocks(workout)
+
+
+def test_compact_immutable() -> None:
+    """Test that compact blocks are immutable and slotted."""
+    (block,) = to_compact(ZWOG(r"1m @ 50% FTP").workout)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        block.repeats = 2  # type: ignore[misc]
+    assert not hasattr(block, "__dict__")
+    assert not hasattr(block.intervals[0], "__dict__")
+    assert len({block, *to_compact(ZWOG(r"1m @ 50% FTP").workout)}) == 1
+
+
+def test_to_compact_pool() -> None:
+    """Test interning with a pool."""
+    pool: dict[object, object] = {}
+    first = to_compact(ZWOG(WORKOUT).workout, pool)
+    second = to_compact(ZWOG(WORKOUT).workout, pool)
+    assert all(x is y for x, y in zip(first, second, strict=True))
+    assert first[1].intervals[1] is first[2].intervals[0]
+    assert len(pool) == 6  # noqa: PLR2004
+    assert to_compact(ZWOG(WORKOUT).workout)[0] is not first[0]
+
+
+def test_to_compact_nested() -> None:
+    """Test that nested groups stay nested."""
+    workout = ZWOG(r"2x 1m @ 90% FTP, (3x 20s @ 150% FTP, 10s @ 40% FTP)").workout
+    blocks = to_compact(workout)
+    assert blocks == (
+        CompactBlock(
+            (
+                CompactInterval(60, 90.0),
+                CompactBlock(
+                    (CompactInterval(20, 150.0), CompactInterval(10, 40.0)), 3
+                ),
+            ),
+            2,
+        ),
+    )
+    assert from_compact(blocks) == workout
+    assert Timeline.from_blocks(blocks) == Timeline.from_blocks(workout)
@@ -0,0 +1,92 @@
+"""unit tests for zwog.emitters."""
+
+import json
+
+import pytest
+
+from zwog.emitters import (
+    Emitter,
+    ErgEmitter,
+    JsonEmitter,
+    MrcEmitter,
+    PrettyEmitter,
+    ZwoEmitter,
+)
+from zwog.utils import ZWOG, Block
+
+WORKOUT = (
+    r"10m from 40 to 80% FTP 2x 1m @ 120% FTP, 2m @ 52.5% FTP 5m from 60 to 40% FTP"
+)
+
+
+@pytest.mark.parametrize(
+    "workout",
+    [
+        WORKOUT,
+        "5m @ 50% FTP",
+        "3x 1m @ 100% FTP, 1m @ 50% FTP 10m @ 60% FTP",
+    ],
+)
+def test_zwo_and_pretty_emitters(workout: str) -> None:
+    """Test that the ZWO and string emitters match ZWOG."""
+    zwog = ZWOG(workout, name="A & B", category="C")
+    assert zwog.emit(ZwoEmitter(), PrettyEmitter()) == [zwog.zwo_workout, str(zwog)]
+
+
+def test_course_emitters() -> None:
+    """Test the MRC and ERG emitters."""
+    mrc, erg = ZWOG(WORKOUT, name="Over\nunders").emit(MrcEmitter(), ErgEmitter(250))
+    mrc_lines = mrc.splitlines()
+    assert mrc_lines[:8] == [
+        "[COURSE HEADER]",
+        "VERSION = 2",
+        "UNITS = ENGLISH",
+        "DESCRIPTION = Over unders",
+        "FILE NAME = Over unders",
+        "MINUTES PERCENT",
+        "[END COURSE HEADER]",
+        "[COURSE DATA]",
+    ]
+    assert mrc_lines[8:12] == ["0.00\t40", "10.00\t80", "10.00\t120", "11.00\t120"]
+    assert mrc_lines[12:14] == ["11.00\t52.5", "13.00\t52.5"]
+    assert mrc_lines[-3:] == ["16.00\t60", "21.00\t40", "[END COURSE DATA]"]
+    assert mrc.endswith("\n")
+
+    erg_lines = erg.splitlines()
+    assert erg_lines[5:7] == ["FTP = 250", "MINUTES WATTS"]
+    assert erg_lines[9:13] == ["0.00\t100", "10.00\t200", "10.00\t300", "11.00\t300"]
+    assert len(erg_lines) == len(mrc_lines) + 1
+
+
+def test_json_emitter() -> None:
+    """Test that the JSON emitter matches the timeline."""
+    zwog = ZWOG(WORKOUT, category="C")
+    document = json.loads(zwog.emit(JsonEmitter())[0])
+    assert document["name"] == "Structured workout"
+    assert (document["category"], document["subcategory"]) == ("C", None)
+    assert [tuple(x.values()) for x in document["segments"]] == list(zwog.timeline)
+
+
+def test_emitter_reuse() -> None:
+    """Test that emitters start over for every workout."""
+    emitters: list[Emitter] = [MrcEmitter(), JsonEmitter(), ZwoEmitter()]
+    first = ZWOG(WORKOUT).emit(*emitters)
+    ZWOG("1m @ 50% FTP").emit(*emitters)
+    assert ZWOG(WORKOUT).emit(*emitters) == first
+
+
+def test_emitters_share_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that every block is converted once for all the emitters."""
+    zwog = ZWOG(WORKOUT)
+    expected = [zwog.zwo_workout, str(zwog)]
+    calls: list[Block] = []
+    block_to_pretty = zwog._block_to_pretty  # noqa: SLF001
+
+    def count_pretty(block: Block) -> str:
+        calls.append(block)
+        return block_to_pretty(block)
+
+    monkeypatch.setattr(zwog, "_block_to_pretty", count_pretty)
+    outputs = zwog.emit(ZwoEmitter(), PrettyEmitter(), MrcEmitter(), JsonEmitter())
+    assert outputs[:2] == expected
+    assert len(calls) == len(zwog._workout)  # noqa: SLF001
@@ -0,0 +1,150 @@
+"""unit tests for zwog.importer."""
+
+from io import BytesIO
+from pathlib import Path
+from random import Random
+from xml.etree.ElementTree import ParseError, fromstring, tostring  # noqa: S405
+
+import pytest
+
+from zwog.importer import read_zwo, read_zwo_directory, read_zwo_files
+from zwog.utils import ZWOG, Block, Interval
+
+INTERVALS = [
+    "1m @ 100% FTP",
+    "1m @ 50% FTP",
+    "45s @ 52.5% FTP",
+    "2m from 50 to 80% FTP",
+    "10m from 30 to 20% FTP",
+    "(2x 30s @ 110% FTP, 30s @ 50% FTP)",
+]
+
+
+def random_workout(rng: Random) -> str:
+    """Return a random workout."""
+    return "\n".join(
+        f"{rng.randint(1, 3)}x "
+        + ", ".join(rng.choice(INTERVALS) for _ in range(rng.randint(1, 3)))
+        for _ in range(rng.randint(1, 5))
+    )
+
+
+def workout_elements(zwo: bytes) -> bytes:
+    """Return the workout element of a ZWO document."""
+    return tostring(fromstring(zwo).find("workout"))  # type: ignore[arg-type]  # noqa: S314
+
+
+@pytest.mark.parametrize(
+    "workout",
+    [
+        "",
+        "10m from 40 to 80% FTP",
+        "2x 1m from 40 to 60% FTP",
+        "1m @ 50% FTP, 1m from 40 to 60% FTP",
+        "1m from 40 to 60% FTP\n1m @ 50% FTP, 1m @ 60% FTP",
+        "10m from 40 to 80% FTP 3x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP",
+    ],
+)
+def test_read_zwo(workout: str) -> None:
+    """Test that ZWOG writes the same elements for imported workouts."""
+    zwog = ZWOG(workout, "Jöhn & Døw", "name", "category", "subcategory")
+    imported = read_zwo(BytesIO(zwog.zwo_bytes))
+    assert workout_elements(imported.zwo_bytes) == workout_elements(zwog.zwo_bytes)
+    assert imported.timeline == zwog.timeline
+    assert imported.tss == pytest.approx(zwog.tss)
+    assert (imported.author, imported.name) == ("Jöhn & Døw", "name")
+    assert (imported.category, imported.subcategory) == ("category", "subcategory")
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_read_zwo_random(seed: int) -> None:
+    """Test the round trip of random workouts."""
+    zwog = ZWOG(random_workout(Random(seed)))  # noqa: S311
+    imported = read_zwo(BytesIO(zwog.zwo_bytes))
+    assert workout_elements(imported.zwo_bytes) == workout_elements(zwog.zwo_bytes)
+    assert imported.timeline == zwog.timeline
+
+
+def test_read_zwo_elements() -> None:
+    """Test the conversion of elements written by other tools."""
+    zwo = (
+        b"<workout_file><name>Other</name><workout>"
+        b'<Warmup Duration="600" PowerLow="0.25" PowerHigh="0.75" />'
+        b'<SteadyState Duration="300.4" PowerLow="0.5" PowerHigh="0.5">'
+        b'<textevent timeoffset="0" message="Go" /></SteadyState>'
+        b'<SteadyState Duration="300" Power="0.5" />'
+        b'<IntervalsT Repeat="3" OnDuration="60" OnPower="1.2" OffDuration="30"'
+        b' OffPower="0.5" />'
+        b'<Cooldown Duration="300" PowerLow="0.6" PowerHigh="0.4" />'
+        b"</workout></workout_file>"
+    )
+    workout = read_zwo(BytesIO(zwo))
+    assert workout.name == "Other"
+    assert workout.author == ZWOG("").author
+    assert workout.workout == [
+        Block([Interval(600, [25.0, 75.0])]),
+        Block([Interval(300, 50.0)], 2),
+        Block([Interval(60, 120.0), Interval(30, 50.0)], 3),
+        Block([Interval(300, [60.0, 40.0])]),
+    ]
+    assert str(workout) == (
+        "10m from 25 to 75% FTP\n2x 5m @ 50% FTP\n"
+        "3x 1m @ 120% FTP, 30s @ 50% FTP\n5m from 60 to 40% FTP"
+    )
+
+
+INTERVALS_T = (
+    '<IntervalsT Repeat="{}" OnDuration="60" OffDuration="60" OnPower="1.2"'
+    ' OffPower="0.5" />'
+)
+
+
+@pytest.mark.parametrize(
+    ("element", "exception", "message"),
+    [
+        (b'<FreeRide Duration="600" />', ValueError, "Unsupported ZWO element"),
+        (b'<SteadyState Duration="600" />', ValueError, "Missing attribute"),
+        (b'<SteadyState Duration="0" Power="1" />', ValueError, "strictly"),
+        (b'<SteadyState Duration="60" Power="-1" />', ValueError, "positive"),
+        (INTERVALS_T.format(0).encode(), ValueError, "Repeat.*strictly positive"),
+        (INTERVALS_T.format(-1).encode(), ValueError, "Repeat.*strictly positive"),
+        (INTERVALS_T.format("x").encode(), ValueError, "invalid literal"),
+        (b'<SteadyState Duration="60" Power="1">', ParseError, "mismatched"),
+    ],
+)
+def test_read_zwo_exceptions(
+    element: bytes, exception: type[Exception], message: str
+) -> None:
+    """Test invalid ZWO files."""
+    with pytest.raises(exception, match=message):
+        read_zwo(BytesIO(b"<workout_file><workout>" + element + b"</workout>"))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_read_zwo_files(tmp_path: Path, jobs: int) -> None:
+    """Test importing many files."""
+    workouts = [random_workout(Random(seed)) for seed in range(5)]  # noqa: S311
+    (tmp_path / "sub").mkdir()
+    for idx, workout in enumerate(workouts):
+        ZWOG(workout, name=f"w{idx}").save_zwo(str(tmp_path / f"w{idx}.zwo"))
+    ZWOG(workouts[0]).save_zwo(str(tmp_path / "sub" / "nested.zwo"))
+    (tmp_path / "broken.zwo").write_text("<workout_file>", encoding="utf-8")
+
+    results = list(read_zwo_directory(tmp_path, jobs))
+    assert [x.input_file.name for x in results] == [
+        "broken.zwo",
+        *(f"w{idx}.zwo" for idx in range(5)),
+    ]
+    assert results[0].workout is None
+    assert (results[0].error or "").startswith("ParseError: ")
+    for result, workout in zip(results[1:], workouts, strict=True):
+        assert result.error is None
+        assert result.workout is not None
+        assert result.workout.timeline == ZWOG(workout).timeline
+        assert result.workout.name == result.input_file.stem
+
+    recursive = list(read_zwo_directory(tmp_path, jobs, recursive=True))
+    assert len(recursive) == len(results) + 1
+    assert [x.input_file for x in read_zwo_files([tmp_path / "w1.zwo"], jobs)] == [
+        tmp_path / "w1.zwo"
+    ]
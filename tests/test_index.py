@@ -0,0 +1,186 @@
+"""unit tests for zwog.index."""
+
+import os
+import sqlite3
+from typing import TYPE_CHECKING
+
+import pytest
+
+from zwog.constants import POWER_ZONES
+from zwog.index import WorkoutIndex
+from zwog.utils import ZWOG, main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+WORKOUTS = {
+    "endurance.txt": "10m from 40 to 75% FTP 1h @ 65% FTP",
+    "threshold.txt": "10m from 40 to 75% FTP 2x 15m @ 98% FTP, 5m @ 50% FTP",
+    "vo2.txt": "10m from 40 to 75% FTP 5x 3m @ 115% FTP, 3m @ 50% FTP\n10m @ 55% FTP",
+}
+
+
+@pytest.fixture
+def library(tmp_path: "Path") -> "Path":
+    """Return a directory of workout files."""
+    for name, workout in WORKOUTS.items():
+        (tmp_path / name).write_text(workout, encoding="utf-8")
+    ZWOG("3x 2m @ 130% FTP, 2m @ 50% FTP", name="Anaerobic").save_zwo(
+        str(tmp_path / "anaerobic.zwo")
+    )
+    (tmp_path / ".hidden.txt").write_text("x", encoding="utf-8")
+    return tmp_path
+
+
+def test_workout_index(library: "Path") -> None:
+    """Test indexing and querying."""
+    with WorkoutIndex(library / "index.sqlite") as index:
+        stats = index.update(library)
+        assert (stats.added, stats.updated, stats.unchanged) == (4, 0, 0)
+        assert stats.errors == []
+
+        (vo2,) = index.query(time_above=(105, 15 * 60))
+        zwog = ZWOG(WORKOUTS["vo2.txt"])
+        assert vo2.path == (library / "vo2.txt").resolve()
+        assert (vo2.name, vo2.text) == ("vo2", str(zwog))
+        assert vo2.duration == zwog.duration
+        assert vo2.tss == pytest.approx(zwog.tss)
+        assert vo2.max_power == 115  # noqa: PLR2004
+        assert vo2.zones == pytest.approx(zwog.timeline.time_in_zones(POWER_ZONES))
+        assert vo2.intensity_factor == pytest.approx(
+            zwog.tss * 3600 / (zwog.duration * 100)
+        )
+        assert index.segments(library / "vo2.txt") == list(zwog.timeline)
+
+        assert [x.name for x in index.query()] == [
+            "Anaerobic",
+            "endurance",
+            "threshold",
+            "vo2",
+        ]
+        assert [x.name for x in index.query(min_duration=45 * 60)] == [
+            "endurance",
+            "threshold",
+            "vo2",
+        ]
+        assert [x.name for x in index.query(max_duration=50 * 60)] == [
+            "Anaerobic",
+            "threshold",
+            "vo2",
+        ]
+        assert [x.name for x in index.query(min_tss=55, max_tss=65)] == ["vo2"]
+        assert [x.name for x in index.query(max_power=100)] == [
+            "endurance",
+            "threshold",
+        ]
+        # not a zone boundary, answered from the segments
+        assert [x.name for x in index.query(time_above=(97, 15 * 60))] == [
+            "threshold",
+            "vo2",
+        ]
+        assert [x.name for x in index.query(time_above=(62.5, 45 * 60))] == [
+            "endurance"
+        ]
+        assert index.query(min_tss=1000) == []
+        assert index.segments(library / "missing.txt") == []
+
+
+def test_workout_index_update(library: "Path") -> None:
+    """Test incremental updates."""
+    database = library / "index.sqlite"
+    with WorkoutIndex(database) as index:
+        index.update(library)
+
+    with WorkoutIndex(database) as index:
+        stats = index.update(library)
+        assert (stats.added, stats.updated, stats.unchanged) == (0, 0, 4)
+
+        # same content, new modification time
+        stat = (library / "vo2.txt").stat()
+        os.utime(library / "vo2.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (library / "threshold.txt").write_text("1m @ 50% FTP", encoding="utf-8")
+        (library / "endurance.txt").unlink()
+        (library / "broken.txt").write_text("1m @ 50%", encoding="utf-8")
+        stats = index.update(library, jobs=2)
+        assert (stats.added, stats.updated, stats.unchanged) == (0, 1, 2)
+        assert stats.removed == 1
+        assert [(x.name, y.split(":")[0]) for x, y in stats.errors] == [
+            ("broken.txt", "UnexpectedToken")
+        ]
+        assert [x.name for x in index.query()] == ["Anaerobic", "threshold", "vo2"]
+        assert index.query(max_duration=60)[0].text == "1m @ 50% FTP"
+
+        # a file that cannot be converted anymore is removed
+        (library / "vo2.txt").write_text("x", encoding="utf-8")
+        stats = index.update(library)
+        assert len(stats.errors) == 2  # noqa: PLR2004
+        assert [x.name for x in index.query()] == ["Anaerobic", "threshold"]
+
+
+def test_workout_index_rebuild(library: "Path") -> None:
+    """Test that the index is rebuilt for other zones."""
+    database = library / "index.sqlite"
+    with WorkoutIndex(database) as index:
+        index.update(library)
+    with WorkoutIndex(database, zones=[100]) as index:
+        assert index.query() == []
+        assert index.update(library).added == 4  # noqa: PLR2004
+        assert len(index.query()[0].zones) == 2  # noqa: PLR2004
+    with sqlite3.connect(database) as connection:
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'format'")
+    connection.close()
+    with WorkoutIndex(database, zones=[100]) as index:
+        assert index.query() == []
+
+
+def test_workout_index_recursive(library: "Path") -> None:
+    """Test indexing subdirectories."""
+    (library / "sub").mkdir()
+    (library / "sub" / "recovery.txt").write_text("30m @ 50% FTP", encoding="utf-8")
+    (library / ".git").mkdir()
+    (library / ".git" / "config.txt").write_text("x", encoding="utf-8")
+    with WorkoutIndex(library / "index.sqlite") as index:
+        assert index.update(library).added == 4  # noqa: PLR2004
+        stats = index.update(library, recursive=True)
+        assert (stats.added, stats.errors) == (1, [])
+        assert index.update(library / "sub").removed == 0
+        # subdirectories are kept when they are not scanned
+        stats = index.update(library)
+        assert (stats.removed, stats.unchanged) == (0, 4)
+        assert "recovery" in [x.name for x in index.query()]
+
+        (library / "sub" / "recovery.txt").unlink()
+        assert index.update(library).removed == 0
+        assert index.update(library, recursive=True).removed == 1
+
+
+def test_main_index(library: "Path", capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the index command line interface."""
+    with pytest.raises(SystemExit) as exc_info:
+        main(["index", str(library), "--above", "105", "15"])
+    assert exc_info.value.code == 0
+    captured = capsys.readouterr()
+    assert "Indexed 4 new" in captured.err
+    assert captured.out.split("\t")[0] == str((library / "vo2.txt").resolve())
+    assert (library / ".zwog-index.sqlite").exists()
+
+    (library / "broken.txt").write_text("x", encoding="utf-8")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["index", str(library), "--duration", "40", "90", "--tss", "0", "80"])
+    assert exc_info.value.code == 1
+    captured = capsys.readouterr()
+    assert "broken.txt: " in captured.err
+    assert [x.split("\t")[-1] for x in captured.out.splitlines()] == [
+        "endurance",
+        "threshold",
+        "vo2",
+    ]
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["index", str(library), "--no-update", "-D", str(library / "new.db")])
+    assert exc_info.value.code == 0
+    assert capsys.readouterr() == ("", "")
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(["index", str(library), "-j", "-1"])
+    assert exc_info.value.code == 2  # noqa: PLR2004
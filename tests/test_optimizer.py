@@ -0,0 +1,160 @@
+"""unit tests for zwog.optimizer."""
+
+from random import Random
+from typing import TYPE_CHECKING
+
+import pytest
+
+from zwog.optimizer import optimize_blocks
+from zwog.utils import ZWOG, Block, Interval, main, parse_workout
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def random_workout(rng: Random) -> str:
+    """Return a random workout with repeated patterns."""
+    intervals = [
+        "1m @ 100% FTP",
+        "1m @ 50% FTP",
+        "30s @ 100% FTP",
+        "2m from 50 to 80% FTP",
+        "45s @ 120% FTP",
+    ]
+    return "\n".join(
+        f"{rng.randint(1, 4)}x "
+        + ", ".join(rng.choice(intervals) for _ in range(rng.randint(1, 4)))
+        for _ in range(rng.randint(1, 12))
+    )
+
+
+@pytest.mark.parametrize(
+    ("workout", "expected"),
+    [
+        (
+            "1m @ 50% FTP\n1m @ 50% FTP 2x 30s @ 50% FTP",
+            [Block([Interval(180, 50.0)])],
+        ),
+        (
+            "1m @ 100% FTP\n1m @ 50% FTP\n1m @ 100% FTP\n1m @ 50% FTP",
+            [Block([Interval(60, 100.0), Interval(60, 50.0)], 2)],
+        ),
+        (
+            "3x 1m @ 100% FTP, 1m @ 50% FTP, 1m @ 100% FTP, 1m @ 50% FTP",
+            [Block([Interval(60, 100.0), Interval(60, 50.0)], 6)],
+        ),
+        (
+            "10m from 40 to 80% FTP 2x 1m @ 100% FTP, 1m @ 50% FTP\n"
+            "1m @ 100% FTP, 1m @ 50% FTP 5m @ 50% FTP",
+            [
+                Block([Interval(600, [40.0, 80.0])]),
+                Block([Interval(60, 100.0), Interval(60, 50.0)], 2),
+                Block([Interval(60, 100.0)]),
+                Block([Interval(360, 50.0)]),
+            ],
+        ),
+        (
+            "3x 1m from 50 to 60% FTP",
+            [Block([Interval(60, [50.0, 60.0])], 3)],
+        ),
+        ("", []),
+    ],
+)
+def test_optimize_blocks(workout: str, expected: list[Block]) -> None:
+    """Test merging steady states and folding repeated patterns."""
+    assert optimize_blocks(parse_workout(workout)) == expected
+
+
+def test_optimize_zwo() -> None:
+    """Test that optimized workouts have fewer ZWO elements."""
+    workout = "\n".join(["1m @ 100% FTP, 1m @ 50% FTP"] * 10 + ["5m @ 60% FTP"] * 2)
+    plain = ZWOG(workout)
+    optimized = ZWOG(workout, optimize=True)
+    assert len(plain.element_workout.find("workout") or []) == 12  # noqa: PLR2004
+    elements = list(optimized.element_workout.find("workout") or [])
+    assert [x.tag for x in elements] == ["IntervalsT", "SteadyState"]
+    assert elements[0].get("Repeat") == "10"
+    assert elements[1].get("Duration") == "600"
+    assert len(optimized.zwo_bytes) < len(plain.zwo_bytes)
+
+
+def workout_elements(workout: ZWOG) -> list[str]:
+    """Return the tags of the ZWO elements of a workout."""
+    return [x.tag for x in workout.element_workout.find("workout") or []]
+
+
+@pytest.mark.parametrize(
+    ("workout", "expected"),
+    [
+        (
+            "3x 30s @ 120% FTP, 30s @ 50% FTP\n1m @ 70% FTP\n" * 2,
+            ["IntervalsT", "SteadyState"] * 2,
+        ),
+        (
+            "3x 1m @ 50% FTP, 1m @ 50% FTP\n2x 1m @ 50% FTP, 1m @ 100% FTP\n"
+            "2x 1m @ 100% FTP, 2m from 50 to 80% FTP, 1m @ 50% FTP",
+            ["IntervalsT", "IntervalsT", *["SteadyState", "Ramp", "SteadyState"] * 2],
+        ),
+        (
+            "2x (1m from 40 to 60% FTP, 1m @ 100% FTP), 1m @ 50% FTP\n"
+            "1m @ 50% FTP\n1m @ 50% FTP",
+            ["Ramp", "SteadyState", "SteadyState"] * 2,
+        ),
+    ],
+)
+def test_optimize_elements(workout: str, expected: list[str]) -> None:
+    """Test that optimizing never adds ZWO elements."""
+    plain = ZWOG(workout)
+    optimized = ZWOG(workout, optimize=True)
+    assert workout_elements(optimized) == expected
+    assert len(expected) <= len(workout_elements(plain))
+    assert optimized.power_trace() == plain.power_trace()
+
+
+@pytest.mark.parametrize(
+    "workout",
+    [
+        "1m from 40 to 60% FTP\n1m from 40 to 60% FTP",
+        "1m @ 50% FTP, 1m from 40 to 60% FTP\n2x 1m @ 50% FTP, 1m @ 60% FTP",
+    ],
+)
+def test_optimize_edges(workout: str) -> None:
+    """Test that warmups and cooldowns are kept."""
+    assert workout_elements(ZWOG(workout, optimize=True)) == workout_elements(
+        ZWOG(workout)
+    )
+
+
+def test_optimize_nested() -> None:
+    """Test that nested groups are kept."""
+    blocks = parse_workout(
+        "1000x (1000x 1s @ 100% FTP, 1s @ 50% FTP), 1m @ 50% FTP\n"
+        "1m @ 50% FTP\n1m @ 50% FTP"
+    )
+    assert optimize_blocks(blocks) == [blocks[0], Block([Interval(120, 50.0)])]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimize_profile(seed: int) -> None:
+    """Test that optimization does not change the power profile."""
+    workout = random_workout(Random(seed))  # noqa: S311
+    plain = ZWOG(workout)
+    optimized = ZWOG(workout, optimize=True)
+    assert optimized.power_trace() == plain.power_trace()
+    assert optimized.power_trace(0.25) == plain.power_trace(0.25)
+    assert optimized.tss == pytest.approx(plain.tss)
+    assert len(optimized.element_workout.find("workout") or []) <= len(
+        plain.element_workout.find("workout") or []
+    )
+
+
+def test_main_optimize(tmp_path: "Path") -> None:
+    """Test the --optimize option."""
+    workout = "1m @ 100% FTP\n1m @ 50% FTP\n1m @ 100% FTP\n1m @ 50% FTP"
+    input_file = tmp_path / "workout.txt"
+    input_file.write_text(workout, encoding="utf-8")
+    output_file = tmp_path / "workout.zwo"
+    with pytest.raises(SystemExit) as error:
+        main(["-i", str(input_file), "-o", str(output_file), "-O"])
+    assert error.value.code == 0
+    assert output_file.read_bytes() == ZWOG(workout, optimize=True).zwo_bytes
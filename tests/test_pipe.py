@@ -0,0 +1,112 @@
+"""unit tests for zwog.pipe."""
+
+import json
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from zwog.pipe import convert_line, convert_stream
+from zwog.utils import ZWOG, main
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+WORKOUT = r"10m from 40 to 80% FTP 2x 1m @ 120% FTP, 2m @ 50% FTP"
+
+
+def test_convert_line() -> None:
+    """Test converting a line."""
+    line = json.dumps({"workout": WORKOUT, "name": None, "category": "C", "id": [1]})
+    workout = ZWOG(WORKOUT, category="C")
+    assert convert_line(line, 3) == {
+        "line": 3,
+        "id": [1],
+        "zwo": workout.zwo_workout,
+        "pretty": str(workout),
+        "tss": workout.tss,
+    }
+
+
+@pytest.mark.parametrize(
+    ("line", "error_type", "message"),
+    [
+        ("{", "JSONDecodeError", "Expecting property name"),
+        ("[]", "ValueError", "'workout' must be a string"),
+        ('{"workout": 1}', "ValueError", "'workout' must be a string"),
+        ('{"workout": "", "author": 1}', "ValueError", "'author' must be a string"),
+        ('{"workout": "1m @ 50%"}', "Unexpected", ""),
+        ("[" * 100000, "RecursionError", ""),
+        (json.dumps({"workout": "(" * 5000 + "1m @ 50% FTP" + ")" * 5000}), "", ""),
+    ],
+)
+def test_convert_line_errors(line: str, error_type: str, message: str) -> None:
+    """Test that invalid lines are reported as structured errors."""
+    result = convert_line(line)
+    assert result["line"] == 1
+    assert result["error"]["type"].startswith(error_type)
+    assert result["error"]["message"].startswith(message)
+
+
+@pytest.mark.parametrize(
+    ("jobs", "ordered"), [(1, True), (2, True), (2, False), (0, False)]
+)
+def test_convert_stream(jobs: int, ordered: bool) -> None:  # noqa: FBT001
+    """Test converting a stream in and out of process."""
+    lines = [
+        json.dumps({"workout": f"{i + 1}m @ 50% FTP", "id": i}) if i % 5 else "\n"
+        for i in range(50)
+    ]
+    results = list(convert_stream(lines, jobs, ordered=ordered, chunk_size=3))
+    if not ordered:
+        results.sort(key=itemgetter("line"))
+    assert [result["line"] for result in results] == [i + 1 for i in range(50) if i % 5]
+    assert all(
+        result["pretty"] == f"{result['id'] + 1}m @ 50% FTP" for result in results
+    )
+
+
+def test_convert_stream_interactive() -> None:
+    """Test that a single job yields every result before reading on."""
+    read = []
+
+    def lines() -> "Iterator[str]":
+        for i in range(3):
+            read.append(i)
+            yield json.dumps({"workout": "[" * 100000 if i == 1 else WORKOUT})
+
+    results = []
+    for number, result in enumerate(convert_stream(lines()), 1):
+        assert result["line"] == len(read) == number
+        results.append(result)
+    assert [("error" in x) for x in results] == [False, True, False]
+
+
+def test_main_pipe(tmp_path: "Path", capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the pipe command line interface."""
+    input_file = tmp_path / "workouts.ndjson"
+    output_file = tmp_path / "results.ndjson"
+    input_file.write_text(
+        json.dumps({"workout": WORKOUT}) + "\n" + json.dumps({"workout": "x"}) + "\n"
+    )
+    with pytest.raises(SystemExit) as exc_info:
+        main(["pipe", "-i", str(input_file), "-o", str(output_file), "-u"])
+    assert exc_info.value.code == 1
+    assert "Converted 1/2 workouts (1 errors)" in capsys.readouterr().err
+    results = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert results[0]["tss"] == ZWOG(WORKOUT).tss
+    assert results[1]["error"]["type"].startswith("Unexpected")
+
+    input_file.write_text(json.dumps({"workout": WORKOUT}) + "\n")
+    with pytest.raises(SystemExit) as exc_info:
+        main(["pipe", "-i", str(input_file), "-o", str(output_file)])
+    assert exc_info.value.code == 0
+
+
+@pytest.mark.parametrize("argv", [["-j", "-1"], ["--chunk-size", "0"]])
+def test_main_pipe_exceptions(argv: list[str]) -> None:
+    """Test invalid pipe options."""
+    with pytest.raises(SystemExit) as exc_info:
+        main(["pipe", *argv])
+    assert exc_info.value.code == 2  # noqa: PLR2004
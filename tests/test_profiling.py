@@ -0,0 +1,66 @@
+"""unit tests for zwog.profiling."""
+
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+import pytest
+
+from zwog.exceptions import LarkError
+from zwog.profiling import STAGES, profile, stage, staged
+from zwog.utils import ZWOG
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_profile() -> None:
+    """Test profiling a conversion."""
+    calls: list[str] = []
+    with profile(callback=lambda name, *_: calls.append(name)) as profiler:
+        workout = ZWOG(r"2x 1m @ 50% FTP, 1m @ 60% FTP")
+        _ = workout.zwo_workout, workout.element_workout, workout.tss
+    assert set(profiler.stages) <= set(STAGES)
+    assert list(profiler.stages) == ["parse", "pretty", "zwo", "tss"]
+    assert calls == ["parse", "pretty", "zwo", "zwo", "tss"]
+    # serialized once as text and once as an element tree
+    assert [x.calls for x in profiler.stages.values()] == [1, 1, 2, 1]
+    assert all(x.seconds > 0 for x in profiler.stages.values())
+    assert profiler.stats is None
+    assert profiler.report().splitlines()[-1].startswith("total")
+
+
+def test_profile_nested() -> None:
+    """Test that nested stages are not counted in their parent."""
+    with profile("transform") as profiler:
+        with stage("write"), stage("parse"):
+            pass
+        # invalid values are reported by the transformer
+        with pytest.raises(LarkError, match="strictly positive"):
+            ZWOG(r"0x 1m @ 50% FTP")
+    assert profiler.stages["write"].calls == 1
+    assert profiler.stages["parse"].calls == 2  # noqa: PLR2004
+    assert profiler.stages["transform"].calls == 1
+    assert profiler.stats is not None
+    assert profiler.stats.total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_profile_streaming(tmp_path: "Path") -> None:
+    """Test that streaming times serializing and writing separately."""
+    workout = ZWOG(r"2x 1m @ 50% FTP, 1m @ 60% FTP 1m @ 70% FTP")
+    with profile() as profiler:
+        workout.write_zwo(BytesIO())
+        workout.save_zwo(str(tmp_path / "workout.zwo"))
+    assert set(profiler.stages) == {"pretty", "zwo", "write"}
+    assert profiler.stages["zwo"].calls == 2  # noqa: PLR2004
+    # one call per written piece
+    assert profiler.stages["write"].calls > profiler.stages["zwo"].calls
+    assert staged("write", print) is print
+
+
+def test_stage_without_profile() -> None:
+    """Test that stages are not measured outside of profile."""
+    with profile() as profiler:
+        pass
+    with stage("parse"):
+        ZWOG(r"1m @ 50% FTP")
+    assert profiler.stages == {}
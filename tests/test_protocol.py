@@ -0,0 +1,57 @@
+"""unit tests for zwog.protocol."""
+
+import json
+
+import pytest
+
+from zwog.protocol import convert_request, error_to_json, parse_request
+from zwog.utils import ZWOG
+
+WORKOUT = r"10m from 40 to 80% FTP 2x 1m @ 120% FTP, 2m @ 50% FTP"
+
+
+def test_parse_request() -> None:
+    """Test that null names are dropped and other members are kept."""
+    request = {"workout": WORKOUT, "author": None, "name": None, "id": 1}
+    assert parse_request(json.dumps(request)) == {"workout": WORKOUT, "id": 1}
+    assert parse_request(json.dumps({"workout": "", "category": None}).encode()) == {
+        "workout": "",
+        "category": None,
+    }
+
+
+@pytest.mark.parametrize(
+    ("data", "message"),
+    [
+        ("[]", "'workout' must be a string"),
+        ('{"workout": 1}', "'workout' must be a string"),
+        ('{"workout": "", "subcategory": 1}', "'subcategory' must be a string"),
+        ("{", "Expecting property name"),
+    ],
+)
+def test_parse_request_errors(data: str, message: str) -> None:
+    """Test that invalid requests raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        parse_request(data)
+
+
+def test_convert_request() -> None:
+    """Test converting requests."""
+    workout = ZWOG(WORKOUT, name="Name")
+    assert convert_request({"workout": WORKOUT, "name": "Name"}) == {
+        "zwo": workout.zwo_workout,
+        "pretty": str(workout),
+        "tss": workout.tss,
+    }
+    assert convert_request({"workout": "1m @ 50%"})["error"]["type"] == (
+        "UnexpectedToken"
+    )
+
+
+def test_error_to_json() -> None:
+    """Test that errors keep the first line of their message."""
+    assert error_to_json(ValueError("\n first\nsecond")) == {
+        "type": "ValueError",
+        "message": "first",
+    }
+    assert error_to_json(RecursionError()) == {"type": "RecursionError", "message": ""}
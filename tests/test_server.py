@@ -0,0 +1,266 @@
+"""unit tests for zwog.server."""
+
+import asyncio
+import json
+from argparse import Namespace
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from zwog.server import ConversionServer, serve
+from zwog.utils import ZWOG, main
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from pathlib import Path
+
+WORKOUT = r"10m from 40 to 80% FTP 2x 1m @ 120% FTP, 2m @ 50% FTP"
+
+
+def post(body: Any, target: str = "/convert") -> bytes:  # noqa: ANN401
+    """Return a conversion request."""
+    data = json.dumps(body).encode()
+    return (
+        f"POST {target} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n"
+    ).encode() + data
+
+
+async def exchange(
+    streams: tuple[asyncio.StreamReader, asyncio.StreamWriter], request: bytes
+) -> tuple[int, dict[str, str], Any]:
+    """Return the response status, headers, and body to a request."""
+    reader, writer = streams
+    writer.write(request)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    body = json.loads(await reader.readexactly(int(headers["content-length"])))
+    return status, headers, body
+
+
+def run_server(
+    scenario: "Callable[[int], Coroutine[Any, Any, None]]",
+    executor: Executor | None = None,
+    **kwargs: Any,  # noqa: ANN401
+) -> None:
+    """Run a scenario against a server on a free localhost port."""
+
+    async def main() -> None:
+        with executor or ThreadPoolExecutor(2) as pool:
+            server = await ConversionServer(pool, **kwargs).start_tcp()
+            async with server:
+                await scenario(server.sockets[0].getsockname()[1])
+
+    asyncio.run(main())
+
+
+def test_convert() -> None:
+    """Test conversions over a kept-alive connection."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        for name in ["Workout", None]:
+            status, headers, body = await exchange(
+                streams, post({"workout": WORKOUT, "name": name, "category": "C"})
+            )
+            workout = ZWOG(WORKOUT, name=name or "Structured workout", category="C")
+            assert status == 200  # noqa: PLR2004
+            assert headers["connection"] == "keep-alive"
+            assert body == {
+                "zwo": workout.zwo_workout,
+                "pretty": str(workout),
+                "tss": workout.tss,
+            }
+        status, _, body = await exchange(streams, b"GET /health HTTP/1.1\r\n\r\n")
+        assert (status, body) == (200, {"status": "ok"})
+        streams[1].close()
+
+    run_server(scenario)
+
+
+@pytest.mark.parametrize(
+    ("request_bytes", "status", "error"),
+    [
+        (post({"workout": "1m @ 50%"}), 400, "UnexpectedToken: Unexpected token"),
+        (post({"workout": "0x 1m @ 50% FTP"}), 400, "VisitError: Error trying"),
+        (post([]), 400, "ValueError: 'workout' must be a string"),
+        (post({"workout": "", "author": 1}), 400, "ValueError: 'author' must be"),
+        (post({}, "/unknown"), 404, "HTTPError: Not Found"),
+        (b"GET /convert HTTP/1.1\r\n\r\n", 405, "HTTPError: Method Not Allowed"),
+        (b"POST /health HTTP/1.1\r\n\r\n", 405, "HTTPError: Method Not Allowed"),
+        (b"POST /convert HTTP/1.1\r\n\r\n", 411, "HTTPError: Length Required"),
+        (
+            b"POST /convert HTTP/1.1\r\nContent-Length: 101\r\n\r\n",
+            413,
+            "HTTPError: Request",
+        ),
+        (
+            b"POST /convert HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n",
+            501,
+            "HTTPError: Chunked requests",
+        ),
+        (
+            b"POST /convert HTTP/1.1\r\nContent-Length: 2\r\n\r\n{,",
+            400,
+            "JSONDecodeError: Expecting",
+        ),
+        (
+            b"GET /health HTTP/1.1\r\n" + b"X: y\r\n" * 101 + b"\r\n",
+            431,
+            "HTTPError: Request",
+        ),
+        (b"garbage\r\n\r\n", 400, "HTTPError: Bad Request"),
+    ],
+)
+def test_errors(request_bytes: bytes, status: int, error: str) -> None:
+    """Test error responses."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        response = await exchange(streams, request_bytes)
+        assert response[0] == status
+        assert set(response[2]) == {"error"}
+        assert "{type}: {message}".format_map(response[2]["error"]).startswith(error)
+        streams[1].close()
+
+    run_server(scenario, max_request_size=100)
+
+
+def test_deep_json() -> None:
+    """Test that deeply nested JSON is a bad request, not a dropped connection."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        data = b"[" * 100000
+        status, _, body = await exchange(
+            streams,
+            b"POST /convert HTTP/1.1\r\nContent-Length: 100000\r\n\r\n" + data,
+        )
+        assert (status, body["error"]["type"]) == (400, "RecursionError")
+        status, _, _ = await exchange(streams, post({"workout": WORKOUT}))
+        assert status == 200  # noqa: PLR2004
+        streams[1].close()
+
+    run_server(scenario)
+
+
+def test_connection_close() -> None:
+    """Test that connections are closed on request or when idle."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        _, headers, _ = await exchange(
+            streams, b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"
+        )
+        assert headers["connection"] == "close"
+        assert await streams[0].read() == b""
+
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        assert await streams[0].read() == b""  # idle timeout
+
+    run_server(scenario, idle_timeout=0.1)
+
+
+@pytest.mark.parametrize(
+    "request_bytes",
+    [
+        b"GET /health HTTP/1.1\r\nHost: localhost\r\n",
+        b"POST /convert HTTP/1.1\r\nContent-Length: 10\r\n\r\n{",
+    ],
+)
+def test_request_timeout(request_bytes: bytes) -> None:
+    """Test that requests arriving too slowly time out."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        status, headers, body = await exchange(streams, request_bytes)
+        assert (status, body["error"]["message"]) == (408, "Request Timeout")
+        assert headers["connection"] == "close"
+        assert await streams[0].read() == b""
+
+    run_server(scenario, idle_timeout=0.1)
+
+
+def test_max_connections() -> None:
+    """Test that connections beyond the maximum are refused."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        await exchange(streams, b"GET /health HTTP/1.1\r\n\r\n")
+        refused = await asyncio.open_connection("127.0.0.1", port)
+        status, headers, _ = await exchange(refused, b"")
+        assert (status, headers["connection"]) == (503, "close")
+        assert await refused[0].read() == b""
+        streams[1].close()
+        await streams[1].wait_closed()
+        await asyncio.sleep(0.05)
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        status, _, _ = await exchange(streams, b"GET /health HTTP/1.1\r\n\r\n")
+        assert status == 200  # noqa: PLR2004
+        streams[1].close()
+
+    run_server(scenario, max_connections=1)
+
+
+class FailingExecutor(Executor):
+    """Executor failing every call."""
+
+    def submit(self, *_: Any, **__: Any) -> Future[Any]:  # noqa: ANN401, PLR6301
+        """Return a failed future."""
+        future: Future[Any] = Future()
+        future.set_exception(RuntimeError("worker died"))
+        return future
+
+
+def test_internal_error() -> None:
+    """Test that executor failures are internal server errors."""
+
+    async def scenario(port: int) -> None:
+        streams = await asyncio.open_connection("127.0.0.1", port)
+        status, _, _ = await exchange(streams, post({"workout": WORKOUT}))
+        assert status == 500  # noqa: PLR2004
+        streams[1].close()
+
+    run_server(scenario, FailingExecutor())
+
+
+def test_serve_unix_socket(tmp_path: "Path") -> None:
+    """Test serving on a Unix socket with worker processes."""
+    path = tmp_path / "zwog.sock"
+    options = Namespace(
+        workers=1,
+        max_concurrency=4,
+        max_request_size=1 << 20,
+        max_connections=8,
+        unix_socket=str(path),
+        host=None,
+        port=None,
+    )
+
+    async def scenario() -> None:
+        task = asyncio.create_task(serve(options))
+        while not path.exists():  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+        streams = await asyncio.open_unix_connection(str(path))
+        status, _, body = await exchange(streams, post({"workout": WORKOUT}))
+        assert status == 200  # noqa: PLR2004
+        assert body["tss"] == ZWOG(WORKOUT).tss
+        streams[1].close()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+
+def test_main_serve_help(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test the serve command line interface."""
+    with pytest.raises(SystemExit) as error:
+        main(["serve", "--help"])
+    assert error.value.code == 0
+    assert capsys.readouterr().out.startswith("usage: zwog serve")
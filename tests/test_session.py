@@ -0,0 +1,108 @@
+"""unit tests for zwog.session."""
+
+import random
+
+import pytest
+
+from zwog.exceptions import LarkError, UnexpectedToken
+from zwog.session import WorkoutSession, split_chunks
+from zwog.utils import ZWOG
+
+LINES = [
+    "10min from 40 to 85% FTP",
+    "3x 5min @ 95% FTP, 5min @ 86% FTP",
+    "1h 2m 30s @ 50% FTP",
+    "4x 30s from 100 to 120% FTP, 1m30s @ 50% FTP, 20s @ 150% FTP",
+    "5m from 70 to 40% FTP",
+]
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        ("", []),
+        ("\n  \n", []),
+        ("1m @ 50% FTP 2m @ 60% FTP", ["1m @ 50% FTP 2m @ 60% FTP"]),
+        (" 1m @ 50% FTP\n\n2m @ 60% FTP \n", ["1m @ 50% FTP", "2m @ 60% FTP"]),
+        ("2x\n1m @ 50% FTP,\n2m @ 60% FTP", ["2x\n1m @ 50% FTP,\n2m @ 60% FTP"]),
+        ("2x 1m @ 50% FTP\n, 2m @ 60% FTP", ["2x 1m @ 50% FTP\n, 2m @ 60% FTP"]),
+        (
+            "1m from 40\nto 50% FTP\n2m @ 60% FTP",
+            ["1m from 40\nto 50% FTP", "2m @ 60% FTP"],
+        ),
+        (
+            "2x (1m @ 50% FTP\n2m @ 60% FTP)\n3m @ 70% FTP",
+            ["2x (1m @ 50% FTP\n2m @ 60% FTP)", "3m @ 70% FTP"],
+        ),
+        (
+            "2x 1m @ 50% FTP, (3x 1m @ 90% FTP)\n, 2m @ 60% FTP",
+            ["2x 1m @ 50% FTP, (3x 1m @ 90% FTP)\n, 2m @ 60% FTP"],
+        ),
+    ],
+)
+def test_split_chunks(test_input: str, expected: list[str]) -> None:
+    """Test split_chunks."""
+    assert split_chunks(test_input) == expected
+
+
+def assert_same(session: WorkoutSession) -> None:
+    """Assert that the session matches a workout converted from scratch."""
+    zwog = ZWOG(session.text, "author", "name", "category")
+    assert session.workout == zwog.workout
+    assert str(session) == str(zwog)
+    assert session.tss == pytest.approx(zwog.tss)
+    assert session.zwo_workout == zwog.zwo_workout
+    assert session.timeline == zwog.timeline
+
+
+def test_workout_session() -> None:
+    """Test that only changed chunks are parsed again."""
+    session = WorkoutSession("\n".join(LINES), "author", "name", "category")
+    assert_same(session)
+    blocks = session.workout
+
+    # edit the middle line
+    start = session.text.index("1h 2m")
+    session.edit(start, start + 2, "2h")
+    assert_same(session)
+    assert [x is y for x, y in zip(session.workout, blocks, strict=True)] == [
+        True,
+        True,
+        False,
+        True,
+        True,
+    ]
+
+    # the first and the last blocks change between warmup/cooldown and ramp
+    session.update("\n".join(LINES[1:4]))
+    assert_same(session)
+    session.update("\n".join([*LINES, LINES[0]]))
+    assert_same(session)
+    session.update("")
+    assert_same(session)
+
+
+def test_workout_session_random() -> None:
+    """Test random edits against a workout converted from scratch."""
+    rng = random.Random(0)  # noqa: S311
+    lines = [rng.choice(LINES) for _ in range(50)]
+    session = WorkoutSession("\n".join(lines), "author", "name", "category")
+    for _ in range(50):
+        lines[rng.randrange(len(lines))] = rng.choice(LINES)
+        if rng.random() < 0.2:  # noqa: PLR2004
+            lines.insert(rng.randrange(len(lines)), rng.choice(LINES))
+        session.update("\n".join(lines))
+        assert_same(session)
+
+
+def test_workout_session_exceptions() -> None:
+    """Test that invalid text keeps the previous workout."""
+    session = WorkoutSession("\n".join(LINES), "author", "name", "category")
+    with pytest.raises(UnexpectedToken) as excinfo:
+        session.update("1m @ 50% FTP\n1m @ 50 FTP")
+    assert excinfo.value.line == 2  # noqa: PLR2004
+    assert session.text == "\n".join(LINES)
+    assert_same(session)
+    with pytest.raises(LarkError, match="strictly positive"):
+        session.edit(0, 0, "0x ")
+    assert_same(session)
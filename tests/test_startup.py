@@ -0,0 +1,84 @@
+"""tests for import and command line interface startup."""
+
+import subprocess  # noqa: S404
+import sys
+import time
+
+import pytest
+
+IMPORT_BUDGET = 0.25  # seconds
+HELP_BUDGET = 1.0  # seconds
+
+LAZY_MODULES = [
+    "zwog._parser",
+    "argparse",
+    "concurrent.futures",
+    "cProfile",
+    "importlib.metadata",
+    "xml.etree.ElementTree",
+    "xml.sax",
+]
+
+
+def imported_modules(code: str) -> dict[str, int]:
+    """Return the cumulative import time of each module in microseconds."""
+    stderr = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+    modules = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.removeprefix("import time:").split("|")
+            if cumulative.strip().isdigit():
+                modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_import_time() -> None:
+    """Test that importing zwog is fast and leaves heavy modules unloaded."""
+    modules = imported_modules("import zwog")
+    assert modules["zwog"] < IMPORT_BUDGET * 1e6
+    assert [x for x in LAZY_MODULES if x in modules] == []
+
+
+@pytest.mark.parametrize(
+    ("code", "expected"),
+    [
+        (
+            "from zwog.utils import main; main(['--help'])",
+            ["argparse"],
+        ),
+        (
+            "from zwog.utils import parse_workout; parse_workout('1m @ 50% FTP')",
+            [],
+        ),
+        (
+            "from zwog.utils import parse_workout; parse_workout('1m @ 50%')",
+            ["zwog._parser"],
+        ),
+        (
+            "import zwog; zwog.ZWOG('1m @ 50% FTP').zwo_workout",
+            [],
+        ),
+    ],
+)
+def test_lazy_imports(code: str, expected: list[str]) -> None:
+    """Test that heavy modules are imported only when needed."""
+    modules = imported_modules(
+        f"import contextlib\nwith contextlib.suppress(BaseException): {code}"
+    )
+    assert [x for x in LAZY_MODULES if x in modules] == expected
+
+
+def test_help_time() -> None:
+    """Test that the command line interface starts fast."""
+    start = time.perf_counter()
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", "from zwog.utils import main; main(['--help'])"],
+        capture_output=True,
+        check=True,
+    )
+    assert time.perf_counter() - start < HELP_BUDGET
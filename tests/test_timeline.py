@@ -0,0 +1,171 @@
+"""unit tests for zwog.timeline."""
+
+import pytest
+
+from zwog.timeline import Segment, Timeline
+from zwog.utils import ZWOG
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        (r"", []),
+        (
+            r"2x 1m @ 50% FTP",
+            [Segment(0, 60, 50, 50), Segment(60, 60, 50, 50)],
+        ),
+        (
+            r"10m from 40 to 80% FTP 2x 1m @ 120% FTP, 2m from 60 to 50% FTP",
+            [
+                Segment(0, 600, 40, 80),
+                Segment(600, 60, 120, 120),
+                Segment(660, 120, 60, 50),
+                Segment(780, 60, 120, 120),
+                Segment(840, 120, 60, 50),
+            ],
+        ),
+    ],
+)
+def test_timeline(test_input: str, expected: list[Segment]) -> None:
+    """Test timeline (ZWOG)."""
+    timeline = ZWOG(test_input).timeline
+    assert list(timeline) == expected
+    assert len(timeline) == len(expected)
+    assert timeline.total_duration == sum(x.duration for x in expected)
+
+
+def test_timeline_equality() -> None:
+    """Test timeline equality."""
+    timeline = ZWOG(r"2x 1m @ 50% FTP").timeline
+    assert timeline == ZWOG(r"1m @ 50% FTP 1m @ 50% FTP").timeline
+    assert timeline != ZWOG(r"1m @ 50% FTP").timeline
+    assert timeline != list(timeline)
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        ((0, 1200), list(ZWOG(r"10m from 40 to 80% FTP 10m @ 90% FTP").timeline)),
+        ((-10, 60), [Segment(0, 60, 40, 44)]),
+        ((300, 660), [Segment(300, 300, 60, 80), Segment(600, 60, 90, 90)]),
+        ((150, 450), [Segment(150, 300, 50, 70)]),
+        ((600, 660), [Segment(600, 60, 90, 90)]),
+        ((1200, 1300), []),
+        ((700, 600), []),
+    ],
+)
+def test_slice(test_input: tuple[float, float], expected: list[Segment]) -> None:
+    """Test slice."""
+    timeline = ZWOG(r"10m from 40 to 80% FTP 10m @ 90% FTP").timeline
+    assert list(timeline.slice(*test_input)) == expected
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [(0, 40), (300, 60), (599.5, 79.96666666666667), (600, 90), (1199, 90)],
+)
+def test_power_at(test_input: float, expected: float) -> None:
+    """Test power_at."""
+    timeline = ZWOG(r"10m from 40 to 80% FTP 10m @ 90% FTP").timeline
+    assert timeline.power_at(test_input) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("test_input", [-1, 1200])
+def test_power_at_exceptions(test_input: float) -> None:
+    """Test power_at exceptions."""
+    timeline = ZWOG(r"10m from 40 to 80% FTP 10m @ 90% FTP").timeline
+    with pytest.raises(ValueError, match="outside of the workout"):
+        timeline.power_at(test_input)
+
+
+def test_from_blocks_repeats() -> None:
+    """Test that repeats are expanded without per-interval objects."""
+    timeline = Timeline.from_blocks(ZWOG(r"1000x 1m @ 50% FTP, 1m @ 60% FTP").workout)
+    assert len(timeline) == 2000  # noqa: PLR2004
+    assert timeline.start[-1] == 1999 * 60
+    assert timeline.power_low.typecode == "d"
+
+
+@pytest.mark.parametrize(
+    ("test_input", "resolution", "expected"),
+    [
+        (r"", 1, []),
+        (r"3s @ 50% FTP", 1, [50, 50, 50]),
+        (r"4s from 40 to 80% FTP", 1, [40, 50, 60, 70]),
+        (r"4s from 40 to 80% FTP", 2, [40, 60]),
+        (r"3s from 40 to 70% FTP", 2, [40, 60]),
+        (r"3s from 40 to 70% FTP 1s @ 100% FTP", 2, [40, 60]),
+        (r"2x 1s @ 50% FTP, 1s @ 100% FTP", 0.5, [50, 50, 100, 100] * 2),
+        (r"1s @ 50% FTP", 0.1, [50] * 10),
+    ],
+)
+def test_power_trace(test_input: str, resolution: float, expected: list[float]) -> None:
+    """Test power_trace and iter_power_trace (ZWOG)."""
+    workout = ZWOG(test_input)
+    assert workout.power_trace(resolution).tolist() == pytest.approx(expected)
+    chunks = list(workout.iter_power_trace(resolution, chunk_size=3))
+    assert all(0 < len(chunk) <= 3 for chunk in chunks)  # noqa: PLR2004
+    assert [x for chunk in chunks for x in chunk] == pytest.approx(expected)
+
+
+def test_power_trace_power_at() -> None:
+    """Test power_trace against power_at."""
+    timeline = ZWOG(
+        r"10m from 40 to 85% FTP 3x 5m @ 95% FTP, 17s from 100 to 50% FTP"
+    ).timeline
+    trace = timeline.power_trace()
+    assert len(trace) == timeline.total_duration
+    assert trace.tolist() == pytest.approx(
+        [timeline.power_at(time) for time in range(len(trace))]
+    )
+
+
+@pytest.mark.parametrize(("resolution", "chunk_size"), [(0, 1), (-1, 1), (1, 0)])
+def test_power_trace_exceptions(resolution: float, chunk_size: int) -> None:
+    """Test power_trace exceptions."""
+    timeline = ZWOG(r"1m @ 50% FTP").timeline
+    with pytest.raises(ValueError, match="not positive"):
+        list(timeline.iter_power(resolution, chunk_size))
+    if chunk_size > 0:
+        with pytest.raises(ValueError, match="not positive"):
+            timeline.power_trace(resolution)
+
+
+@pytest.mark.parametrize(
+    ("test_input", "boundaries", "expected"),
+    [
+        (r"", [55, 75], [0, 0, 0]),
+        (r"1m @ 55% FTP 2m @ 54% FTP", [55, 75], [120, 60, 0]),
+        (r"10m from 40 to 80% FTP", [55, 75], [225, 300, 75]),
+        (r"10m from 80 to 40% FTP", [55, 75], [225, 300, 75]),
+        (r"2x 2m from 60 to 50% FTP", [55], [120, 120]),
+        (r"1m from 40 to 50% FTP", [50, 60], [60, 0, 0]),
+        (r"1m @ 50% FTP", [], [60]),
+    ],
+)
+def test_time_in_zones(
+    test_input: str, boundaries: list[float], expected: list[float]
+) -> None:
+    """Test time_in_zones."""
+    timeline = ZWOG(test_input).timeline
+    assert timeline.time_in_zones(boundaries) == pytest.approx(expected)
+
+
+def test_time_in_zones_trace() -> None:
+    """Test time_in_zones against a finely sampled power trace."""
+    timeline = ZWOG(
+        r"10m from 40 to 85% FTP 3x 5m @ 95% FTP, 17s from 130 to 50% FTP"
+    ).timeline
+    boundaries = [55.0, 75.0, 90.0, 105.0, 120.0]
+    trace = timeline.power_trace(0.01)
+    expected = [0.0] * (len(boundaries) + 1)
+    for power in trace:
+        expected[sum(power >= x for x in boundaries)] += 0.01
+    assert timeline.time_in_zones(boundaries) == pytest.approx(expected, abs=0.1)
+
+
+@pytest.mark.parametrize("boundaries", [[75, 55], [55, 55]])
+def test_time_in_zones_exceptions(boundaries: list[float]) -> None:
+    """Test time_in_zones exceptions."""
+    with pytest.raises(ValueError, match="not strictly increasing"):
+        ZWOG(r"1m @ 50% FTP").timeline.time_in_zones(boundaries)
@@ -1,13 +1,39 @@
 """unit tests for zwog.utils."""
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib.metadata import version
+from io import BytesIO, RawIOBase, StringIO
 from itertools import starmap
-from tempfile import NamedTemporaryFile
-from xml.etree.ElementTree import Element, ElementTree, fromstring, parse  # noqa: S405
+from pathlib import Path
+from random import Random
+from socket import SHUT_WR, socketpair
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile
+from typing import Any, BinaryIO, cast
+from xml.etree.ElementTree import (  # noqa: S405
+    Element,
+    ElementTree,
+    fromstring,
+    parse,
+    tostring,
+)
 
 import pytest
-from lark.exceptions import UnexpectedCharacters, UnexpectedEOF
 
-from zwog.utils import ZWOG, Block, Interval, WorkoutTransformer
+from zwog.exceptions import UnexpectedCharacters, UnexpectedInput, UnexpectedToken
+from zwog.profiling import profile
+from zwog.utils import (
+    ZWOG,
+    Block,
+    ConversionResult,
+    Interval,
+    WorkoutTransformer,
+    convert_files,
+    get_parser,
+    main,
+    parse_workout,
+)
 
 
 def elements_equal(e1: Element, e2: Element) -> bool:
@@ -39,18 +65,19 @@ def elements_equal(e1: Element, e2: Element) -> bool:
 @pytest.mark.parametrize(
     ("test_input", "exception"),
     [
-        ("x", UnexpectedCharacters),
-        (r"1 @ 50% FTP", UnexpectedCharacters),
-        (r"1h @ 50%", UnexpectedEOF),
-        (r"1h 50% FTP", UnexpectedCharacters),
-        (r"1h @ 50 FTP", UnexpectedCharacters),
-        (r",1h @ 50% FTP", UnexpectedCharacters),
-        (r"1h from 10 to 50 FTP", UnexpectedCharacters),
-        (r"1h @ 10 to 50% FTP", UnexpectedCharacters),
-        (r"1h from 10% to 50% FTP", UnexpectedCharacters),
-        (r"2x 1h from 10 to 50% FTP, 2x 1h @ 50% FTP", UnexpectedCharacters),
-        (r"1x from 10 to 50% FTP", UnexpectedCharacters),
+        ("x", UnexpectedToken),
+        (r"1 @ 50% FTP", UnexpectedToken),
+        (r"1h @ 50%", UnexpectedToken),
+        (r"1h 50% FTP", UnexpectedToken),
+        (r"1h @ 50 FTP", UnexpectedToken),
+        (r",1h @ 50% FTP", UnexpectedToken),
+        (r"1h from 10 to 50 FTP", UnexpectedToken),
+        (r"1h @ 10 to 50% FTP", UnexpectedToken),
+        (r"1h from 10% to 50% FTP", UnexpectedToken),
+        (r"2x 1h from 10 to 50% FTP, 2x 1h @ 50% FTP", UnexpectedToken),
+        (r"1x from 10 to 50% FTP", UnexpectedToken),
         (r"1f from 10 to 50% FTP", UnexpectedCharacters),
+        (r"1.5x 1h @ 50% FTP", UnexpectedToken),
     ],
 )
 def test_zwog_grammar(test_input: str, exception: type[Exception]) -> None:
@@ -59,6 +86,14 @@ def test_zwog_grammar(test_input: str, exception: type[Exception]) -> None:
         ZWOG(test_input)
 
 
+def test_get_parser() -> None:
+    """Test that the parser is shared."""
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parsers = list(executor.map(lambda _: get_parser(), range(8)))
+    assert all(parser is get_parser() for parser in parsers)
+    assert get_parser().options.parser == "lalr"
+
+
 @pytest.mark.parametrize(
     ("test_input", "expected"),
     [
@@ -298,6 +333,8 @@ def test_zwog_str(test_input: str, expected: str) -> None:
         (r"60s from 0 to 100% FTP", 100 / 60 / 2),
         (r"1h @ 66% FTP, 1h @ 100% FTP", 166.0),
         (r"", 0.0),
+        (r"3x 60s @ 100% FTP", 3 * 100 / 60),
+        (r"3x 60s from 0 to 100% FTP 1m @ 50% FTP", (3 * 100 / 2 + 50) / 60),
     ],
 )
 def test_tss(test_input: str, expected: float) -> None:
@@ -305,6 +342,36 @@ def test_tss(test_input: str, expected: float) -> None:
     assert ZWOG(test_input).tss == expected
 
 
+def test_lazy_views(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the derived views are computed on demand and cached."""
+    calls: list[str] = []
+
+    def record(method: str) -> Callable[..., Any]:
+        original = getattr(ZWOG, method)
+
+        def wrapper(*args: Any) -> Any:  # noqa: ANN401
+            calls.append(method)
+            return original(*args)
+
+        return wrapper
+
+    for method in ["_to_pretty", "_to_zwo", "_to_tss"]:
+        monkeypatch.setattr(ZWOG, method, record(method))
+
+    workout = ZWOG(r"3x 1m @ 95% FTP, 2m @ 105% FTP")
+    assert not calls
+
+    assert workout.tss == workout.tss
+    assert calls == ["_to_tss"]
+
+    assert workout.zwo_workout == workout.zwo_workout
+    assert str(workout).startswith("3x")
+    assert calls == ["_to_tss", "_to_pretty"]
+
+    assert workout.element_workout is workout.element_workout
+    assert calls == ["_to_tss", "_to_pretty", "_to_zwo"]
+
+
 @pytest.mark.parametrize(
     ("test_input", "expected"),
     [
@@ -396,6 +463,208 @@ def test_workout(test_input: str, expected: list[Block]) -> None:
     assert ZWOG(test_input).workout == expected
 
 
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        r"",
+        " \n\t",
+        r"1h1hrs1m 1min1sec  1sec @ 100% FTP",
+        r"1.5h @ 1e2% FTP .5m from 1. to 2.5E1% FTP",
+        r"3 x 150s from 50 to 100% FTP, 2m @ 50% FTP 5s @ 10  %   FTP  ",
+        "2\nx\n1m@50%FTP,1mfrom50to60%FTP\n3x1m@50%FTP",
+    ],
+)
+def test_parse_workout(test_input: str) -> None:
+    """Test that parse_workout matches the parser and transformer."""
+    assert parse_workout(test_input) == WorkoutTransformer().transform(
+        get_parser().parse(test_input)
+    )
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        r"0x 1m @ 50% FTP",
+        r"0m @ 50% FTP",
+        r"0.5s @ 50% FTP",
+        r"1m from 50 to 60% FTP, 1m @ 0% FTP 1m @ 50% FTP,",
+    ],
+)
+def test_parse_workout_exceptions(test_input: str) -> None:
+    """Test that parse_workout raises the same exceptions as the parser."""
+    with pytest.raises(Exception) as expected:  # noqa: PT011
+        WorkoutTransformer().transform(get_parser().parse(test_input))
+    with pytest.raises(type(expected.value)) as actual:
+        parse_workout(test_input)
+    assert str(actual.value) == str(expected.value)
+
+
+NESTED_WORKOUTS = [
+    (
+        r"3x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP",
+        "4x 30s @ 120% FTP, 30s @ 50% FTP\n5m @ 55% FTP\n" * 3,
+    ),
+    (
+        r"2x 1m @ 90% FTP, (2x 20s @ 150% FTP, 10s @ 40% FTP) 5m @ 50% FTP",
+        "1m @ 90% FTP\n2x 20s @ 150% FTP, 10s @ 40% FTP\n"
+        "1m @ 90% FTP\n2x 20s @ 150% FTP, 10s @ 40% FTP\n5m @ 50% FTP",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    ("test_input", "expected"),
+    [
+        (
+            r"2x (3x 1m @ 100% FTP, 1m @ 50% FTP)",
+            [Block([Interval(60, 100.0), Interval(60, 50.0)], 6)],
+        ),
+        (
+            r"(1m @ 100% FTP, 1m @ 50% FTP), 2m from 50 to 60% FTP",
+            [
+                Block(
+                    [
+                        Interval(60, 100.0),
+                        Interval(60, 50.0),
+                        Interval(120, [50.0, 60.0]),
+                    ]
+                )
+            ],
+        ),
+        (
+            r"2x (3x 1m @ 100% FTP), 1m @ 50% FTP",
+            [
+                Block(
+                    [Block([Interval(60, 100.0)], 3), Interval(60, 50.0)],
+                    2,
+                )
+            ],
+        ),
+        (
+            r"2x 1m @ 90% FTP, (2x 20s @ 150% FTP, 10s @ 40% FTP)",
+            [
+                Block(
+                    [
+                        Interval(60, 90.0),
+                        Block([Interval(20, 150.0), Interval(10, 40.0)], 2),
+                    ],
+                    2,
+                )
+            ],
+        ),
+    ],
+)
+def test_nested_workout(test_input: str, expected: list[Block]) -> None:
+    """Test that nested groups are kept as a normalized tree."""
+    assert parse_workout(test_input) == expected
+    assert WorkoutTransformer().transform(get_parser().parse(test_input)) == expected
+
+
+@pytest.mark.parametrize(("test_input", "expanded"), NESTED_WORKOUTS)
+def test_nested_views(test_input: str, expanded: str) -> None:
+    """Test that nested groups match the hand-expanded workout."""
+    nested = ZWOG(test_input)
+    flat = ZWOG(expanded)
+    assert ZWOG(str(nested)).workout == nested.workout
+    assert nested.tss == pytest.approx(flat.tss)
+    assert nested.duration == flat.duration
+    assert nested.timeline == flat.timeline
+    assert list(map(tostring, nested.element_workout.iter("workout"))) == list(
+        map(tostring, flat.element_workout.iter("workout"))
+    )
+
+
+def test_nested_huge_repeats() -> None:
+    """Test that nested repeats are not expanded for the summary views."""
+    text = r"1000000x (1000000x 1s @ 50% FTP, 1s @ 100% FTP), 1s @ 60% FTP"
+    workout = ZWOG(text)
+    assert workout.duration == 2 * 10**12 + 10**6
+    assert workout.tss == pytest.approx(
+        ZWOG(r"1000000x 1s @ 50% FTP, 1s @ 100% FTP").tss * 10**6
+        + ZWOG(r"1000000x 1s @ 60% FTP").tss
+    )
+    assert str(workout) == text
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        "(" * 33 + "1m @ 50% FTP" + ")" * 33,
+        "(" * 5000 + "1m @ 50% FTP" + ")" * 5000,
+        "(" * 5000 + "1m @ 50% FTP",
+        "1m @ 50% FTP " + "(2x " * 40 + "1m @ 50% FTP" + ")" * 40,
+    ],
+)
+def test_nested_depth_exceptions(test_input: str) -> None:
+    """Test that deeply nested groups are rejected."""
+    with pytest.raises(ValueError, match="nested at most 32 levels"):
+        ZWOG(test_input)
+
+
+def test_nested_depth() -> None:
+    """Test the deepest allowed nesting."""
+    workout = ZWOG("(2x " * 32 + "1s @ 50% FTP" + ")" * 32)
+    assert workout.workout == [Block([Interval(1, 50.0)], 2**32)]
+
+
+def test_nested_expansion() -> None:
+    """Test that workouts are only expanded up to MAX_INTERVALS intervals."""
+    text = (
+        r"1000x (1000x (1000x 1s @ 50% FTP, 1s @ 60% FTP), 1s @ 70% FTP), "
+        r"1s @ 80% FTP"
+    )
+    workout = ZWOG(text)
+    assert workout.duration == 2001001000  # noqa: PLR2004
+    assert str(workout) == text
+    assert ZWOG(text, optimize=True).workout == workout.workout
+    message = "at most 1000000 intervals with the repeats expanded, not 2001001000"
+    for view in ("zwo_bytes", "element_workout", "timeline"):
+        with pytest.raises(ValueError, match=message):
+            getattr(workout, view)
+    with pytest.raises(ValueError, match=message):
+        workout.write_zwo(StringIO())
+    with pytest.raises(ValueError, match="not 2000003"):
+        ZWOG(r"1000001x 1s @ 50% FTP, 1s @ 60% FTP 1s @ 50% FTP", optimize=True)
+    assert len(ZWOG(r"500000x 1s @ 50% FTP, 1s @ 60% FTP").timeline) == 10**6
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        r"2x (1m @ 50% FTP",
+        r"2x 1m @ 50% FTP)",
+        r"2x (1m @ 50% FTP))",
+        r"()",
+        r"2x (1m @ 50% FTP), (",
+    ],
+)
+def test_nested_exceptions(test_input: str) -> None:
+    """Test that unbalanced groups are rejected by both parsers."""
+    with pytest.raises(UnexpectedInput):
+        WorkoutTransformer().transform(get_parser().parse(test_input))
+    with pytest.raises(UnexpectedInput):
+        parse_workout(test_input)
+
+
+def test_parse_workout_random() -> None:
+    """Test parse_workout against the parser on random workouts."""
+    tokens = [
+        *("0", "1", "10", "2.5", ".5", "1.", "1e2", "-1", "e"),
+        *("s", "sec", "m", "min", "h", "hrs", "x", "@", "%", ",", "FTP"),
+        *("from", "to", " ", "\n"),
+    ]
+    rng = Random(0)  # noqa: S311
+    for _ in range(2000):
+        test_input = "".join(rng.choices(tokens, k=rng.randint(0, 20)))
+        try:
+            expected = WorkoutTransformer().transform(get_parser().parse(test_input))
+        except (UnexpectedInput, ValueError):
+            with pytest.raises((UnexpectedInput, ValueError)):
+                parse_workout(test_input)
+        else:
+            assert parse_workout(test_input) == expected
+
+
 @pytest.mark.parametrize(
     ("test_input", "expected"),
     [
@@ -453,6 +722,21 @@ def test_workout(test_input: str, expected: list[Block]) -> None:
 1m @ 50% FTP
 3x 5m from 70 to 100% FTP, 5m from 100 to 70% FTP
 1m @ 50% FTP</description><sportType>bike</sportType><category>SubCat1</category><workout><SteadyState Duration="60" Power="0.5" /><Ramp Duration="300" PowerLow="0.7" PowerHigh="1.0" /><Ramp Duration="300" PowerLow="1.0" PowerHigh="0.7" /><Ramp Duration="300" PowerLow="0.7" PowerHigh="1.0" /><Ramp Duration="300" PowerLow="1.0" PowerHigh="0.7" /><Ramp Duration="300" PowerLow="0.7" PowerHigh="1.0" /><Ramp Duration="300" PowerLow="1.0" PowerHigh="0.7" /><SteadyState Duration="60" Power="0.5" /></workout></workout_file>
+"""
+            ),
+        ),
+        (
+            [
+                r"2x 1m from 40 to 80% FTP 1m @ 50% FTP",
+                "John Dow",
+                "Cat1",
+                "SubCat1",
+            ],
+            (
+                """<workout_file><author>John Dow</author><name>Cat1</name><description>This workout was generated using ZWOG.
+
+2x 1m from 40 to 80% FTP
+1m @ 50% FTP</description><sportType>bike</sportType><category>SubCat1</category><workout><Ramp Duration="60" PowerLow="0.4" PowerHigh="0.8" /><Ramp Duration="60" PowerLow="0.4" PowerHigh="0.8" /><SteadyState Duration="60" Power="0.5" /></workout></workout_file>
 """
             ),
         ),
@@ -482,6 +766,135 @@ def test_save_zwo(test_input: str) -> None:
     )
 
 
+STREAMING_WORKOUTS = [
+    [r""],
+    [r"10m @ 50% FTP", "John & <Dow>", "", None, "Sub\ncat"],
+    [r"1m from 40 to 80% FTP 3x 1m @ 95% FTP, 2m @ 105% FTP 2m from 70 to 50% FTP"],
+    [r"4x 30s from 40 to 80% FTP 3x 1m @ 95% FTP, 2m @ 105% FTP, 1m @ 50% FTP"],
+    [r"1m @ 50% FTP", "Jöhn Døw", "Pyöräily"],
+    [r"10m @ 50% FTP 3x (4x 30s @ 120% FTP, 30s @ 50% FTP), 5m @ 55% FTP"],
+]
+
+
+class BinarySink:
+    """Binary writable that is not a file object."""
+
+    def __init__(self) -> None:
+        """Initialize BinarySink."""
+        self.data = b""
+
+    def write(self, data: bytes) -> None:
+        """Append bytes."""
+        self.data += bytes(data)
+
+
+@pytest.mark.parametrize("test_input", STREAMING_WORKOUTS)
+def test_write_zwo(test_input: list[Any]) -> None:
+    """Test that write_zwo matches ElementTree."""
+    workout = ZWOG(*test_input)
+    expected = tostring(workout.element_workout, encoding="unicode") + "\n"
+
+    text_file = StringIO()
+    workout.write_zwo(text_file)
+    assert text_file.getvalue() == expected
+
+    binary_file = BytesIO()
+    workout.write_zwo(binary_file)
+    assert binary_file.getvalue() == expected.encode()
+    # binary files are streamed, without the whole document in memory
+    assert "zwo_bytes" not in workout.__dict__
+
+    sink = BinarySink()
+    workout.write_zwo(cast(BinaryIO, sink))
+    assert sink.data == expected.encode()
+    for mode, content in [("w+b", expected.encode()), ("w+", expected)]:
+        with SpooledTemporaryFile(mode=mode) as spooled_file:
+            workout.write_zwo(cast(BinaryIO, spooled_file))
+            spooled_file.seek(0)
+            assert spooled_file.read() == content
+    assert "zwo_bytes" not in workout.__dict__
+    assert workout.zwo_workout == expected
+
+    binary_file = BytesIO()
+    workout.write_zwo(binary_file)
+    assert binary_file.getvalue() == expected.encode()
+
+
+class TrickleFile(RawIOBase):
+    """Raw file writing at most 7 bytes per call."""
+
+    def __init__(self) -> None:
+        """Initialize TrickleFile."""
+        self.data = bytearray()
+
+    def writable(self) -> bool:  # noqa: PLR6301
+        """Return True."""
+        return True
+
+    def write(self, b: Any) -> int:  # noqa: ANN401
+        """Return the number of bytes written, at most 7."""
+        self.data += bytes(b[:7])
+        return min(len(b), 7)
+
+
+@pytest.mark.parametrize("test_input", STREAMING_WORKOUTS)
+def test_zwo_bytes(test_input: list[Any]) -> None:
+    """Test that zwo_bytes is cached and written to binary files and sockets."""
+    workout = ZWOG(*test_input)
+    expected = workout.zwo_workout.encode()
+    assert workout.zwo_bytes is workout.zwo_bytes
+    assert workout.zwo_bytes == expected
+
+    raw_file = TrickleFile()
+    workout.write_zwo(raw_file)
+    assert raw_file.data == expected
+
+    reader, writer = socketpair()
+    with reader, writer, profile() as profiler:
+        workout.write_zwo(writer)
+        writer.shutdown(SHUT_WR)
+        assert b"".join(iter(partial(reader.recv, 4096), b"")) == expected
+    assert profiler.stages["write"].calls == 1
+
+
+class BlockingFile(RawIOBase):
+    """Non-blocking raw file that blocks after 7 bytes."""
+
+    def __init__(self) -> None:
+        """Initialize BlockingFile."""
+        self.data = bytearray()
+
+    def writable(self) -> bool:  # noqa: PLR6301
+        """Return True."""
+        return True
+
+    def write(self, b: Any) -> int | None:  # noqa: ANN401
+        """Return the number of bytes written, None once 7 bytes are written."""
+        if self.data:
+            return None
+        self.data += bytes(b[:7])
+        return 7
+
+
+def test_write_zwo_blocking() -> None:
+    """Test that a blocking raw file raises instead of spinning."""
+    raw_file = BlockingFile()
+    with pytest.raises(BlockingIOError) as exc_info:
+        ZWOG("1m @ 50% FTP").write_zwo(raw_file)
+    assert exc_info.value.characters_written == len(raw_file.data) == 7  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("test_input", STREAMING_WORKOUTS)
+def test_save_zwo_bytes(test_input: list[Any], tmp_path: Path) -> None:
+    """Test that save_zwo matches ElementTree."""
+    workout = ZWOG(*test_input)
+    workout.save_zwo(str(tmp_path / "actual.zwo"))
+    ElementTree(workout.element_workout).write(tmp_path / "expected.zwo")
+    assert (tmp_path / "actual.zwo").read_bytes() == (
+        tmp_path / "expected.zwo"
+    ).read_bytes()
+
+
 @pytest.mark.parametrize(
     ("test_input", "expected"),
     [
@@ -532,3 +945,175 @@ def test_save_zwo(test_input: str) -> None:
 def test_zwo_workout(test_input: list[str], expected: str) -> None:
     """Test zwo_workout (ZWOG)."""
     assert ZWOG(*test_input).zwo_workout == expected
+
+
+def test_main(tmp_path: Path) -> None:
+    """Test the command line interface."""
+    input_file = tmp_path / "workout.txt"
+    input_file.write_text(r"2 x 1m @ 95% FTP, 2m @ 105% FTP", encoding="utf-8")
+    output_file = tmp_path / "workout.zwo"
+    with pytest.raises(SystemExit) as error:
+        main(["-i", str(input_file), "-o", str(output_file), "-a", "John Dow"])
+    assert error.value.code == 0
+    assert (
+        output_file.read_text(encoding="utf-8")
+        == ZWOG(r"2 x 1m @ 95% FTP, 2m @ 105% FTP", "John Dow").zwo_workout
+    )
+
+
+def test_main_stdout(
+    tmp_path: Path,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    """Test that the command line interface writes UTF-8 bytes to stdout."""
+    input_file = tmp_path / "workout.txt"
+    input_file.write_text(r"1m @ 50% FTP", encoding="utf-8")
+    with pytest.raises(SystemExit) as error:
+        main(["-i", str(input_file), "-a", "Jöhn Døw"])
+    assert error.value.code == 0
+    assert capsysbinary.readouterr().out == ZWOG(r"1m @ 50% FTP", "Jöhn Døw").zwo_bytes
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_batch(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], jobs: str
+) -> None:
+    """Test the command line interface in batch mode."""
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "a.txt").write_text(r"1m @ 50% FTP", encoding="utf-8")
+    (tmp_path / "in" / "b.txt").write_text(r"1m @ 50%", encoding="utf-8")
+    (tmp_path / "c.txt").write_text(r"2m @ 50% FTP", encoding="utf-8")
+    with pytest.raises(SystemExit) as error:
+        main(
+            [
+                str(tmp_path / "in"),
+                str(tmp_path / "*.txt"),
+                str(tmp_path / "missing.txt"),
+                "--output_dir",
+                str(tmp_path / "out"),
+                "--jobs",
+                jobs,
+            ]
+        )
+    assert error.value.code == 1
+    assert sorted(x.name for x in (tmp_path / "out").iterdir()) == ["a.zwo", "c.zwo"]
+    assert (tmp_path / "out" / "c.zwo").read_text(encoding="utf-8") == (
+        ZWOG(r"2m @ 50% FTP", name="c").zwo_workout
+    )
+    stderr = capsys.readouterr().err
+    assert f"{tmp_path / 'in' / 'b.txt'}: UnexpectedToken" in stderr
+    assert f"{tmp_path / 'missing.txt'}: FileNotFoundError" in stderr
+    assert "Converted 2/4 files (2 errors)" in stderr
+
+
+def test_main_version(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test printing the version."""
+    with pytest.raises(SystemExit) as error:
+        main(["--version"])
+    assert error.value.code == 0
+    assert capsys.readouterr().out == f"zwog {version('zwog')}\n"
+
+
+def test_main_profile(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test profiling from the command line interface."""
+    input_file = tmp_path / "workout.txt"
+    input_file.write_text(r"2 x 1m @ 95% FTP, 2m @ 105% FTP", encoding="utf-8")
+    output_file = tmp_path / "workout.zwo"
+    with pytest.raises(SystemExit) as error:
+        main(["-i", str(input_file), "-o", str(output_file), "--profile"])
+    assert error.value.code == 0
+    stderr = capsys.readouterr().err
+    assert stderr.splitlines()[0].split() == [
+        "stage",
+        "calls",
+        "time",
+        "(ms)",
+        "net",
+        "blocks",
+    ]
+    assert all(
+        f"\n{x} " in stderr for x in ["parse", "pretty", "zwo", "write", "total"]
+    )
+    assert "function calls" not in stderr
+
+    with pytest.raises(SystemExit) as error:
+        main(
+            ["-i", str(input_file), "-o", str(output_file), "--profile-stage", "write"]
+        )
+    assert error.value.code == 0
+    assert "function calls" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit) as error:
+        main(
+            [
+                str(input_file),
+                "--profile_stage",
+                "parse",
+                "--profile_output",
+                str(tmp_path / "parse.pstats"),
+            ]
+        )
+    assert error.value.code == 0
+    assert "function calls" not in capsys.readouterr().err
+    assert (tmp_path / "parse.pstats").stat().st_size > 0
+
+
+def test_convert_files(tmp_path: Path) -> None:
+    """Test converting files next to the inputs."""
+    input_file = tmp_path / "workout.txt"
+    input_file.write_text(r"1m @ 50% FTP", encoding="utf-8")
+    assert list(convert_files([input_file], name="Workout")) == [
+        ConversionResult(input_file, tmp_path / "workout.zwo")
+    ]
+    assert (tmp_path / "workout.zwo").read_text(encoding="utf-8") == (
+        ZWOG(r"1m @ 50% FTP", name="Workout").zwo_workout
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_files_same_stem(tmp_path: Path, jobs: int) -> None:
+    """Test that inputs with the same stem do not overwrite each other."""
+    input_files = [tmp_path / "a" / "w.txt", tmp_path / "b" / "w.txt"]
+    for idx, input_file in enumerate(input_files, 1):
+        input_file.parent.mkdir()
+        input_file.write_text(f"{idx}m @ 50% FTP", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    results = list(convert_files([*input_files, tmp_path / "c.txt"], output_dir, jobs))
+    assert [x.output_file for x in results] == [
+        output_dir / "w.zwo",
+        output_dir / "w.zwo",
+        output_dir / "c.zwo",
+    ]
+    assert results[0].error is None
+    assert results[1].error == (
+        f"FileExistsError: {output_dir / 'w.zwo'} is already written for "
+        f"{input_files[0]}"
+    )
+    assert (results[2].error or "").startswith("FileNotFoundError")
+    assert (output_dir / "w.zwo").read_text(encoding="utf-8") == (
+        ZWOG(r"1m @ 50% FTP", name="w").zwo_workout
+    )
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["workout.txt", "-o", "workout.zwo"],
+        ["-d", "out"],
+        ["workout.txt", "--profile", "-j", "2"],
+        ["--profile_output", "parse.pstats"],
+        ["--profile_stage", "unknown"],
+        ["workout.txt", "-j", "-1"],
+    ],
+)
+def test_main_exceptions(
+    argv: list[str], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test invalid command line arguments."""
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as error:
+        main(argv)
+    assert error.value.code == 2  # noqa: PLR2004
+    # rejected command lines do not create output files
+    assert list(tmp_path.iterdir()) == []